@@ -0,0 +1,120 @@
+"""Lifecycle of one analysis shown in the app.
+
+Streamlit reruns the whole script on every widget interaction, so anything
+with a side effect must not live in the render code. An AnalysisResult is
+created when an analysis finishes and kept in ``st.session_state`` until
+the user starts another one. It carries a stable id, and:
+
+- the prediction is logged once per id (``log``); the database also ignores
+  a second row with the same id, should the session state ever be rebuilt
+- charts are built on first render and reused (``figure``)
+- feedback rows carry the same id, so they can be joined to the prediction
+
+``analysis_pipeline`` holds the stages that produce a result. Classification
+and the reference lookup have no dependency on each other, so they run side
+by side and the verdict can be shown before the references arrive.
+"""
+import os
+import json
+import uuid
+from datetime import datetime
+from dotenv import load_dotenv
+import storage
+import metrics
+from pipeline import Pipeline, Stage
+from scoring import get_fast_scorer, cached_score_texts
+
+load_dotenv()
+
+# Longest the app waits for references before showing the fallback; the lookup
+# itself gives up after REFERENCE_DEADLINE, this only guards against a stuck stage
+REFERENCE_STAGE_TIMEOUT = float(os.getenv("REFERENCE_STAGE_TIMEOUT", "20"))
+
+
+class AnalysisResult:
+    """Model output, references and bookkeeping for one analyzed article"""
+
+    def __init__(self, article_text, prediction, confidence, references=None, timings=None):
+        self.id = uuid.uuid4().hex
+        self.created_at = datetime.now().isoformat()
+        self.article_text = article_text
+        self.prediction = prediction
+        self.confidence = confidence
+        self.references = references
+        self.timings = timings
+        self.logged = False
+        self.selected_feedback = None
+        self.show_feedback_form = False
+        self.feedback_count = 0
+        self._figures = {}
+
+    @property
+    def references_found(self):
+        # The "No relevant references found" entry (references.no_references_found) is not a reference
+        return any(not r.get("placeholder") for r in self.references or [])
+
+    @property
+    def label(self):
+        return "Real" if self.prediction else "Fake"
+
+    def log_record(self):
+        """Prediction log row in storage.PREDICTION_COLUMNS form"""
+        text = self.article_text
+        return {
+            "timestamp": self.created_at,
+            "news": text[:100] + "..." if len(text) > 100 else text,
+            "prediction": self.label,
+            "confidence": self.confidence,
+            "references_found": self.references_found,
+            "timings": json.dumps(self.timings) if self.timings else None,
+            "analysis_id": self.id
+        }
+
+    def log(self, path=None):
+        """Write the prediction log row unless this result was already logged"""
+        if self.logged:
+            return False
+        with metrics.span("log_prediction"):
+            storage.append_prediction(self.log_record(), path)
+        self.logged = True
+        return True
+
+    def figure(self, name, build):
+        """Chart ``name`` for this result, built by ``build(result)`` on first use"""
+        if name not in self._figures:
+            self._figures[name] = build(self)
+        return self._figures[name]
+
+    def feedback_record(self, session_id, **fields):
+        """Feedback row for this result; ``fields`` holds the ratings and comments"""
+        text = self.article_text
+        record = {
+            "session_id": session_id,
+            "timestamp": datetime.now().isoformat(),
+            "article_text": text[:200] + "..." if len(text) > 200 else text,
+            "prediction": self.label,
+            "confidence": self.confidence,
+            "analysis_id": self.id
+        }
+        record.update(fields)
+        return record
+
+
+def analysis_pipeline(article_text, num_references=6):
+    """Stages of one analysis: model -> verdict, and query -> references alongside.
+
+    Stream it to get ("verdict", (prediction, confidence)) and
+    ("references", [...]) in whichever order they finish.
+    """
+    # Imported here so the app's first paint does not wait for the provider modules
+    from keywords import extract_query
+    import references
+
+    return Pipeline([
+        Stage("model", lambda: get_fast_scorer()),
+        Stage("verdict", lambda model: cached_score_texts([article_text])[0], after=["model"]),
+        Stage("query", lambda: extract_query(article_text)),
+        Stage("references", lambda query: references.references_for_query(query, num_references, article_text),
+              after=["query"], timeout=REFERENCE_STAGE_TIMEOUT, network=True,
+              fallback=lambda query: [references.references_unavailable(query)]),
+    ])
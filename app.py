@@ -1,18 +1,19 @@
 import streamlit as st
-import pandas as pd
 import os
 import logging
-import requests
-import re
-import string
-import joblib
-from datetime import datetime, timedelta
-import plotly.express as px
-import plotly.graph_objects as go
+from datetime import datetime
+import threading
+import time
 from dotenv import load_dotenv
-from textblob import TextBlob
+from provider_client import provider_stats
+from providers import PROVIDERS, get_provider
+import storage
+from scoring import get_fast_scorer
+from prediction_cache import prediction_cache
+from analysis import AnalysisResult, analysis_pipeline
+import metrics
+import json
 import hashlib
-import time
 
 # Load environment variables from .env file
 load_dotenv()
@@ -26,6 +27,14 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# News providers shown in the API status panel: id -> (label, env key, client name).
+# Every provider with a key is queried; see providers.py.
+API_PROVIDERS = {p.id: (p.label, p.env_key, p.name) for p in PROVIDERS}
+
+# Seconds between sidebar statistics refreshes; the sidebar also redraws on a full rerun,
+# but from cached stats and figures, so main-panel clicks do no sidebar work
+SIDEBAR_REFRESH = max(float(os.getenv("SIDEBAR_REFRESH", "30")), 1)
+
 # Logging configuration
 logging.basicConfig(level=logging.DEBUG, format="%(asctime)s %(levelname)s %(message)s")
 
@@ -229,66 +238,6 @@ def get_api_key(key_name, default_value=None):
         return None
     return api_key
 
-def clean_text(text):
-    """Clean and normalize text for processing"""
-    if not text:
-        return ""
-    text = text.lower()
-    text = re.sub(f"[{re.escape(string.punctuation)}]", "", text)
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
-
-def extract_query(text):
-    """Extract meaningful query from article text with better keyword extraction"""
-    if not text:
-        return ""
-    
-    # Remove common stop words
-    stop_words = {'the', 'is', 'at', 'which', 'on', 'a', 'an', 'as', 'are', 'was', 'were', 'been', 'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those', 'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you', 'your', 'yours', 'yourself', 'yourselves', 'he', 'him', 'his', 'himself', 'she', 'her', 'hers', 'herself', 'it', 'its', 'itself', 'they', 'them', 'their', 'theirs', 'themselves', 'what', 'which', 'who', 'whom', 'whose', 'why', 'how', 'when', 'where', 'if', 'or', 'because', 'until', 'while', 'of', 'at', 'by', 'for', 'with', 'through', 'during', 'before', 'after', 'above', 'below', 'up', 'down', 'in', 'out', 'off', 'over', 'under', 'again', 'further', 'then', 'once'}
-    
-    # Extract keywords using TextBlob for better noun phrase extraction
-    try:
-        blob = TextBlob(text)
-        # Get noun phrases
-        noun_phrases = [phrase for phrase in blob.noun_phrases if len(phrase.split()) <= 3]
-        
-        # Get important words (nouns, proper nouns, adjectives)
-        important_words = []
-        for word, pos in blob.tags:
-            if pos in ['NN', 'NNS', 'NNP', 'NNPS', 'JJ', 'JJR', 'JJS'] and word.lower() not in stop_words and len(word) > 2:
-                important_words.append(word)
-        
-        # Combine noun phrases and important words
-        keywords = list(set(noun_phrases + important_words[:10]))
-        
-        # If we have good keywords, use them
-        if keywords:
-            query = ' '.join(keywords[:5])  # Take top 5 keywords
-        else:
-            # Fallback to sentence extraction
-            sentences = re.split(r'(?<=[.!?])\s', text)
-            query = (sentences[0] + (" " + sentences[1] if len(sentences) >= 2 else "")) if sentences else text
-    except:
-        # Fallback to original method if TextBlob fails
-        sentences = re.split(r'(?<=[.!?])\s', text)
-        query = (sentences[0] + (" " + sentences[1] if len(sentences) >= 2 else "")) if sentences else text
-    
-    return query.strip().strip('"\'')[:200]
-
-def calculate_relevance_score(article_title, article_desc, query):
-    """Calculate relevance score between article and query"""
-    query_words = set(query.lower().split())
-    title_words = set(article_title.lower().split())
-    desc_words = set(article_desc.lower().split()) if article_desc else set()
-    
-    # Calculate overlap
-    title_overlap = len(query_words.intersection(title_words)) / len(query_words) if query_words else 0
-    desc_overlap = len(query_words.intersection(desc_words)) / len(query_words) if query_words else 0
-    
-    # Weighted score (title is more important)
-    relevance_score = (title_overlap * 0.7) + (desc_overlap * 0.3)
-    return relevance_score
-
 def generate_session_id():
     """Generate unique session ID for tracking"""
     if 'session_id' not in st.session_state:
@@ -296,24 +245,28 @@ def generate_session_id():
     return st.session_state.session_id
 
 def test_api_connections():
-    """Test all API connections"""
+    """Report key, circuit breaker, measured latency and remaining daily quota for every provider"""
+    stats = provider_stats()
     api_status = {}
     
-    # Test GNews API
-    gnews_key = get_api_key("GNEWS_API_KEY")
-    api_status['gnews'] = gnews_key is not None
-    
-    # Test NewsAPI
-    newsapi_key = get_api_key("NEWSAPI_KEY")
-    api_status['newsapi'] = newsapi_key is not None
-    
-    # Test News Data API
-    newsdata_key = get_api_key("NEWSDATA_API_KEY")
-    api_status['newsdata'] = newsdata_key is not None
-    
-    # Test Guardian API
-    guardian_key = get_api_key("GUARDIAN_API_KEY")
-    api_status['guardian'] = guardian_key is not None
+    for api, (_, _, client_name) in API_PROVIDERS.items():
+        # Bing and NewsAPI fall back to the built-in demo keys in providers.py
+        provider = get_provider(api)
+        configured = provider.enabled
+        client = stats.get(client_name, {})
+        state = client.get("state", "closed")
+        quota = provider.limiter.stats() if configured else {}
+        remaining = quota.get("remaining_today")
+        api_status[api] = {
+            "configured": configured,
+            "state": state,
+            "p50_ms": client.get("p50_ms"),
+            "error_rate": client.get("error_rate", 0),
+            "requests": client.get("requests", 0),
+            "remaining_today": remaining,
+            "daily_limit": quota.get("daily_limit"),
+            "working": configured and state != "open" and remaining != 0
+        }
     
     return api_status
 
@@ -321,25 +274,28 @@ def render_api_status():
     """Display API connection status in sidebar"""
     st.sidebar.markdown("### 🔌 API Status")
     
-    # Test API connections
-    with st.spinner("Testing API connections..."):
-        api_status = test_api_connections()
-    
-    # Display status with better formatting
-    api_names = {
-        'gnews': 'GNews API',
-        'newsapi': 'NewsAPI',
-        'newsdata': 'NewsData API', 
-        'guardian': 'Guardian API'
-    }
+    api_status = test_api_connections()
     
+    breaker_emoji = {"closed": "✅", "half-open": "🟡", "open": "🔴"}
     for api, status in api_status.items():
-        emoji = "✅" if status else "❌"
-        name = api_names.get(api, api.replace('_', ' ').title())
-        st.sidebar.markdown(f"{emoji} {name}")
+        name = API_PROVIDERS[api][0]
+        if not status["configured"]:
+            st.sidebar.markdown(f"❌ {name} — no API key")
+            continue
+        emoji = breaker_emoji[status["state"]]
+        if status["p50_ms"] is not None:
+            detail = f"{status['state']} · {status['p50_ms']:.0f} ms p50, {status['error_rate']:.0%} errors"
+        else:
+            detail = f"{status['state']} · no calls yet"
+        if status["daily_limit"] is not None:
+            # Daily request quota shared with every process using RATE_LIMIT_PATH
+            detail += f" · {status['remaining_today']}/{status['daily_limit']} left today"
+            if status["remaining_today"] == 0:
+                emoji = "⛔"
+        st.sidebar.markdown(f"{emoji} {name} — {detail}")
     
     # Show working count
-    working_apis = sum(api_status.values())
+    working_apis = sum(status["working"] for status in api_status.values())
     total_apis = len(api_status)
     st.sidebar.markdown(f"**{working_apis}/{total_apis} APIs working**")
     
@@ -354,6 +310,37 @@ def render_api_status():
     
     return api_status
 
+def admin_enabled():
+    """The admin panel is hidden unless opened with ?admin=1 or ADMIN_PANEL=1"""
+    return st.query_params.get("admin") == "1" or os.getenv("ADMIN_PANEL") == "1"
+
+def render_admin_panel():
+    """Per-stage latency breakdown for diagnosing slow analyses"""
+    with st.sidebar.expander("🛠️ Stage Timings", expanded=False):
+        result = st.session_state.get("result")
+        last = result.timings if result else None
+        if last:
+            st.markdown("**Last analysis (ms)**")
+            st.bar_chart(last, horizontal=True)
+
+        snapshot = metrics.snapshot()
+        if not snapshot["stages"]:
+            st.caption("No timings recorded yet — run an analysis.")
+            return
+        st.markdown("**This process (ms)**")
+        st.dataframe([
+            {
+                "stage": ".".join([s["stage"]] + list(s["labels"].values())),
+                "count": s["count"],
+                "p50": s["p50_ms"],
+                "p95": s["p95_ms"],
+                "p99": s["p99_ms"]
+            }
+            for s in snapshot["stages"]
+        ], hide_index=True)
+        st.download_button("⬇️ Prometheus", metrics.prometheus_text(), "truthlens_metrics.txt", "text/plain")
+        st.download_button("⬇️ JSON", json.dumps(snapshot, indent=2), "truthlens_metrics.json", "application/json")
+
 # Example usage for getting specific API keys
 def get_gnews_key():
     """Get GNews API key"""
@@ -369,192 +356,107 @@ def get_newsdata_key():
 
 
 
-def get_news_references(article_text, num_results=6):
-    """Fetch news references with improved accuracy and relevance scoring"""
-    query = extract_query(article_text)
-    logging.info(f"Searching for references with query: {query!r}")
-    results = []
-    
-    # Try multiple search strategies
-    search_queries = [
-        query,  # Main query
-        ' '.join(query.split()[:3]),  # First 3 words
-        ' '.join(query.split()[-3:]) if len(query.split()) > 3 else query  # Last 3 words
-    ]
-    
-    for search_query in search_queries:
-        if len(results) >= num_results:
-            break
-            
-        # Try Bing News API
+@st.cache_resource(show_spinner=False)
+def prewarm():
+    """Warm up models and heavy imports in the background, once per server process"""
+    def warm():
         try:
-            subscription_key = get_api_key("BING_API_KEY", "b44bOb62d7msh4c3029991170245p180afajsn2077ee7fd1eO")
-            endpoint = "https://bing-news-search1.p.rapidapi.com/news/search"
-            headers = {
-                "X-BingApis-SDK": "true",
-                "X-RapidAPI-Key": subscription_key,
-                "X-RapidAPI-Host": "bing-news-search1.p.rapidapi.com"
-            }
-            params = {
-                "q": search_query,
-                "count": num_results,
-                "textFormat": "Raw",
-                "safeSearch": "Off",
-                "sortBy": "Relevance"
-            }
-            res = requests.get(endpoint, headers=headers, params=params, timeout=15)
-            
-            if res.status_code == 200:
-                for item in res.json().get('value', []):
-                    if len(results) >= num_results:
-                        break
-                    
-                    # Calculate relevance score
-                    relevance = calculate_relevance_score(
-                        item["name"], 
-                        item.get("description", ""), 
-                        query
-                    )
-                    
-                    # Only add if relevance is above threshold
-                    if relevance > 0.1:  # Minimum relevance threshold
-                        results.append({
-                            "title": item["name"],
-                            "description": item.get("description", ""),
-                            "url": item["url"],
-                            "source": item["provider"][0]["name"],
-                            "publishedAt": item["datePublished"],
-                            "urlToImage": item.get("image", {}).get("thumbnail", {}).get("contentUrl", ""),
-                            "relevance": relevance
-                        })
-        except Exception as e:
-            logging.exception("Bing API Exception")
+            get_fast_scorer()
+            import plotly.express, plotly.graph_objects, references
+        except Exception:
+            logging.exception("Pre-warm failed")
     
-    # Try NewsAPI with different queries
-    for search_query in search_queries:
-        if len(results) >= num_results:
-            break
-            
-        try:
-            newsapi_key = get_api_key("NEWSAPI_KEY", "07594036124e431aa51b101ac842a868")
-            params = {
-                "q": search_query,
-                "apiKey": newsapi_key,
-                "pageSize": num_results,
-                "language": "en",
-                "sortBy": "relevancy"
-            }
-            res = requests.get("https://newsapi.org/v2/everything", params=params, timeout=15)
-            
-            if res.status_code == 200:
-                for art in res.json().get("articles", []):
-                    if len(results) >= num_results:
-                        break
-                    
-                    # Calculate relevance score
-                    relevance = calculate_relevance_score(
-                        art["title"], 
-                        art.get("description", ""), 
-                        query
-                    )
-                    
-                    # Only add if relevance is above threshold and not duplicate
-                    if relevance > 0.1 and not any(r['url'] == art['url'] for r in results):
-                        results.append({
-                            "title": art["title"],
-                            "description": art.get("description", ""),
-                            "url": art["url"],
-                            "source": art["source"]["name"],
-                            "publishedAt": art["publishedAt"],
-                            "urlToImage": art.get("urlToImage", ""),
-                            "relevance": relevance
-                        })
-        except Exception as e:
-            logging.exception("NewsAPI Exception")
-    
-    # Sort by relevance score
-    results.sort(key=lambda x: x.get('relevance', 0), reverse=True)
-    
-    # Remove duplicates based on title similarity
-    unique_results = []
-    for result in results:
-        is_duplicate = False
-        for existing in unique_results:
-            # Check if titles are too similar (> 80% overlap)
-            title_words1 = set(result['title'].lower().split())
-            title_words2 = set(existing['title'].lower().split())
-            if len(title_words1) > 0 and len(title_words2) > 0:
-                overlap = len(title_words1.intersection(title_words2)) / min(len(title_words1), len(title_words2))
-                if overlap > 0.8:
-                    is_duplicate = True
-                    break
-        
-        if not is_duplicate:
-            unique_results.append(result)
-    
-    # Final fallback if no results
-    if not unique_results:
-        unique_results.append({
-            "title": "No relevant references found",
-            "description": f"No articles found matching '{query}'. This could indicate the news is very recent, local, or potentially fabricated.",
-            "url": "https://news.google.com/search?q=" + query.replace(" ", "+"),
-            "source": "Google News Search",
-            "publishedAt": datetime.utcnow().isoformat(),
-            "urlToImage": "",
-            "relevance": 0
-        })
-    
-    return unique_results[:num_results]
-
-# Load model with better error handling
-@st.cache_resource
-def load_models():
-    """Load ML models with caching and error handling"""
-    try:
-        model = joblib.load("model95.jb")
-        vectorizer = joblib.load("vectorizer95.jb")
-        return model, vectorizer
-    except Exception as e:
-        st.error("❌ Failed to load ML models. Please check model files.")
-        logging.exception("Failed to load model or vectorizer")
-        st.stop()
+    thread = threading.Thread(target=warm, name="prewarm", daemon=True)
+    thread.start()
+    return thread
 
 def get_prediction_stats():
     """Get statistics from prediction logs"""
-    log_file = "log.csv"
-    if os.path.exists(log_file):
-        try:
-            df = pd.read_csv(log_file)
-            return {
-                "total_predictions": len(df),
-                "real_news": len(df[df['prediction'] == 'Real']),
-                "fake_news": len(df[df['prediction'] == 'Fake']),
-                "avg_confidence": df['confidence'].mean() if 'confidence' in df.columns else 0,
-                "recent_activity": len(df[pd.to_datetime(df['timestamp']) > datetime.now() - timedelta(days=7)])
-            }
-        except Exception as e:
-            logging.exception("Error reading prediction stats")
+    try:
+        return storage.prediction_summary()
+    except Exception as e:
+        logging.exception("Error reading prediction stats")
     return {"total_predictions": 0, "real_news": 0, "fake_news": 0, "avg_confidence": 0, "recent_activity": 0}
 
 
 def get_feedback_stats():
     """Get feedback statistics"""
-    feedback_file = "feedback.csv"
-    if os.path.exists(feedback_file):
-        try:
-            df = pd.read_csv(feedback_file)
-            # Ensure we have the required columns
-            if 'feedback_type' in df.columns and 'overall_rating' in df.columns:
-                return {
-                    "total_feedback": len(df),
-                    "positive_feedback": len(df[df['feedback_type'] == 'positive']),
-                    "negative_feedback": len(df[df['feedback_type'] == 'negative']),
-                    "avg_rating": df['overall_rating'].mean()
-                }
-        except Exception as e:
-            logging.exception("Error reading feedback stats")
+    try:
+        return storage.feedback_summary()
+    except Exception as e:
+        logging.exception("Error reading feedback stats")
     return {"total_feedback": 0, "positive_feedback": 0, "negative_feedback": 0, "avg_rating": 0}
 
+@st.cache_data(ttl=SIDEBAR_REFRESH, show_spinner=False)
+def get_dashboard_stats():
+    """Prediction and feedback statistics for the sidebar, re-read at most every SIDEBAR_REFRESH seconds"""
+    return get_prediction_stats(), get_feedback_stats()
+
+# 📊 Sidebar figures are cached on the numbers they show, so unchanged charts are reused
+@st.cache_resource(show_spinner=False, max_entries=64)
+def prediction_chart(real, fake):
+    """Pie of real vs fake predictions"""
+    import plotly.express as px  # imported lazily to keep first paint fast
+    
+    fig = px.pie(
+        values=[real, fake], 
+        names=['Real News', 'Fake News'],
+        title="Prediction Distribution",
+        color_discrete_sequence=['#28a745', '#dc3545']
+    )
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_color='white',
+        height=450
+    )
+    return fig
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def sentiment_chart(positive, negative):
+    """Donut of positive vs negative feedback"""
+    import plotly.express as px
+    
+    pie = px.pie(
+        names=['Positive', 'Negative'],
+        values=[positive, negative],
+        title="User Sentiment",
+        color_discrete_map={'Positive': '#28a745', 'Negative': '#dc3545'},
+        hole=0.4
+    )
+    pie.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_color='white',
+        height=400,
+        width=400,
+        showlegend=True
+    )
+    return pie
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def rating_chart(avg_rating):
+    """Bar of the average overall rating"""
+    import plotly.express as px
+    
+    rating_fig = px.bar(
+        x=["Avg Rating"],
+        y=[avg_rating],
+        title="Average Feedback Rating",
+        text=[avg_rating],
+        color=["Avg Rating"],
+        color_discrete_sequence=["#007bff"]
+    )
+    rating_fig.update_layout(
+        yaxis=dict(range=[0, 5], tick0=1, dtick=1),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_color='white',
+        height=250,
+        showlegend=False
+    )
+    return rating_fig
+
 def render_header():
     """Render enhanced header with statistics"""
     st.markdown("""
@@ -566,9 +468,14 @@ def render_header():
     
     # Statistics in sidebar
     with st.sidebar:
+        render_sidebar_stats()
+
+@st.fragment(run_every=SIDEBAR_REFRESH)
+def render_sidebar_stats():
+    """Statistics cards and charts; reruns on its own timer as well as with the page"""
+    with metrics.span("render", part="sidebar"):
         st.markdown("### 📊 Statistics")
-        stats = get_prediction_stats()
-        feedback_stats = get_feedback_stats()
+        stats, feedback_stats = get_dashboard_stats()
         
         col1, col2 = st.columns(2)
         with col1:
@@ -594,62 +501,25 @@ def render_header():
                 <div class="stat-label">This Week</div>
             </div>
             """, unsafe_allow_html=True)
-        
+
+        # ⚡ Repeated articles are answered from the shared prediction cache
+        try:
+            cache_stats = prediction_cache.stats()
+            st.caption(f"⚡ Prediction cache: {cache_stats['shared_hit_rate']:.0%} hit rate · {cache_stats['entries']} cached")
+        except Exception as e:
+            logging.error(f"Error reading prediction cache stats: {e}")
+
         if stats['total_predictions'] > 0:
             # Prediction distribution chart
-            fig = px.pie(
-                values=[stats['real_news'], stats['fake_news']], 
-                names=['Real News', 'Fake News'],
-                title="Prediction Distribution",
-                color_discrete_sequence=['#28a745', '#dc3545']
-            )
-            fig.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font_color='white',
-                height=450
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(prediction_chart(stats['real_news'], stats['fake_news']), use_container_width=True)
         
-   
         if feedback_stats['total_feedback'] > 0:
-    # 🎯 Feedback Distribution Pie Chart
-            pie = px.pie(
-                names=['Positive', 'Negative'],
-                values=[feedback_stats['positive_feedback'], feedback_stats['negative_feedback']],
-                title="User Sentiment",
-                color_discrete_map={'Positive': '#28a745', 'Negative': '#dc3545'},
-                hole=0.4
-            )
-            pie.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font_color='white',
-                height=400,
-                width=400,
-                showlegend=True
-            )
-            st.plotly_chart(pie, use_container_width=True)
-
-    # 📊 Overall Rating Bar
-            avg_rating = round(feedback_stats['avg_rating'], 2)
-            rating_fig = px.bar(
-                x=["Avg Rating"],
-                y=[avg_rating],
-                title="Average Feedback Rating",
-                text=[avg_rating],
-                color=["Avg Rating"],
-                color_discrete_sequence=["#007bff"]
-            )
-            rating_fig.update_layout(
-                yaxis=dict(range=[0, 5], tick0=1, dtick=1),
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font_color='white',
-                height=250,
-                showlegend=False
-            )
-            st.plotly_chart(rating_fig, use_container_width=True)
+            # 🎯 Feedback Distribution Pie Chart
+            st.plotly_chart(sentiment_chart(feedback_stats['positive_feedback'], feedback_stats['negative_feedback']),
+                            use_container_width=True)
+
+            # 📊 Overall Rating Bar
+            st.plotly_chart(rating_chart(round(feedback_stats['avg_rating'], 2)), use_container_width=True)
 
 
 def render_input():
@@ -699,8 +569,8 @@ def render_input():
     return st.session_state.article_text
 
 
-def render_feedback_section(session_id, article_text, prediction, confidence):
-    """Render feedback section with emoji buttons and form using session state."""
+def render_feedback_section(session_id, result):
+    """Render feedback section with emoji buttons and form, kept on the analysis result."""
     st.markdown("---")
     st.markdown("### 💬 How accurate was this analysis?")
     st.markdown("""
@@ -721,17 +591,10 @@ def render_feedback_section(session_id, article_text, prediction, confidence):
         ("😠", "Terrible", 1)
     ]
     
-    # Initialize session state flags if not present
-    if 'show_feedback_form' not in st.session_state:
-        st.session_state.show_feedback_form = False
-    if 'selected_feedback' not in st.session_state:
-        st.session_state.selected_feedback = None
-    
-    # Emoji feedback buttons: use on_click callbacks to set session state
+    # Emoji feedback buttons: use on_click callbacks to record the choice on this result
     for i, (emoji, label, rating) in enumerate(feedback_options):
         def on_click_feedback(rating=rating, emoji=emoji, label=label):
-            # Save selected feedback in session state
-            st.session_state.selected_feedback = {
+            result.selected_feedback = {
                 "emoji": emoji,
                 "label": label,
                 "rating": rating,
@@ -739,13 +602,13 @@ def render_feedback_section(session_id, article_text, prediction, confidence):
                          "negative" if rating <= 2 else 
                          "neutral")
             }
-            st.session_state.show_feedback_form = True
+            result.show_feedback_form = True
         
         with cols[i]:
             st.button(f"{emoji}\n{label}", key=f"feedback_{rating}", on_click=on_click_feedback)
     
     # If an emoji was clicked (show_feedback_form flag), display the detailed feedback form
-    if st.session_state.show_feedback_form:
+    if result.show_feedback_form:
         with st.form("detailed_feedback"):
             st.markdown("#### 📝 Additional Comments (Optional)")
             
@@ -774,80 +637,100 @@ def render_feedback_section(session_id, article_text, prediction, confidence):
             
             submitted = st.form_submit_button("Submit Feedback 📤")
             if submitted:
-                # Compile feedback data, using selected_feedback from session state
-                fb = st.session_state.selected_feedback or {}
-                feedback_data = {
-                    "session_id": session_id,
-                    "timestamp": datetime.now().isoformat(),
-                    "article_text": (article_text[:200] + "..." 
-                                     if len(article_text) > 200 else article_text),
-                    "prediction": "Real" if prediction else "Fake",
-                    "confidence": confidence,
-                    "emoji_feedback": fb.get("emoji", "😐"),
-                    "emoji_label": fb.get("label", "Not specified"),
-                    "emoji_rating": fb.get("rating", 3),
-                    "feedback_type": fb.get("type", "neutral"),
-                    "accuracy_rating": accuracy_rating,
-                    "speed_rating": speed_rating,
-                    "ui_rating": ui_rating,
-                    "overall_rating": overall_rating,
-                    "detailed_comments": detailed_comments,
-                    "improvement_areas": ", ".join(improvement_areas) 
-                                         if improvement_areas else "None"
-                }
+                # Compile feedback data for this analysis, using the emoji picked above
+                fb = result.selected_feedback or {}
+                feedback_data = result.feedback_record(
+                    session_id,
+                    emoji_feedback=fb.get("emoji", "😐"),
+                    emoji_label=fb.get("label", "Not specified"),
+                    emoji_rating=fb.get("rating", 3),
+                    feedback_type=fb.get("type", "neutral"),
+                    accuracy_rating=accuracy_rating,
+                    speed_rating=speed_rating,
+                    ui_rating=ui_rating,
+                    overall_rating=overall_rating,
+                    detailed_comments=detailed_comments,
+                    improvement_areas=", ".join(improvement_areas) if improvement_areas else "None"
+                )
                 
                 # Save feedback and show confirmation
-                save_feedback(feedback_data)
+                if save_feedback(feedback_data):
+                    result.feedback_count += 1
                 st.success("🎉 Thank you for your feedback! Your input helps us improve TruthLens.")
                 st.balloons()
                 
                 # Reset the feedback form flag and rerun to hide the form
-                st.session_state.show_feedback_form = False
+                result.show_feedback_form = False
                 st.rerun()
 
 
 def save_feedback(feedback_data):
-    """Save feedback to CSV file"""
+    """Append feedback to the feedback store"""
     try:
-        df = pd.DataFrame([feedback_data])
-        feedback_file = "feedback.csv"
-        
-        # Define required columns to ensure consistency
-        required_columns = [
-            "session_id", "timestamp", "article_text", "prediction", "confidence",
-            "emoji_feedback", "emoji_label", "emoji_rating", "feedback_type",
-            "accuracy_rating", "speed_rating", "ui_rating", "overall_rating",
-            "detailed_comments", "improvement_areas"
-        ]
-        
-        # Append to existing file or create new one
-        if os.path.exists(feedback_file):
-            existing_df = pd.read_csv(feedback_file)
-            # Ensure all required columns exist
-            for col in required_columns:
-                if col not in existing_df.columns:
-                    existing_df[col] = None
-            df = pd.concat([existing_df, df], ignore_index=True)
-        
-        # Save with all required columns
-        df.to_csv(feedback_file, index=False)
-        
+        storage.append_feedback(feedback_data)
+        get_dashboard_stats.clear()  # show our own feedback without waiting for the refresh
         logging.info(f"Feedback saved: {feedback_data['emoji_label']} - {feedback_data['overall_rating']}/5")
+        return True
         
     except Exception as e:
         logging.exception("Failed to save feedback")
         st.error("Failed to save feedback. Please try again.")
-
-def render_results(pred, conf, refs, article_text):
-    """Render enhanced results with better visualization"""
+        return False
+
+def confidence_gauge(result):
+    """Plotly gauge of the model confidence for one result"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure(go.Indicator(
+        mode = "gauge+number",
+        value = result.confidence * 100,
+        domain = {'x': [0, 1], 'y': [0, 1]},
+        title = {'text': "Confidence"},
+        gauge = {
+            'axis': {'range': [None, 100]},
+            'bar': {'color': "lightgreen" if result.prediction == 1 else "salmon"},
+            'steps': [
+                {'range': [0, 50], 'color': "lightgray"},
+                {'range': [50, 100], 'color': "gray"}
+            ],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': 90
+            }
+        }
+    ))
+    fig.update_layout(
+        height=275,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_color='white'
+    )
+    return fig
+
+def render_verdict(result):
+    """Verdict box and confidence gauge; shown as soon as the model has answered"""
+    pred, conf = result.prediction, result.confidence
     # Determine result type and styling
-    if refs and len([r for r in refs if r['title'] != "No references found"]) > 0:
+    if result.references is None:
+        # ⏳ References still on their way: model verdict only
+        if pred == 1:
+            box, lbl, msg = "authentic-box", "✅ Likely Authentic", "Model predicts real. Checking news sources..."
+        else:
+            box, lbl, msg = "danger-box", "❌ Likely Fake News", "Model predicts fake. Checking news sources..."
+    elif result.references_found:
         if pred == 1:
             box, lbl, msg = "authentic-box", "✅ Authentic News", "Verified by multiple credible sources."
             icon = "✅"
         else:
             box, lbl, msg = "warning-box", "⚠️ Potentially Misleading", "Similar content exists, but verify carefully."
             icon = "⚠️"
+    elif any(r.get("unavailable") for r in result.references):
+        # 🔌 Providers busy or down: say so instead of reporting that nothing was found
+        if pred == 1:
+            box, lbl, msg = "authentic-box", "✅ Likely Authentic", "Model predicts real. News sources could not be checked right now."
+        else:
+            box, lbl, msg = "danger-box", "❌ Likely Fake News", "Model predicts fake. News sources could not be checked right now."
     else:
         if pred == 1:
             box, lbl, msg = "authentic-box", "✅ Likely Authentic", "Model predicts real, but no recent references found."
@@ -869,41 +752,21 @@ def render_results(pred, conf, refs, article_text):
         ''', unsafe_allow_html=True)
     
     with col2:
-        # Confidence gauge
-        fig = go.Figure(go.Indicator(
-            mode = "gauge+number",
-            value = conf * 100,
-            domain = {'x': [0, 1], 'y': [0, 1]},
-            title = {'text': "Confidence"},
-            gauge = {
-                'axis': {'range': [None, 100]},
-                'bar': {'color': "lightgreen" if pred == 1 else "salmon"},
-                'steps': [
-                    {'range': [0, 50], 'color': "lightgray"},
-                    {'range': [50, 100], 'color': "gray"}
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 90
-                }
-            }
-        ))
-        fig.update_layout(
-            height=275,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font_color='white'
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        # Confidence gauge, built once per result
+        st.plotly_chart(result.figure("gauge", confidence_gauge), use_container_width=True)
+
+def render_results(result):
+    """Render enhanced results with better visualization"""
+    refs = result.references
+    render_verdict(result)
 
     # Related articles section
     st.markdown("### 📰 Related Articles & Sources")
     
-    if refs and len([r for r in refs if r['title'] != "No references found"]) > 0:
+    if result.references_found:
         cols = st.columns(min(3, len(refs)))
         for i, art in enumerate(refs):
-            if art['title'] != "No references found":
+            if not art.get("placeholder"):
                 with cols[i % 3]:
                     # Enhanced news card
                     img = art.get("urlToImage") or "https://via.placeholder.com/300x150.png?text=No+Image"
@@ -922,33 +785,18 @@ def render_results(pred, conf, refs, article_text):
     
     
 
-    # Log the prediction
-    log_prediction(article_text, pred, conf, len([r for r in refs if r['title'] != "No references found"]) > 0)
+    # Log the prediction (once per analysis, not on every rerun)
+    log_prediction(result)
     
     # Render feedback section
     session_id = generate_session_id()
-    render_feedback_section(session_id, article_text, pred, conf)
+    render_feedback_section(session_id, result)
 
-def log_prediction(article_text, prediction, confidence, references_found):
-    """Log prediction with consistent format"""
+def log_prediction(result):
+    """Log the prediction for an analysis; reruns of the same result write nothing"""
     try:
-        log_data = {
-            "timestamp": datetime.now().isoformat(),
-            "news": article_text[:100] + "..." if len(article_text) > 100 else article_text,
-            "prediction": "Real" if prediction else "Fake",
-            "confidence": confidence,
-            "references_found": references_found
-        }
-        
-        df = pd.DataFrame([log_data])
-        log_file = "log.csv"
-        
-        # Append to existing file or create new one
-        if os.path.exists(log_file):
-            df.to_csv(log_file, mode='a', header=False, index=False)
-        else:
-            df.to_csv(log_file, mode='w', header=True, index=False)
-            
+        if result.log():
+            get_dashboard_stats.clear()  # count this analysis without waiting for the refresh
     except Exception as e:
         logging.exception("Failed to write prediction log")
 
@@ -956,13 +804,15 @@ def log_prediction(article_text, prediction, confidence, references_found):
 
 
 def main():
-    # Load models
-    with st.spinner("🔍 Loading model..."):
-                time.sleep(3)
-                model, vectorizer = load_models()
+    # Optionally start loading the model while the first page renders
+    if os.getenv("PREWARM", "1") == "1":
+        prewarm()
     
     # Render UI components
     render_header()
+    render_api_status()
+    if admin_enabled():
+        render_admin_panel()
     
     # Main content: input and analysis
     text = render_input()  # this updates st.session_state.article_text
@@ -973,20 +823,14 @@ def main():
 
     if st.session_state.analysis_done:
         # If we already have results from before, re-display them
-        render_results(
-            st.session_state.pred, 
-            st.session_state.conf, 
-            st.session_state.refs, 
-            st.session_state.article_text
-        )
+        with metrics.span("render", part="results"):
+            render_results(st.session_state.result)
         
         if st.button("🔄 Analyze Another Article", use_container_width=True):
             # clear everything
             st.session_state.analysis_done = False
             st.session_state.article_text = ""
-            for key in ['pred','conf','refs']:
-                if key in st.session_state:
-                    del st.session_state[key]
+            st.session_state.pop("result", None)
             st.rerun()
     else:
         # Show Analyze button only if not yet done
@@ -994,34 +838,37 @@ def main():
             if not text.strip():
                 st.warning("⚠️ Please enter some text to analyze.")
             else:
-                # Perform analysis with progress
+                # Perform analysis with progress; the verdict is shown as soon as the model answers
                 progress_bar = st.progress(0)
                 status_text = st.empty()
+                verdict_slot = st.empty()
                 try:
-                    status_text.text("🔤 Processing text...")
-                    progress_bar.progress(25)
-                    cleaned = clean_text(text)
-
-                    status_text.text("🤖 Running AI analysis...")
-                    progress_bar.progress(50)
-                    vec = vectorizer.transform([cleaned])
-                    pred = model.predict(vec)[0]
-                    conf = model.predict_proba(vec)[0].max()
-
-                    status_text.text("🌐 Fetching news references...")
-                    progress_bar.progress(75)
-                    refs = get_news_references(text)
-
-                    status_text.text("✅ Analysis complete!")
-                    progress_bar.progress(100)
-
+                    # ⏱️ Every stage below is timed into the trace stored with the prediction
+                    with metrics.trace() as timings, metrics.span("analysis"):
+                        status_text.text("🤖 Running AI analysis and 🌐 fetching news references...")
+                        start = time.perf_counter()
+                        pipeline = analysis_pipeline(text)
+                        result, refs = None, None
+                        for done, (stage, value) in enumerate(pipeline.stream(), 1):
+                            progress_bar.progress(done / len(pipeline.stages))
+                            if stage == "verdict":
+                                metrics.record("time_to_verdict", time.perf_counter() - start)
+                                result = AnalysisResult(text, *value, references=refs)
+                                with verdict_slot.container():
+                                    render_verdict(result)
+                                status_text.text("🌐 Fetching news references...")
+                            elif stage == "references":
+                                refs = value
+                                if result is not None:
+                                    result.references = refs
+                        result.references = refs
+
+                    result.timings = timings
                     progress_bar.empty()
                     status_text.empty()
 
-                    # Save results in session state for persistence
-                    st.session_state.pred = pred
-                    st.session_state.conf = conf
-                    st.session_state.refs = refs
+                    # Save the result in session state; it outlives every rerun until the next analysis
+                    st.session_state.result = result
                     st.session_state.analysis_done = True
 
         
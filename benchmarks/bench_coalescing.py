@@ -0,0 +1,155 @@
+"""Concurrent identical reference lookups against the stub provider server.
+
+Starts N threads that call get_news_references with the same headline at
+the same moment and counts the requests that reach the stub: with request
+coalescing every provider sees each distinct search query exactly once,
+instead of N times. Then checks that a lookup the providers answered with
+no results is served from the negative cache without any upstream request,
+while one no provider answered (every request failed) is not cached, and
+that a failing SingleFlight leader hands its error to every waiter without
+being remembered, and that the negative cache stays within its size cap.
+Exits non-zero if any check fails:
+
+    python benchmarks/bench_coalescing.py --callers 50 --latency 0.3
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import provider_client
+import providers
+import references
+from coalesce import SingleFlight, NegativeCache
+from reference_cache import ReferenceCache
+from stub_server import StubNewsServer
+
+HEADLINE = "India defeats South Africa to win ICC T20 World Cup 2024 in a thrilling final match at Barbados"
+
+
+def concurrent_lookups(callers, text):
+    barrier = threading.Barrier(callers)
+    results = [None] * callers
+
+    def call(i):
+        barrier.wait()
+        results[i] = references.get_news_references(text)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, time.perf_counter() - start
+
+
+def shared_failure(callers):
+    """True if every concurrent caller gets the leader's error and the next call runs again"""
+    flight = SingleFlight()
+    release = threading.Event()
+    runs = []
+    errors = []
+
+    def failing():
+        runs.append(1)
+        release.wait()
+        raise RuntimeError("provider down")
+
+    def call():
+        try:
+            flight.do("key", failing)
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for t in threads:
+        t.start()
+    while flight.stats()["shared"] < callers - 1:
+        time.sleep(0.001)
+    release.set()
+    for t in threads:
+        t.join()
+    again = flight.do("key", lambda: "answer")
+    print(f"failing leader: {len(runs)} run for {callers} callers, {len(errors)} got its error, "
+          f"next call returned {again!r}")
+    return len(runs) == 1 and len(errors) == callers and again == "answer"
+
+
+def bounded_negative_cache(max_entries=100, keys=10000):
+    """True if a flood of distinct empty queries keeps only the newest ``max_entries``"""
+    cache = NegativeCache(ttl=60, max_entries=max_entries)
+    for i in range(keys):
+        cache.add(i)
+    newest = all(i in cache for i in range(keys - max_entries, keys))
+    print(f"negative cache: {len(cache)} of {keys} keys kept (cap {max_entries}), newest kept: {newest}, "
+          f"oldest evicted: {0 not in cache}")
+    return len(cache) == max_entries and newest and 0 not in cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--callers", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    references.reference_cache = ReferenceCache(path=":memory:")
+    # Measure the provider path; the local corroboration index would answer repeats
+    references.LOCAL_INDEX = False
+    query = references.extract_query(HEADLINE)
+    search_queries = {query, " ".join(query.split()[:3]), " ".join(query.split()[-3:])}
+    ok = True
+
+    with StubNewsServer(latency={"bing": args.latency, "newsapi": args.latency}, page_size=1) as stub:
+        stub.point(providers.PROVIDERS)
+
+        results, elapsed = concurrent_lookups(args.callers, HEADLINE)
+        same = all(r == results[0] for r in results)
+        print(f"{args.callers} concurrent lookups in {elapsed:.2f}s, identical results: {same}")
+        for provider in ("bing", "newsapi"):
+            hits = stub.hits.get(provider, 0)
+            print(f"  {provider}: {hits} upstream requests for {len(search_queries)} distinct queries "
+                  f"(uncoalesced: up to {args.callers * len(search_queries)})")
+            ok = ok and hits <= len(search_queries)
+        print(f"  lookups shared: {references.lookups.stats()['shared']}, "
+              f"provider calls shared: {references.provider_calls.stats()['shared']}")
+        ok = ok and same
+
+    # Every provider answers with no articles: the "no references" answer is cached for NEGATIVE_CACHE_TTL seconds
+    with StubNewsServer(page_size=0) as stub:
+        stub.point(providers.PROVIDERS)
+        text = "Local council approves new parking rules for the harbour district"
+        first = references.get_news_references(text)
+        upstream = sum(stub.hits.values())
+        second, elapsed = concurrent_lookups(args.callers, text)
+        repeated = sum(stub.hits.values()) - upstream
+        print(f"no-result lookup: {upstream} upstream requests, then {args.callers} repeats "
+              f"in {elapsed * 1000:.1f}ms with {repeated} more")
+        ok = ok and first[0]["title"] == "No relevant references found" and repeated == 0
+
+    # Every provider fails: nothing was learned, so the next lookup asks again
+    with StubNewsServer(error_rate=1.0) as stub:
+        stub.point(providers.PROVIDERS)
+        for client in provider_client._clients.values():
+            client.breaker.record_success()
+        text = "Harbour district parking rules delayed after council vote"
+        first = references.get_news_references(text)
+        upstream = sum(stub.hits.values())
+        # The breakers opened on those failures; close them so only the negative cache could skip the providers
+        for client in provider_client._clients.values():
+            client.breaker.record_success()
+        references.get_news_references(text)
+        repeated = sum(stub.hits.values()) - upstream
+        print(f"failed lookup: {first[0]['title']!r}, asked again with {repeated} upstream requests")
+        ok = ok and first[0].get("unavailable") and repeated > 0
+
+    ok = shared_failure(args.callers) and ok
+    ok = bounded_negative_cache() and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Local corroboration index: search, add and reload times, and local vs network lookups.
+
+Fills a throwaway index with synthetic stories drawn from the model's
+vocabulary, then times top-k searches (and checks them against a
+brute-force scan of the same vectors), incremental additions, and loading
+the index from disk in a fresh instance. Finally it looks up references for
+one headline through the stub providers, and again once stories covering it
+have been indexed (as feed ingestion would), where it is answered locally:
+
+    python benchmarks/bench_corroboration.py --sizes 10000,100000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import providers
+import references
+import scoring
+from corroboration import CorroborationIndex
+from reference_cache import ReferenceCache
+from stub_server import StubNewsServer
+
+HEADLINE = "India defeats South Africa to win ICC T20 World Cup 2024 in a thrilling final match at Barbados"
+
+
+def stories(vocabulary, count, seed):
+    rng = random.Random(seed)
+    return [{
+        "title": " ".join(rng.choice(vocabulary) for _ in range(10)),
+        "description": " ".join(rng.choice(vocabulary) for _ in range(30)),
+        "url": f"https://example.com/{seed}/{i}",
+        "source": "example.com"
+    } for i in range(count)]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def brute_force(index, docs, text, k, min_score):
+    matrix = index._vectorize([f"{d['title']} {d['description']}" for d in docs])
+    scores = (matrix @ index._vectorize([text]).T).toarray().ravel()
+    best = [i for i in np.argsort(-scores, kind="stable")[:k] if scores[i] >= min_score]
+    return [docs[i]["url"] for i in best]
+
+
+def index_benchmark(size, vocabulary, queries, tmp):
+    path = os.path.join(tmp, f"corroboration-{size}.db")
+    index = CorroborationIndex(path)
+    docs = stories(vocabulary, size, seed=size)
+    _, build = timed(lambda: [index.add(docs[i:i + 1000]) for i in range(0, size, 1000)])
+
+    texts = [docs[random.Random(i).randrange(size)]["title"] for i in range(queries)]
+    latencies = [timed(index.search, text, 6, 0.1)[1] for text in texts]
+
+    # Rankings must match a plain scan over the same vectors (ties aside, scores are distinct here)
+    sample = texts[:5]
+    exact = all([m["url"] for m in index.search(text, 6, 0.1)] == brute_force(index, docs, text, 6, 0.1)
+                for text in sample)
+
+    extra = stories(vocabulary, 100, seed=-size)
+    _, add = timed(lambda: [index.add([doc]) for doc in extra])
+
+    fresh = CorroborationIndex(path)
+    _, reload = timed(len, fresh)
+    print(f"{size:>8}{build:>10.2f}{statistics.median(latencies) * 1000:>12.2f}"
+          f"{sorted(latencies)[int(len(latencies) * 0.99) - 1] * 1000:>12.2f}"
+          f"{add / len(extra) * 1000:>12.2f}{reload:>11.2f}   {'yes' if exact else 'NO'}")
+    return exact
+
+
+def lookup_benchmark(latency, vocabulary):
+    references.reference_cache = ReferenceCache(path=":memory:")
+    references.corroboration_index = CorroborationIndex(path=":memory:")
+    with StubNewsServer(latency={provider.id: latency for provider in providers.PROVIDERS}) as stub:
+        stub.point(providers.PROVIDERS)
+        references.LOCAL_INDEX = False
+        network, network_time = timed(references.get_news_references, HEADLINE)
+
+        # The same story as ingested feeds would have indexed it, among unrelated ones
+        rng = random.Random(1)
+        words = HEADLINE.split()
+        covered = [{
+            "title": " ".join(rng.sample(words, 10)),
+            "description": " ".join(rng.sample(words, 8) + rng.sample(vocabulary, 12)),
+            "url": f"https://feeds.example.com/t20/{i}",
+            "source": "feeds.example.com"
+        } for i in range(6)]
+        references.corroboration_index.add(stories(vocabulary, 10000, seed=3) + covered)
+        references.reference_cache.clear()
+        references.LOCAL_INDEX = True
+        before = sum(stub.hits.values())
+        local, local_time = timed(references.get_news_references, HEADLINE)
+        upstream = sum(stub.hits.values()) - before
+    print(f"network lookup: {network_time * 1000:8.1f} ms, {len(network)} references")
+    print(f"local lookup:   {local_time * 1000:8.1f} ms, {len(local)} references "
+          f"({sum(r['provider'] == 'Local' for r in local)} local, {upstream} provider requests)")
+    return all(r["provider"] == "Local" for r in local) and upstream == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000", help="comma-separated index sizes")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.3, help="stub latency per provider request")
+    args = parser.parse_args()
+
+    _, vectorizer = scoring.get_artifacts()
+    vocabulary = [str(term) for term in vectorizer.get_feature_names_out()]
+    tmp = tempfile.mkdtemp()
+
+    ok = True
+    print(f"{'docs':>8}{'build s':>10}{'search p50':>12}{'search p99':>12}{'add ms/doc':>12}{'reload s':>11}   exact")
+    for size in (int(s) for s in args.sizes.split(",")):
+        ok = index_benchmark(size, vocabulary, args.queries, tmp) and ok
+    print()
+    ok = lookup_benchmark(args.latency, vocabulary) and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Near-duplicate removal: MinHash/LSH Deduplicator vs the old pairwise scan.
+
+Generates synthetic article titles with a share of reworded duplicates and
+compares runtime and output of both approaches as the candidate count grows.
+Then checks that a Deduplicator with ``max_items`` (as used by feed
+ingestion) stays within its window over a long stream, and exits non-zero
+if it does not:
+
+    python benchmarks/bench_dedup.py --sizes 100 1000 5000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dedup import Deduplicator
+
+# Zipf-weighted pseudo-vocabulary, roughly like headline word frequencies
+WORDS = [f"w{i}" for i in range(3000)]
+WEIGHTS = [1 / (rank + 1) for rank in range(len(WORDS))]
+
+
+def synthetic_titles(n, duplicate_share=0.3, seed=7):
+    rng = random.Random(seed)
+    titles = []
+    for _ in range(n):
+        if titles and rng.random() < duplicate_share:
+            words = rng.choice(titles).split()
+            words[rng.randrange(len(words))] = rng.choices(WORDS, WEIGHTS)[0]  # reworded copy
+            if rng.random() < 0.5:
+                words = words[:-1]  # and sometimes trimmed
+        else:
+            words = rng.choices(WORDS, WEIGHTS, k=rng.randint(6, 14))
+        titles.append(" ".join(words))
+    return titles
+
+
+def pairwise(titles):
+    """The previous get_news_references dedup loop"""
+    unique = []
+    for title in titles:
+        is_duplicate = False
+        for existing in unique:
+            title_words1 = set(title.lower().split())
+            title_words2 = set(existing.lower().split())
+            if len(title_words1) > 0 and len(title_words2) > 0:
+                overlap = len(title_words1.intersection(title_words2)) / min(len(title_words1), len(title_words2))
+                if overlap > 0.8:
+                    is_duplicate = True
+                    break
+        if not is_duplicate:
+            unique.append(title)
+    return unique
+
+
+def recent_repeats(n, window, seed=11):
+    """Titles where every repeat copies an original from the last ``window // 2`` titles"""
+    rng = random.Random(seed)
+    titles, originals = [], []
+    for i in range(n):
+        recent = [title for position, title in originals[-window // 2:] if position >= i - window // 2]
+        if recent and rng.random() < 0.3:
+            titles.append(rng.choice(recent))
+        else:
+            # Uniform words, so distinct originals do not collide by chance
+            titles.append(" ".join(rng.sample(WORDS, rng.randint(6, 14))))
+            originals.append((i, titles[-1]))
+    return titles
+
+
+def bounded(n, window):
+    """True if a windowed Deduplicator stays within ``window`` and still drops every recent repeat"""
+    titles = recent_repeats(n, window)
+    dedup = Deduplicator(max_items=window)
+    unbounded = Deduplicator()
+    agree = True
+    peak_urls = peak_items = peak_buckets = 0
+    for i, title in enumerate(titles):
+        url = f"https://example.com/{i}"
+        agree = (dedup.is_new(title, url) == unbounded.is_new(title, url)) and agree
+        peak_urls = max(peak_urls, len(dedup.urls))
+        peak_items = max(peak_items, len(dedup.index))
+        peak_buckets = max(peak_buckets, sum(len(b) for b in dedup.index.buckets.values()))
+    within = peak_urls <= window and peak_items <= window and peak_buckets <= window * dedup.index.bands
+    print(f"\nwindow {window} over {n} items: at most {peak_items} texts, {peak_urls} URLs, "
+          f"{peak_buckets} bucket entries kept (unbounded: {len(unbounded.index)} texts); "
+          f"same output as unbounded: {'yes' if agree else 'NO'}")
+    return within and agree
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 3000])
+    args = parser.parse_args()
+
+    print(f"{'items':>7}{'pairwise (s)':>14}{'lsh (s)':>10}{'kept old':>10}{'kept new':>10}{'agree':>8}")
+    for n in args.sizes:
+        titles = synthetic_titles(n)
+        start = time.perf_counter()
+        old = pairwise(titles)
+        old_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        dedup = Deduplicator()
+        new = [t for t in titles if dedup.is_new(t)]
+        new_time = time.perf_counter() - start
+
+        agree = len(set(old) & set(new)) / max(len(set(old) | set(new)), 1)
+        print(f"{n:>7}{old_time:>14.3f}{new_time:>10.3f}{len(old):>10}{len(new):>10}{agree:>8.1%}")
+
+    sys.exit(0 if bounded(20000, 1000) else 1)
+
+
+if __name__ == "__main__":
+    main()
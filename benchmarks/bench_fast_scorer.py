@@ -0,0 +1,86 @@
+"""Microbenchmark and equivalence check: FastScorer vs the sklearn path.
+
+Scores single headlines and batches with both engines, prints per-document
+latency, and exits non-zero if any probability differs by more than the
+tolerance or any label differs. When the compact export (compact_model.py)
+is current, its transform and a FastScorer built from it are checked too:
+
+    python benchmarks/bench_fast_scorer.py --batch 1000
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import joblib
+import numpy as np
+
+import compact_model
+from fast_scorer import FastScorer
+from scoring import MODEL_PATH, VECTORIZER_PATH, clean_text
+
+TOLERANCE = 1e-9
+# Edge cases on top of the sampled corpus: no terms, only unknown terms, one term repeated
+EDGE_DOCS = ["", "zzqx qqzv xxyzzy", "election " * 200]
+
+
+def per_doc_us(fn, docs, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(docs)
+    return (time.perf_counter() - start) / (repeat * len(docs)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    model, vectorizer = joblib.load(MODEL_PATH), joblib.load(VECTORIZER_PATH)
+    scorer = FastScorer.from_artifacts(model, vectorizer)
+    docs = [clean_text(doc) for doc in compact_model.sample_corpus(vectorizer, extra_docs=args.batch) + EDGE_DOCS]
+
+    # Equivalence within float tolerance
+    expected = model.predict_proba(vectorizer.transform(docs))[:, 1]
+    actual = 1 / (1 + np.exp(-scorer.decision_function(docs)))
+    single = np.array([scorer.score_one(doc)[0] for doc in docs])
+    max_diff = float(np.abs(expected - actual).max())
+    labels_match = bool((model.predict(vectorizer.transform(docs)) == single).all())
+    print(f"{len(docs)} documents: max probability difference {max_diff:.2e}, labels identical: {labels_match}")
+
+    if compact_model.is_current(compact_model.COMPACT_DIR, MODEL_PATH, VECTORIZER_PATH):
+        compact, compact_vectorizer = compact_model.load_compact()
+        via_transform = compact.predict_proba(compact_vectorizer.transform(docs))[:, 1]
+        compact_scorer = FastScorer.from_artifacts(compact, compact_vectorizer)
+        via_scorer = 1 / (1 + np.exp(-compact_scorer.decision_function(docs)))
+        compact_diff = float(max(np.abs(expected - via_transform).max(), np.abs(expected - via_scorer).max()))
+        compact_labels = bool((compact.predict(compact_vectorizer.transform(docs)) == single).all())
+        print(f"compact export: max probability difference {compact_diff:.2e}, labels identical: {compact_labels}")
+        max_diff = max(max_diff, compact_diff)
+        labels_match = labels_match and compact_labels
+    else:
+        print("compact export missing or stale, skipped (python compact_model.py export)")
+
+    def sklearn_path(batch):
+        vec = vectorizer.transform(batch)
+        return model.predict(vec), model.predict_proba(vec)
+
+    headline = [docs[0]]
+    print(f"\n{'case':<22}{'sklearn (us/doc)':>18}{'fast (us/doc)':>16}{'speed-up':>10}")
+    for label, batch, repeat in [("single headline", headline, 200 * args.repeat),
+                                 (f"batch of {len(docs)}", docs, args.repeat)]:
+        slow = per_doc_us(sklearn_path, batch, repeat)
+        fast = per_doc_us(scorer.score, batch, repeat)
+        print(f"{label:<22}{slow:>18.1f}{fast:>16.1f}{slow / fast:>9.1f}x")
+
+    if max_diff > TOLERANCE or not labels_match:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Feed ingestion throughput against local feed files and the stub HTTP server.
+
+Runs ingest.run_ingest in single-pass mode on a throwaway database:
+
+* local RSS files: first pass scores everything, second pass skips the
+  unchanged files;
+* stub feeds: first pass scores everything, second pass gets 304s, third
+  pass picks up only newly published stories.
+
+    python benchmarks/bench_ingest.py --feeds 8 --items 500
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ingest
+import storage
+from corroboration import CorroborationIndex
+from stub_server import StubNewsServer, rss_document
+
+
+def report(label, stats):
+    print(f"{label:<28} {stats['scored']:>6} scored {stats['skipped']:>5} dup "
+          f"{stats['not_modified']:>3} unchanged  {stats['seconds']:6.2f}s  {stats['items_per_sec']:8.0f} items/sec")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--feeds", type=int, default=8)
+    parser.add_argument("--items", type=int, default=500, help="items per feed")
+    parser.add_argument("--batch-size", type=int, default=ingest.INGEST_BATCH_SIZE)
+    parser.add_argument("--queue-size", type=int, default=ingest.INGEST_QUEUE_SIZE)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    tmp = tempfile.mkdtemp()
+    # Keep the legacy CSV import out of the throwaway databases
+    storage.LEGACY_LOG_CSV = storage.LEGACY_FEEDBACK_CSV = os.path.join(tmp, "missing.csv")
+    options = dict(once=True, batch_size=args.batch_size, queue_size=args.queue_size,
+                   index=CorroborationIndex(os.path.join(tmp, "corroboration.db")))
+    ok = True
+
+    with StubNewsServer(feed_size=args.items) as stub:
+        for feed in range(args.feeds):
+            stub.publish(str(feed), args.items)
+        paths = []
+        for feed in range(args.feeds):
+            path = os.path.join(tmp, f"feed{feed}.xml")
+            with open(path, "wb") as f:
+                f.write(rss_document(f"local {feed}", stub.feed_items[str(feed)]))
+            paths.append(path)
+
+        db = os.path.join(tmp, "local.db")
+        first = report("local files, first pass", ingest.run_ingest(paths, db_path=db, **options))
+        second = report("local files, unchanged", ingest.run_ingest(paths, db_path=db, **options))
+        ok = ok and second["scored"] == 0 and second["not_modified"] == args.feeds
+
+        urls = [f"{stub.url}/feed/{feed}" for feed in range(args.feeds)]
+        db = os.path.join(tmp, "stub.db")
+        first = report("stub feeds, first pass", ingest.run_ingest(urls, db_path=db, **options))
+        second = report("stub feeds, 304 pass", ingest.run_ingest(urls, db_path=db, **options))
+        stub.publish("0", 25)
+        third = report("stub feeds, 25 new stories", ingest.run_ingest(urls, db_path=db, **options))
+        ok = ok and second["scored"] == 0 and second["not_modified"] == args.feeds and third["scored"] == 25
+
+        stored = storage.prediction_summary(db)["total_predictions"]
+        print(f"stored predictions: {stored} (expected {first['scored'] + 25})")
+        ok = ok and stored == first["scored"] + 25
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
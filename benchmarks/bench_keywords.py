@@ -0,0 +1,61 @@
+"""Latency of extract_query: TF-IDF backend vs the original TextBlob extractor.
+
+Times short (headline) and long (multi-paragraph) inputs with the memo
+cleared on every call, then the memoized repeat:
+
+    python benchmarks/bench_keywords.py --repeat 50
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import keywords
+
+SHORT = "India defeats South Africa to win ICC T20 World Cup 2024 in a thrilling final match at Barbados"
+LONG = " ".join([
+    "Scientists claim to have discovered a universal cure for all diseases using advanced AI technology.",
+    "The announcement, made at a press conference in Geneva on Monday, drew immediate skepticism from",
+    "independent researchers, who noted that no peer-reviewed study has been published.",
+    "The World Health Organization said it was not consulted and urged the public to rely on verified sources.",
+] * 15)
+
+
+def time_ms(backend, text, repeat, memo):
+    samples = []
+    for _ in range(repeat):
+        if not memo:
+            keywords.clear_memo()
+        start = time.perf_counter()
+        keywords.extract_query(text, backend)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    # Warm up: IDF table, TextBlob corpora and taggers
+    for backend in keywords.BACKENDS:
+        keywords.extract_query(SHORT, backend)
+    try:
+        keywords.textblob_keywords(SHORT)
+    except Exception as e:
+        print(f"note: TextBlob backend unavailable ({type(e).__name__}); it falls back to sentence extraction\n")
+
+    print(f"{'input':<8}{'backend':<10}{'cold p50 (ms)':>15}{'memoized (ms)':>15}")
+    for label, text in [("short", SHORT), ("long", LONG)]:
+        for backend in ("textblob", "tfidf"):
+            cold = time_ms(backend, text, args.repeat, memo=False)
+            warm = time_ms(backend, text, args.repeat, memo=True)
+            print(f"{label:<8}{backend:<10}{cold:>15.3f}{warm:>15.4f}")
+        print(f"{'':<8}query: {keywords.extract_query(text, 'tfidf')!r}")
+
+
+if __name__ == "__main__":
+    main()
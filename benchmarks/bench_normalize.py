@@ -0,0 +1,115 @@
+"""Parity and throughput of normalize.clean_text against the training notebook.
+
+Checks that the shared normalization gives the same vectorizer tokens as
+the notebook's clean_text on log.csv, feedback.csv and random strings
+heavy in URLs, mentions, hashtags, digits and punctuation, then times
+single and batch cleaning against the notebook and the old serving
+clean_text:
+
+    python benchmarks/bench_normalize.py --docs 20000
+"""
+import argparse
+import csv
+import os
+import random
+import re
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from normalize import clean_text, clean_texts
+
+TOKEN_RE = re.compile(r"(?u)\b\w\w+\b")  # TfidfVectorizer's default token_pattern
+
+
+def notebook_clean_text(text):
+    """Verbatim from model traing/training95.ipynb"""
+    text = text.lower()
+    text = re.sub(r'http\S+|www\S+|https\S+', '', text, )
+    text = re.sub(r'\@\w+|\#', '', text)
+    text = re.sub(r'\d+', '', text)
+    text = re.sub("[%s]" % re.escape(string.punctuation), "", text)
+    text = re.sub("\n" ,"" , text)
+
+    return text
+
+
+def old_serving_clean_text(text):
+    """scoring.clean_text before the shared module"""
+    if not text:
+        return ""
+    text = text.lower()
+    text = re.sub(f"[{re.escape(string.punctuation)}]", "", text)
+    text = re.sub(r"\s+", " ", text)
+    return text.strip()
+
+
+def repo_texts():
+    texts = []
+    for path, column in (("log.csv", "news"), ("feedback.csv", "article_text")):
+        if os.path.exists(path):
+            with open(path, newline="", encoding="utf-8") as f:
+                texts += [row[column] for row in csv.DictReader(f) if row.get(column)]
+    return texts
+
+
+def fuzz_texts(count, seed=13):
+    rng = random.Random(seed)
+    pieces = ["http://t.co/x1", "https://www.bbc.co.uk/news", "www.example.com", "xhttpy", "awwwards",
+              "@user_1", "@", "#tag", "#", "2024", "T20", "covid19", "3.5%", "U.S.", "don't", "e-mail",
+              "café", "ΣΑΣ", "रवींद्र", "१२३", "\t", "  ", "!!", "(a)", "[b]", "_x_", "@@x", "#@y", "a@http://z",
+              "(@user)", ".@CNN", "2@bob", "RT:@user", "@realDonaldTrump)", "x.@y_z"]
+    words = "india wins world cup government says new study finds fake claim vaccine".split()
+    return [" ".join(rng.choice(pieces + words) for _ in range(rng.randint(1, 40))) for _ in range(count)]
+
+
+def tokens(text):
+    return TOKEN_RE.findall(text)
+
+
+def throughput(fn, docs, batch=False):
+    start = time.perf_counter()
+    if batch:
+        fn(docs)
+    else:
+        for doc in docs:
+            fn(doc)
+    return len(docs) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=20000)
+    args = parser.parse_args()
+
+    samples = repo_texts() + fuzz_texts(5000)
+    mismatches = [text for text in samples if tokens(clean_text(text)) != tokens(notebook_clean_text(text))]
+    batch_ok = clean_texts(samples) == [clean_text(text) for text in samples] and clean_texts([]) == []
+    skewed = sum(tokens(old_serving_clean_text(text)) != tokens(notebook_clean_text(text)) for text in samples)
+    print(f"parity with notebook: {len(samples) - len(mismatches)}/{len(samples)} documents")
+    print(f"clean_texts == clean_text: {batch_ok}")
+    print(f"old serving clean_text disagreed with training on {skewed}/{len(samples)} documents")
+    for text in mismatches[:5]:
+        print(f"  mismatch: {text!r}")
+
+    # Newlines: identical tokens once the notebook's newline deletion is taken out of the picture
+    multiline = [text.replace(" ", "\n", 2) for text in samples[:500]]
+    newline_ok = all(tokens(clean_text(text)) == tokens(notebook_clean_text(text.replace("\n", " ")))
+                     for text in multiline)
+    print(f"newlines treated as spaces: {newline_ok}")
+
+    docs = (samples * (args.docs // len(samples) + 1))[:args.docs]
+    print(f"\n{'implementation':<28}{'docs/sec':>12}")
+    for label, fn, batch in [("notebook clean_text", notebook_clean_text, False),
+                             ("old serving clean_text", old_serving_clean_text, False),
+                             ("normalize.clean_text", clean_text, False),
+                             ("normalize.clean_texts", clean_texts, True)]:
+        print(f"{label:<28}{throughput(fn, docs, batch):>12.0f}")
+
+    sys.exit(0 if not mismatches and batch_ok and newline_ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Scaling of process-pool batch scoring on a synthetic corpus.
+
+Builds documents from the fitted TF-IDF vocabulary and scores them with
+1..N worker processes, printing docs/sec and speed-up over one process:
+
+    python benchmarks/bench_parallel_scoring.py --docs 200000 --max-workers 8
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scoring
+
+
+def synthetic_corpus(vocabulary, docs, words_per_doc, seed=42):
+    rng = random.Random(seed)
+    return [(i, ' '.join(rng.choices(vocabulary, k=words_per_doc))) for i in range(docs)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--words-per-doc", type=int, default=60)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=scoring.CHUNK_SIZE)
+    args = parser.parse_args()
+
+    model, vectorizer = scoring.load_artifacts()
+    corpus = synthetic_corpus(list(vectorizer.get_feature_names_out()), args.docs, args.words_per_doc)
+
+    print(f"{'workers':>8}{'docs/sec':>12}{'speed-up':>10}")
+    baseline = None
+    workers = 1
+    while workers <= args.max_workers:
+        start = time.perf_counter()
+        if workers == 1:
+            results = scoring.score_stream(iter(corpus), model, vectorizer, args.chunk_size)
+        else:
+            results = scoring.score_stream_parallel(iter(corpus), workers, args.chunk_size)
+        count = sum(1 for _ in results)
+        rate = count / (time.perf_counter() - start)
+        baseline = baseline or rate
+        print(f"{workers:>8}{rate:>12.0f}{rate / baseline:>9.2f}x")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
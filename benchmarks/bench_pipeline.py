@@ -0,0 +1,123 @@
+"""Time to first verdict: sequential analysis vs the stage pipeline.
+
+Runs the analysis the way main() used to (load model, classify, then look
+up references, with nothing shown until the end) and through
+analysis.analysis_pipeline, where the verdict is yielded as soon as the
+model answers while the references are still being fetched. Providers are
+served by the local stub with a fixed latency. Every run uses a new
+article, so neither the prediction cache nor the reference cache helps.
+The first run of each mode starts with the model unloaded. Two checks
+follow, and the script exits non-zero if either fails: a verdict must
+still arrive within one provider latency while other analyses hold their
+reference lookups open, and a stage queued behind a busy worker must get its
+whole timeout once it starts:
+
+    python benchmarks/bench_pipeline.py --runs 10 --latency 0.5
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import providers
+import references
+import scoring
+from analysis import analysis_pipeline
+from pipeline import MAX_WORKERS, Pipeline, Stage
+from prediction_cache import PredictionCache
+from reference_cache import ReferenceCache
+from stub_server import StubNewsServer, WORDS
+
+
+def articles(count, seed):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(40)) for _ in range(count)]
+
+
+def unload_model():
+    scoring._artifacts = None
+    scoring._fast_scorer = None
+
+
+def sequential(text):
+    """(time to verdict, total); the old UI showed the verdict only once references were in"""
+    start = time.perf_counter()
+    scoring.get_fast_scorer()
+    scoring.cached_score_texts([text])
+    references.get_news_references(text)
+    total = time.perf_counter() - start
+    return total, total
+
+
+def pipelined(text):
+    start = time.perf_counter()
+    verdict = None
+    for stage, _ in analysis_pipeline(text).stream():
+        if stage == "verdict":
+            verdict = time.perf_counter() - start
+    return verdict, time.perf_counter() - start
+
+
+def verdict_while_busy(latency):
+    """Seconds to a verdict while MAX_WORKERS other analyses are waiting on providers"""
+    busy = [threading.Thread(target=pipelined, args=(text,)) for text in articles(MAX_WORKERS, seed=3)]
+    for t in busy:
+        t.start()
+    time.sleep(latency / 5)
+    verdict, _ = pipelined(articles(1, seed=4)[0])
+    for t in busy:
+        t.join()
+    return verdict
+
+
+def queued_timeout():
+    """True if a timed stage that waited for the only worker still finishes"""
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        result = Pipeline([
+            Stage("slow", lambda: time.sleep(0.3)),
+            Stage("quick", lambda: time.sleep(0.1) or "done", timeout=0.2, fallback=lambda: "timed out"),
+        ], executor=executor).run()
+    return result["quick"] == "done"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.5, help="stub latency per provider request")
+    args = parser.parse_args()
+
+    scoring.prediction_cache = PredictionCache(path=":memory:")
+    references.reference_cache = ReferenceCache(path=":memory:")
+    # Measure the provider path; the local corroboration index would answer repeats
+    references.LOCAL_INDEX = False
+    latency = {provider.id: args.latency for provider in providers.PROVIDERS}
+
+    rows = []
+    with StubNewsServer(latency=latency, page_size=2) as stub:
+        stub.point(providers.PROVIDERS)
+        for label, analyze, seed in [("sequential", sequential, 1), ("pipeline", pipelined, 2)]:
+            unload_model()
+            texts = articles(args.runs + 1, seed)
+            cold = analyze(texts[0])
+            warm = [analyze(text) for text in texts[1:]]
+            rows.append((label, cold, statistics.median(v for v, _ in warm), statistics.median(t for _, t in warm)))
+        busy = verdict_while_busy(args.latency)
+
+    print(f"{'mode':<12}{'cold verdict':>14}{'cold total':>12}{'verdict p50':>13}{'total p50':>11}   (seconds)")
+    for label, (cold_verdict, cold_total), verdict, total in rows:
+        print(f"{label:<12}{cold_verdict:>14.3f}{cold_total:>12.3f}{verdict:>13.3f}{total:>11.3f}")
+
+    queued = queued_timeout()
+    print(f"\nverdict with {MAX_WORKERS} lookups in flight: {busy:.3f}s (provider latency {args.latency:g}s)")
+    print(f"stage queued behind a busy worker kept its timeout: {'yes' if queued else 'NO'}")
+    sys.exit(0 if busy < args.latency and queued else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Replay log.csv through the prediction cache and compare with uncached scoring.
+
+Uses a throwaway cache file, so the real prediction_cache.db is untouched.
+Checks that cached results equal fast_score_texts, that a second process
+sees the first one's entries, and that a new artifact version misses:
+
+    python benchmarks/bench_prediction_cache.py
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scoring
+from prediction_cache import PredictionCache, content_key
+
+
+def load_texts():
+    with open("log.csv", newline="", encoding="utf-8") as f:
+        return [row["news"] for row in csv.DictReader(f) if row.get("news")]
+
+
+def median_ms(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2] * 1000 if samples else 0
+
+
+def replay(texts, cache):
+    hit_times, miss_times = [], []
+    for text in texts:
+        before = cache.hits
+        start = time.perf_counter()
+        scoring.cached_score_texts([text], cache)
+        elapsed = time.perf_counter() - start
+        (hit_times if cache.hits > before else miss_times).append(elapsed)
+    return hit_times, miss_times
+
+
+def other_process_hits(path, texts):
+    cache = PredictionCache(path)
+    scoring.cached_score_texts(texts, cache)
+    return cache.hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-entries", type=int, default=20000)
+    args = parser.parse_args()
+
+    texts = load_texts()
+    scoring.get_fast_scorer()
+    path = os.path.join(tempfile.mkdtemp(), "prediction_cache.db")
+    cache = PredictionCache(path, args.max_entries)
+
+    uncached = []
+    for text in texts:
+        start = time.perf_counter()
+        scoring.fast_score_texts([text])
+        uncached.append(time.perf_counter() - start)
+
+    hit_times, miss_times = replay(texts, cache)
+    stats = cache.stats()
+    print(f"{len(texts)} log.csv articles, {len(set(texts))} distinct")
+    print(f"uncached   median {median_ms(uncached):.3f} ms")
+    print(f"cache miss median {median_ms(miss_times):.3f} ms ({len(miss_times)} lookups)")
+    print(f"cache hit  median {median_ms(hit_times):.3f} ms ({len(hit_times)} lookups)")
+    print(f"hit rate   {stats['hit_rate']:.1%}, {stats['entries']} entries")
+
+    cached = scoring.cached_score_texts(texts, cache)
+    direct = [scoring.fast_score_texts([text])[0] for text in texts]
+    ok = all(a[0] == b[0] and abs(a[1] - b[1]) < 1e-9 for a, b in zip(cached, direct))
+    print(f"cached results match uncached: {ok}")
+
+    with ProcessPoolExecutor(1) as pool:
+        shared = pool.submit(other_process_hits, path, texts).result()
+    distinct = len({content_key(scoring.clean_text(text)) for text in texts})
+    print(f"second process hits: {shared}/{distinct}")
+    ok = ok and shared == distinct
+
+    found = cache.get_many("some-other-version", [content_key(scoring.clean_text(texts[0]))])
+    print(f"new artifact version misses: {not found}")
+    ok = ok and not found
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
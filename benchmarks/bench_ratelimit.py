@@ -0,0 +1,181 @@
+"""Simulated lookup burst against provider rate limits.
+
+Every provider is given a small per-second and daily limit and served by
+the local stub. A burst of batch lookups starts first, interactive ones
+arrive a moment later, each with its own article (so nothing is coalesced
+or cached). The stub's request log is then checked against the limits:
+no provider may see more than its daily limit, or more than its rate
+limit's requests in any window of its length. A second burst with a fresh limiter
+on the same usage file stands in for a restarted process, and two worker
+processes sending to one provider check that the per-second
+limit holds across processes. The same burst without limits shows what the
+providers would otherwise receive:
+
+    python benchmarks/bench_ratelimit.py --callers 40 --rate 5 --daily 40
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import providers
+import ratelimit
+import references
+from reference_cache import ReferenceCache
+from stub_server import StubNewsServer, WORDS
+
+
+def articles(count, seed):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(30)) for _ in range(count)]
+
+
+def set_limits(rate, daily):
+    """Apply the test limits and drop any limiter built with the old ones"""
+    for provider in providers.PROVIDERS:
+        provider.rate_limit, provider.daily_limit = rate, daily
+    with ratelimit._limiters_lock:
+        ratelimit._limiters.clear()
+
+
+def burst(callers, seed, stagger):
+    """Batch lookups first, interactive ones ``stagger`` seconds later; returns found counts per level"""
+    found = {"interactive": 0, "batch": 0}
+    lock = threading.Lock()
+
+    def lookup(text, level):
+        with ratelimit.priority(level):
+            results = references.get_news_references(text)
+        if any(not r.get("placeholder") for r in results):
+            with lock:
+                found[ratelimit.PRIORITY_NAMES[level]] += 1
+
+    texts = articles(callers * 2, seed)
+    threads = [threading.Thread(target=lookup, args=(text, ratelimit.BATCH)) for text in texts[:callers]]
+    threads += [threading.Thread(target=lookup, args=(text, ratelimit.INTERACTIVE)) for text in texts[callers:]]
+    for t in threads[:callers]:
+        t.start()
+    time.sleep(stagger)
+    for t in threads[callers:]:
+        t.start()
+    for t in threads:
+        t.join()
+    while references.provider_calls.inflight():
+        time.sleep(0.01)
+    return found
+
+
+def max_in_window(times, window):
+    """Most arrivals within any ``window`` seconds"""
+    times = sorted(times)
+    best, start = 0, 0
+    for end, t in enumerate(times):
+        while t - times[start] > window:
+            start += 1
+        best = max(best, end - start + 1)
+    return best
+
+
+def check(stub, since, rate, per, daily_left):
+    """Print per-provider traffic after ``since``; True if every limit held.
+
+    ``daily_left`` maps provider name to the requests still allowed today.
+    """
+    ok = True
+    allowed_window = rate
+    for provider in providers.PROVIDERS:
+        times = [t for t, path in stub.arrivals if path == provider.id and t >= since]
+        window = max_in_window(times, per)
+        stats = provider.limiter.stats()
+        left = daily_left[provider.name]
+        within = len(times) <= left and window <= allowed_window
+        ok = ok and within
+        print(f"  {provider.name:<10}{len(times):>6} requests (limit {left}), "
+              f"max {window} in {per:g}s (limit {allowed_window}), shed {stats['shed']}  "
+              f"{'ok' if within else 'EXCEEDED'}")
+    return ok
+
+
+def send(path, rate, per, count):
+    """Acquire ``count`` request slots in a worker process; returns the grant times"""
+    ratelimit.usage_store = ratelimit.UsageStore(path)
+    limiter = ratelimit.RateLimiter("Shared", rate=(rate, per), max_wait=60)
+    times = []
+    for _ in range(count):
+        limiter.acquire()
+        times.append(time.time())
+    return times
+
+
+def across_processes(path, rate, per, processes=2):
+    """True if processes sharing a usage file stay within one rate limit between them"""
+    count = rate * 3
+    with multiprocessing.get_context("spawn").Pool(processes) as pool:
+        times = sum(pool.starmap(send, [(path, rate, per, count)] * processes), [])
+    window = max_in_window(times, per)
+    within = window <= rate
+    print(f"\n{processes} processes, one limit: {len(times)} requests, max {window} in {per:g}s "
+          f"(limit {rate})  {'ok' if within else 'EXCEEDED'}")
+    return within
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--callers", type=int, default=40, help="lookups per priority level")
+    parser.add_argument("--rate", type=int, default=5, help="requests per --per seconds")
+    parser.add_argument("--per", type=float, default=1.0)
+    parser.add_argument("--daily", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    # Every provider enabled with a dummy key; nothing leaves the machine
+    for provider in providers.PROVIDERS:
+        os.environ.setdefault(provider.env_key, "stub")
+    references.reference_cache = ReferenceCache(path=":memory:")
+    references.LOCAL_INDEX = False
+    path = os.path.join(tempfile.mkdtemp(), "rate_limits.db")
+    ok = True
+
+    with StubNewsServer(latency={provider.id: args.latency for provider in providers.PROVIDERS}) as stub:
+        stub.point(providers.PROVIDERS)
+
+        start = time.monotonic()
+        found = burst(args.callers, seed=1, stagger=0.2)
+        print(f"no limits: {sum(stub.hits.values())} provider requests in {time.monotonic() - start:.1f}s, "
+              f"references found for {found}")
+
+        ratelimit.usage_store = ratelimit.UsageStore(path)
+        set_limits((args.rate, args.per), args.daily)
+        start = time.monotonic()
+        found = burst(args.callers, seed=2, stagger=0.2)
+        print(f"\nwith limits ({args.rate}/{args.per:g}s, {args.daily}/day, "
+              f"batch capped at {providers.PROVIDERS[0].limiter.daily_cap(ratelimit.BATCH)}): "
+              f"{time.monotonic() - start:.1f}s, references found for {found}")
+        ok = check(stub, start, args.rate, args.per, {p.name: args.daily for p in providers.PROVIDERS}) and ok
+        ok = ok and found["interactive"] >= found["batch"]
+
+        # A restarted process: new limiters and store connection, same usage file
+        used = {p.name: ratelimit.usage_store.used(p.name) for p in providers.PROVIDERS}
+        ratelimit.usage_store = ratelimit.UsageStore(path)
+        set_limits((args.rate, args.per), args.daily)
+        start = time.monotonic()
+        found = burst(args.callers, seed=3, stagger=0.2)
+        print(f"\nafter restart ({sum(used.values())} requests already counted today): "
+              f"references found for {found}")
+        ok = check(stub, start, args.rate, args.per, {name: args.daily - n for name, n in used.items()}) and ok
+        ok = ok and all(ratelimit.usage_store.used(p.name) <= args.daily for p in providers.PROVIDERS)
+
+    ok = across_processes(path, args.rate, args.per) and ok
+
+    print(f"\nquota never exceeded: {'yes' if ok else 'NO'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
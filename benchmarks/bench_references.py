@@ -0,0 +1,76 @@
+"""Latency of get_news_references against a local stub provider server.
+
+Compares the old one-call-at-a-time lookup (a single worker) with the
+concurrent fan-out and with a warm reference cache, printing p50/p99. Exits
+non-zero unless the fan-out returns the same references as the single
+worker and is faster at the median:
+
+    python benchmarks/bench_references.py --runs 30 --bing-latency 0.4
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import providers
+import references
+from reference_cache import ReferenceCache
+from stub_server import StubNewsServer
+
+ARTICLE = "Scientists claim to have discovered universal cure for all diseases using advanced AI technology"
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def time_lookups(runs, num_results, max_workers, cached):
+    query = references.extract_query(ARTICLE)
+    search_queries = [query, ' '.join(query.split()[:3]), ' '.join(query.split()[-3:])]
+    samples = []
+    for _ in range(runs):
+        if not cached:
+            references.reference_cache.clear()
+        start = time.perf_counter()
+        results, _ = references.fetch_references(search_queries, query, num_results, max_workers=max_workers)
+        samples.append(time.perf_counter() - start)
+    return samples, sorted(r["url"] for r in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--num-results", type=int, default=6)
+    parser.add_argument("--page-size", type=int, default=1,
+                        help="articles per stub response; 1 means every provider call is needed")
+    parser.add_argument("--bing-latency", type=float, default=0.3)
+    parser.add_argument("--newsapi-latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    args = parser.parse_args()
+
+    latency = {"bing": args.bing_latency, "newsapi": args.newsapi_latency}
+    # Private in-memory cache so the benchmark never touches the app's cache file
+    references.reference_cache = ReferenceCache(path=":memory:")
+    # Measure the provider path; the local corroboration index would answer repeats
+    references.LOCAL_INDEX = False
+    with StubNewsServer(latency=latency, jitter=args.jitter, page_size=args.page_size) as stub:
+        stub.point(providers.PROVIDERS)
+
+        print(f"{'mode':<12}{'p50 (s)':>10}{'p99 (s)':>10}")
+        medians, found = {}, {}
+        for label, workers, cached in [("sequential", 1, False), ("concurrent", None, False), ("cached", None, True)]:
+            samples, found[label] = time_lookups(args.runs, args.num_results, workers, cached)
+            medians[label] = statistics.median(samples)
+            print(f"{label:<12}{medians[label]:>10.3f}{percentile(samples, 99):>10.3f}")
+
+    same = found["sequential"] == found["concurrent"] == found["cached"]
+    print(f"\nsame references in every mode: {'yes' if same else 'NO'}")
+    sys.exit(0 if same and medians["concurrent"] < medians["sequential"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Rerun render time of the app with populated sidebar charts.
+
+Seeds a temporary database with predictions and feedback so every sidebar
+chart is drawn, then drives app.py with Streamlit's AppTest: plain reruns,
+and emoji clicks on a finished analysis (main-panel interactions). Prints
+the mean time per rerun and how many Plotly figures were built. Pass an
+older copy of the app to compare before and after:
+
+    python benchmarks/bench_render.py --reruns 20
+    git show HEAD~1:app.py > /tmp/app_before.py
+    python benchmarks/bench_render.py --app /tmp/app_before.py
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+TMP = tempfile.mkdtemp()
+os.environ["TRUTHLENS_DB"] = os.path.join(TMP, "render.db")
+os.environ["CORROBORATION_PATH"] = os.path.join(TMP, "corroboration.db")
+os.environ["PREWARM"] = "0"
+
+import plotly.express as px
+from streamlit.testing.v1 import AppTest
+
+import metrics
+import providers
+import storage
+from stub_server import StubNewsServer
+
+ARTICLE = "Scientists claim to have discovered universal cure for all diseases using advanced AI technology"
+EMOJIS = ["Excellent", "Good", "Okay", "Poor", "Terrible"]
+
+
+def seed(predictions, feedback):
+    rng = random.Random(7)
+    now = datetime.now().isoformat()
+    storage.append_predictions([{"timestamp": now, "news": f"story {i}", "prediction": rng.choice(["Real", "Fake"]),
+                                 "confidence": rng.random(), "references_found": 1} for i in range(predictions)])
+    for i in range(feedback):
+        rating = rng.randint(1, 5)
+        storage.append_feedback({"timestamp": now, "overall_rating": rating,
+                                 "feedback_type": "positive" if rating >= 4 else "negative" if rating <= 2 else "neutral"})
+
+
+def count_builds(counts):
+    for name in ("pie", "bar"):
+        original = getattr(px, name)
+
+        def wrapper(*args, _original=original, **kwargs):
+            counts["figures"] = counts.get("figures", 0) + 1
+            return _original(*args, **kwargs)
+        setattr(px, name, wrapper)
+
+
+def timed_reruns(at, reruns, step, counts):
+    built = counts.get("figures", 0)
+    start = time.perf_counter()
+    for i in range(reruns):
+        step(i)
+    return (time.perf_counter() - start) / reruns * 1000, counts.get("figures", 0) - built
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default=os.path.join(ROOT, "app.py"))
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--predictions", type=int, default=500)
+    parser.add_argument("--feedback", type=int, default=50)
+    args = parser.parse_args()
+
+    seed(args.predictions, args.feedback)
+    counts = {}
+    count_builds(counts)
+
+    with StubNewsServer() as stub:
+        stub.point(providers.PROVIDERS)
+        start = time.perf_counter()
+        at = AppTest.from_file(os.path.abspath(args.app), default_timeout=120).run()
+        print(f"first run: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        def rerun(i):
+            at.run()
+        rerun_ms, rerun_figures = timed_reruns(at, args.reruns, rerun, counts)
+
+        at.text_area(key="article_input").input(ARTICLE).run()
+        [b for b in at.button if "Analyze" in b.label][0].click().run()
+
+        def click(i):
+            [b for b in at.button if EMOJIS[i % 5] in b.label][0].click().run()
+        click_ms, click_figures = timed_reruns(at, args.reruns, click, counts)
+
+    print(f"{'interaction':<22}{'ms/rerun':>10}{'figures built':>16}")
+    print(f"{'plain rerun':<22}{rerun_ms:>10.1f}{rerun_figures:>16}")
+    print(f"{'emoji click':<22}{click_ms:>10.1f}{click_figures:>16}")
+
+    stages = [s for s in metrics.snapshot()["stages"] if s["stage"] == "render"]
+    for s in stages:
+        print(f"  render.{s['labels']['part']}: p50 {s['p50_ms']:.1f} ms, p95 {s['p95_ms']:.1f} ms over {s['count']}")
+    sys.exit(1 if at.exception else 0)
+
+
+if __name__ == "__main__":
+    main()
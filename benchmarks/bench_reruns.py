@@ -0,0 +1,124 @@
+"""Side effects of Streamlit reruns on a finished analysis.
+
+Drives app.py headlessly with Streamlit's AppTest: analyzes one article,
+then reruns the page N times the way a user does (emoji clicks, slider
+moves, plain reruns) and submits feedback once. Checks that the analysis
+was logged exactly once, the gauge figure was built once, the feedback
+row carries the analysis id, and the logged reference count matches the
+references shown. A second article, for which the providers find nothing,
+must be logged with zero references (the "No relevant references found"
+entry is not one). Provider lookups go to the local stub and the database
+is a temporary file; the script exits non-zero if any check fails:
+
+    python benchmarks/bench_reruns.py --reruns 20
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+TMP = tempfile.mkdtemp()
+os.environ["TRUTHLENS_DB"] = os.path.join(TMP, "reruns.db")
+os.environ["CORROBORATION_PATH"] = os.path.join(TMP, "corroboration.db")
+os.environ["PREWARM"] = "0"
+
+import plotly.graph_objects as go
+from streamlit.testing.v1 import AppTest
+
+import providers
+import storage
+from stub_server import StubNewsServer
+
+ARTICLE = "Scientists claim to have discovered universal cure for all diseases using advanced AI technology"
+UNREPORTED = "Local council approves new parking rules for the harbour district"
+
+
+def counting(module, name, counts):
+    """Wrap module.name so every call is counted under ``name``"""
+    original = getattr(module, name)
+
+    def wrapper(*args, **kwargs):
+        counts[name] = counts.get(name, 0) + 1
+        return original(*args, **kwargs)
+    setattr(module, name, wrapper)
+
+
+def click(at, label):
+    [b for b in at.button if label in b.label][0].click().run()
+
+
+def analyze(text, page_size):
+    """Analyze ``text`` once against a stub returning ``page_size`` articles per request; returns the result"""
+    with StubNewsServer(page_size=page_size) as stub:
+        stub.point(providers.PROVIDERS)
+        at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=120).run()
+        at.text_area(key="article_input").input(text).run()
+        click(at, "Analyze")
+        return at.session_state["result"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=20)
+    args = parser.parse_args()
+
+    counts = {}
+    counting(storage, "append_prediction", counts)
+    counting(storage, "append_feedback", counts)
+    counting(go, "Figure", counts)
+
+    with StubNewsServer() as stub:
+        stub.point(providers.PROVIDERS)
+        at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=120).run()
+        at.text_area(key="article_input").input(ARTICLE).run()
+        click(at, "Analyze")
+        result = at.session_state["result"]
+        after_analysis = dict(counts)
+
+        # Emoji clicks, slider moves and plain reruns, like a user reading the result
+        start = time.perf_counter()
+        for i in range(args.reruns):
+            if i % 3 == 0:
+                click(at, ["Excellent", "Good", "Okay", "Poor", "Terrible"][i % 5])
+            elif i % 3 == 1 and at.slider:
+                at.slider[0].set_value(1 + i % 5).run()
+            else:
+                at.run()
+        rerun_ms = (time.perf_counter() - start) / args.reruns * 1000
+        during_reruns = dict(counts)
+
+        click(at, "Submit Feedback")
+
+    exceptions = list(at.exception)
+    empty = analyze(UNREPORTED, page_size=0)
+    conn = sqlite3.connect(os.environ["TRUTHLENS_DB"])
+    logged = conn.execute("SELECT COUNT(*) FROM predictions WHERE analysis_id = ?", (result.id,)).fetchone()[0]
+    stored = dict(conn.execute("SELECT analysis_id, references_found FROM predictions WHERE analysis_id IN (?, ?)",
+                               (result.id, empty.id)).fetchall())
+    shown = sum(not r.get("placeholder") for r in result.references)
+    feedback = conn.execute("SELECT COUNT(*) FROM feedback WHERE analysis_id = ?", (result.id,)).fetchone()[0]
+
+    print(f"analysis {result.id}: {args.reruns} reruns, {rerun_ms:.0f} ms per rerun")
+    print(f"  prediction log writes: {during_reruns.get('append_prediction', 0)} "
+          f"(rows for this id: {logged})")
+    print(f"  gauge figures built:   {during_reruns.get('Figure', 0)}")
+    print(f"  feedback writes:       {counts.get('append_feedback', 0)} (rows for this id: {feedback})")
+    print(f"  references logged:     {stored.get(result.id)} (shown: {shown}); "
+          f"with none found: {stored.get(empty.id)}")
+    if exceptions:
+        print(f"  exceptions: {exceptions}")
+
+    ok = (not exceptions
+          and after_analysis.get("append_prediction") == during_reruns.get("append_prediction") == 1
+          and during_reruns.get("Figure") == 1
+          and logged == 1 and feedback == 1 and counts.get("append_feedback") == 1
+          and shown > 0 and stored.get(result.id) == shown and stored.get(empty.id) == 0)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
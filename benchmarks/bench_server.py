@@ -0,0 +1,112 @@
+"""Load test for the inference server: RPS and tail latency of /predict.
+
+Fires requests from concurrent keep-alive clients at a running server, or
+starts one in-process when no --url is given:
+
+    python server.py --port 8000 &
+    python benchmarks/bench_server.py --url http://127.0.0.1:8000 --clients 32
+"""
+import argparse
+import http.client
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+HEADLINES = [
+    "India defeats South Africa to win ICC T20 World Cup 2024 in a thrilling final match at Barbados",
+    "Scientists claim to have discovered universal cure for all diseases using advanced AI technology",
+    "India rises in QS World University Rankings 2026, reflecting progress in global education and research",
+]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def client(host, port, requests_per_client, latencies, errors):
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    for i in range(requests_per_client):
+        body = json.dumps({"text": HEADLINES[i % len(HEADLINES)]})
+        start = time.perf_counter()
+        try:
+            conn.request("POST", "/predict", body, {"Content-Type": "application/json"})
+            res = conn.getresponse()
+            res.read()
+            if res.status != 200:
+                errors.append(res.status)
+                continue
+        except OSError as e:
+            errors.append(repr(e))
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def wait_ready(host, port, timeout=120):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=5)
+            conn.request("GET", "/readyz")
+            res = conn.getresponse()
+            status = json.loads(res.read() or b"{}")
+            conn.close()
+            if res.status == 200:
+                return
+            if status.get("status") == "failed":
+                raise RuntimeError(f"server failed to load: {status.get('error')}")
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server did not become ready")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="running server; default starts one in-process")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="requests per client")
+    parser.add_argument("--batch-window-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        parsed = urlparse(args.url)
+        host, port = parsed.hostname, parsed.port
+    else:
+        import server as inference_server
+        server = inference_server.create_server(port=0, window=args.batch_window_ms / 1000)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address
+    wait_ready(host, port)
+
+    latencies, errors = [], []
+    threads = [threading.Thread(target=client, args=(host, port, args.requests, latencies, errors))
+               for _ in range(args.clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    print(f"requests: {len(latencies)} ok, {len(errors)} errors in {elapsed:.2f}s")
+    print(f"throughput: {len(latencies) / elapsed:.0f} req/s")
+    if latencies:
+        print(f"latency ms: p50 {statistics.median(latencies) * 1000:.1f}  "
+              f"p95 {percentile(latencies, 95) * 1000:.1f}  p99 {percentile(latencies, 99) * 1000:.1f}")
+    if server is not None:
+        print(f"micro-batches: {server.service.batcher.batches} for {server.service.batcher.items} items")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Startup timing report: where cold start and first render time goes.
+
+Reports, each in a fresh interpreter:
+  * import time of the app's heavy dependencies (python -X importtime)
+  * time to load the model and vectorizer
+  * time for the first and a repeat render of app.py (Streamlit AppTest)
+
+    python benchmarks/bench_startup.py
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MODULES = ["streamlit", "pandas", "plotly.express", "plotly.graph_objects", "textblob",
+           "requests", "joblib", "sklearn.feature_extraction.text", "sklearn.linear_model"]
+
+
+def import_times(module):
+    """Cumulative import time in seconds of ``module`` in a fresh interpreter"""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True, cwd=ROOT)
+    for line in reversed(proc.stderr.splitlines()):
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1e6
+    return float("nan")
+
+
+def timed_subprocess(code):
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT)
+    if proc.returncode:
+        raise RuntimeError(proc.stderr)
+    return [float(line) for line in proc.stdout.split()]
+
+
+def main():
+    print("Import time (fresh interpreter, cumulative)")
+    for module in MODULES:
+        print(f"  {module:<36}{import_times(module) * 1000:>8.0f} ms")
+
+    load, = timed_subprocess(
+        "import time, scoring; s = time.perf_counter(); scoring.load_artifacts(); "
+        "print(time.perf_counter() - s)"
+    )
+    print(f"\nModel + vectorizer load                {load * 1000:>8.0f} ms")
+
+    first, repeat = timed_subprocess(
+        "import time\n"
+        "from streamlit.testing.v1 import AppTest\n"
+        "at = AppTest.from_file('app.py', default_timeout=120)\n"
+        "s = time.perf_counter(); at.run(); first = time.perf_counter() - s\n"
+        "s = time.perf_counter(); at.run(); print(first); print(time.perf_counter() - s)\n"
+    )
+    print(f"First render (app.py, AppTest)         {first * 1000:>8.0f} ms")
+    print(f"Repeat render (rerun)                  {repeat * 1000:>8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Write throughput of the prediction/feedback store under concurrent writers.
+
+Each writer process appends rows as fast as it can. The SQLite store is
+compared with the old feedback.csv approach (pandas read + concat + rewrite
+per submission), and rows lost to concurrent writes are counted:
+
+    python benchmarks/bench_storage.py --writers 8 --rows 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from multiprocessing import Process
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage
+
+
+def feedback_row(writer, i):
+    return {
+        "session_id": f"w{writer}", "timestamp": datetime.now().isoformat(),
+        "article_text": f"benchmark article {writer}-{i}", "prediction": "Real", "confidence": 0.9,
+        "emoji_feedback": "😊", "emoji_label": "Good", "emoji_rating": 4, "feedback_type": "positive",
+        "accuracy_rating": 4, "speed_rating": 4, "ui_rating": 4, "overall_rating": 4,
+        "detailed_comments": "", "improvement_areas": "None"
+    }
+
+
+def sqlite_writer(path, writer, rows):
+    for i in range(rows):
+        storage.append_feedback(feedback_row(writer, i), path=path)
+
+
+def csv_writer(path, writer, rows):
+    """The pre-SQLite save_feedback: read the whole file, add a row, rewrite it"""
+    import pandas as pd
+    for i in range(rows):
+        df = pd.DataFrame([feedback_row(writer, i)])
+        try:
+            if os.path.exists(path):
+                df = pd.concat([pd.read_csv(path), df], ignore_index=True)
+            df.to_csv(path, index=False)
+        except Exception:
+            pass  # torn reads of a half-written file: that row is lost
+
+
+def run(target, path, writers, rows):
+    procs = [Process(target=target, args=(path, w, rows)) for w in range(writers)]
+    start = time.perf_counter()
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=200, help="rows per writer")
+    args = parser.parse_args()
+    expected = args.writers * args.rows
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep the legacy CSV import out of the measurement
+        storage.LEGACY_LOG_CSV = storage.LEGACY_FEEDBACK_CSV = os.path.join(tmp, "missing.csv")
+        db_path = os.path.join(tmp, "bench.db")
+        storage.connect(db_path)
+        sqlite_time = run(sqlite_writer, db_path, args.writers, args.rows)
+        stored = storage.connect(db_path).execute("SELECT COUNT(*) FROM feedback").fetchone()[0]
+
+        csv_path = os.path.join(tmp, "feedback.csv")
+        csv_time = run(csv_writer, csv_path, args.writers, args.rows)
+        with open(csv_path, encoding="utf-8") as f:
+            csv_rows = sum(1 for _ in f) - 1
+
+    print(f"{args.writers} writers x {args.rows} rows = {expected} rows")
+    print(f"{'backend':<10}{'rows/sec':>10}{'stored':>8}{'lost':>7}")
+    print(f"{'sqlite':<10}{expected / sqlite_time:>10.0f}{stored:>8}{expected - stored:>7}")
+    print(f"{'csv':<10}{expected / csv_time:>10.0f}{csv_rows:>8}{expected - csv_rows:>7}")
+
+
+if __name__ == "__main__":
+    main()
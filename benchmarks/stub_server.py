@@ -0,0 +1,222 @@
+"""Local stand-in for the news providers used by the benchmarks.
+
+Serves JSON shaped like each provider's API on ``/<provider id>`` (``/bing``,
+``/newsapi``, ``/gnews``, ``/newsdata``, ``/guardian``) with configurable
+latency and error injection, so reference lookups can be timed without
+touching the network or burning API quota. ``fixtures`` replays recorded
+response bodies instead of generated ones. ``/feed/<n>`` serves RSS
+documents that honour If-None-Match, for the ingestion benchmark.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+SYLLABLES = ("ka lo mi ren tor sa vu pel dri on ast mur ine gol ber ta "
+             "quo zen fra lim och ter ua bis nel cor pho dun ves").split()
+# Pseudo-words, so synthetic stories are not near duplicates of each other
+WORDS = [a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES[:8]]
+
+
+def rss_document(name, items):
+    """Render (guid, title, summary) tuples as an RSS 2.0 document"""
+    entries = "".join(
+        f"<item><guid>{guid}</guid><title>{title}</title><link>https://feeds.example.com/{guid}</link>"
+        f"<description>{summary}</description></item>"
+        for guid, title, summary in items
+    )
+    return (f'<?xml version="1.0"?><rss version="2.0"><channel><title>{name}</title>'
+            f"{entries}</channel></rss>").encode()
+
+
+def _articles(query, count, provider):
+    words = query.split() or ["news"]
+    return [{
+        "title": f"{' '.join(words)} report {provider} {i}",
+        "description": f"Coverage of {' '.join(words)} from {provider} wire {i}",
+        "url": f"https://{provider}.example.com/{'-'.join(words)}/{i}",
+        "source": f"{provider.title()} Wire",
+    } for i in range(count)]
+
+
+class StubNewsServer:
+    """Threaded HTTP server faking the provider APIs.
+
+    ``latency`` maps a provider path ("bing", "newsapi", ...) to the mean
+    delay in seconds; ``jitter`` adds an exponential tail on top of it and
+    ``error_rate`` makes that share of requests fail with HTTP 503.
+    ``page_size`` caps the articles per response regardless of the count
+    the client asked for. ``fixtures`` maps a provider path to a response
+    body returned verbatim for every query. ``hits`` counts requests per
+    provider path and ``arrivals`` lists (time.monotonic(), path) for each.
+    """
+
+    def __init__(self, latency=None, jitter=0.0, error_rate=0.0, page_size=None, seed=42, feed_size=50,
+                 fixtures=None):
+        self.latency = latency or {}
+        self.fixtures = fixtures or {}
+        self.feed_size = feed_size
+        self.feed_items = {}
+        self.page_size = page_size
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.hits = {}
+        self.arrivals = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def point(self, providers):
+        """Send the given providers.NewsProvider instances to this stub.
+
+        The stub has no quotas, so their request limits are lifted too;
+        benchmark traffic is then neither throttled nor counted against
+        the real providers' daily usage.
+        """
+        import ratelimit
+        for provider in providers:
+            provider.endpoint = f"{self.url}/{provider.id}"
+            provider.rate_limit = provider.daily_limit = None
+            with ratelimit._limiters_lock:
+                ratelimit._limiters.pop(provider.name, None)
+
+    def publish(self, feed, count):
+        """Append ``count`` fresh synthetic stories to a feed"""
+        with self._lock:
+            items = self.feed_items.setdefault(feed, [])
+            for _ in range(count):
+                guid = f"{feed}-{len(items)}"
+                title = " ".join(self.random.choice(WORDS) for _ in range(8)) + f" {guid}"
+                summary = " ".join(self.random.choice(WORDS) for _ in range(30))
+                items.append((guid, title, summary))
+
+    def _feed(self, handler, feed):
+        if feed not in self.feed_items:
+            self.publish(feed, self.feed_size)
+        with self._lock:
+            items = list(self.feed_items[feed][-self.feed_size:])
+        etag = f'"{feed}-{len(self.feed_items[feed])}"'
+        if handler.headers.get("If-None-Match") == etag:
+            handler.send_response(304)
+            handler.end_headers()
+            return
+        payload = rss_document(feed, reversed(items))
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/rss+xml")
+        handler.send_header("ETag", etag)
+        handler.send_header("Content-Length", str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                provider = parsed.path.strip("/")
+                params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                with stub._lock:
+                    stub.hits[provider] = stub.hits.get(provider, 0) + 1
+                    stub.arrivals.append((time.monotonic(), provider))
+                    delay = stub.latency.get(provider, 0.0)
+                    if stub.jitter:
+                        delay += stub.random.expovariate(1 / stub.jitter)
+                    failed = stub.random.random() < stub.error_rate
+                time.sleep(delay)
+
+                if failed:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+
+                if provider.startswith("feed/"):
+                    stub._feed(self, provider[len("feed/"):])
+                    return
+
+                if provider in stub.fixtures:
+                    body = stub.fixtures[provider]
+                else:
+                    query = params.get("q", "")
+                    count = int(params.get("count") or params.get("pageSize") or params.get("max")
+                                or params.get("size") or params.get("page-size") or 6)
+                    if stub.page_size is not None:
+                        count = min(count, stub.page_size)
+                    body = stub.render(provider, _articles(query, count, provider))
+                payload = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def render(self, provider, articles):
+        """Wrap generic articles in the response shape of each provider"""
+        if provider == "bing":
+            return {"value": [{
+                "name": a["title"],
+                "description": a["description"],
+                "url": a["url"],
+                "provider": [{"name": a["source"]}],
+                "datePublished": "2025-07-01T00:00:00Z",
+            } for a in articles]}
+        if provider == "gnews":
+            return {"totalArticles": len(articles), "articles": [{
+                "title": a["title"],
+                "description": a["description"],
+                "content": a["description"],
+                "url": a["url"],
+                "image": "",
+                "publishedAt": "2025-07-01T00:00:00Z",
+                "source": {"name": a["source"], "url": "https://gnews.example.com"},
+            } for a in articles]}
+        if provider == "newsdata":
+            return {"status": "success", "totalResults": len(articles), "results": [{
+                "article_id": str(i),
+                "title": a["title"],
+                "link": a["url"],
+                "description": a["description"],
+                "pubDate": "2025-07-01 00:00:00",
+                "image_url": None,
+                "source_id": "newsdata_wire",
+            } for i, a in enumerate(articles)], "nextPage": None}
+        if provider == "guardian":
+            return {"response": {"status": "ok", "total": len(articles), "results": [{
+                "id": a["url"].split("/", 3)[-1],
+                "type": "article",
+                "webTitle": a["title"],
+                "webUrl": a["url"],
+                "webPublicationDate": "2025-07-01T00:00:00Z",
+                "fields": {"trailText": f"<p>{a['description']}</p>"},
+            } for a in articles]}}
+        return {"status": "ok", "articles": [{
+            "title": a["title"],
+            "description": a["description"],
+            "url": a["url"],
+            "source": {"name": a["source"]},
+            "publishedAt": "2025-07-01T00:00:00Z",
+            "urlToImage": "",
+        } for a in articles]}
@@ -0,0 +1,373 @@
+"""Reproducible benchmark suite for the TruthLens hot paths.
+
+Each case times one operation after a warm-up, with the iteration count
+calibrated so a repeat lasts about ``--min-time`` seconds, and reports the
+median over ``--repeat`` repeats. Results are written as JSON so runs can be
+compared, and ``--compare`` fails (exit 1) when a case's best repeat got
+slower than the baseline's by more than ``--threshold``:
+
+    python benchmarks/suite.py                          # full run, writes benchmarks/results/<time>.json
+    python benchmarks/suite.py --quick -k storage       # subset, small fixtures
+    python benchmarks/suite.py -o base.json
+    python benchmarks/suite.py --compare base.json --threshold 0.5
+
+Provider lookups run against the local stub server (``--latency``,
+``--error-rate``), storage cases use throwaway databases.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Short backoff so injected provider errors cost a retry, not half a second of sleep
+os.environ.setdefault("PROVIDER_BACKOFF_BASE", "0.01")
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+SHORT = "India defeats South Africa to win ICC T20 World Cup 2024 in a thrilling final match at Barbados"
+LONG = " ".join([
+    "Scientists claim to have discovered a universal cure for all diseases using advanced AI technology.",
+    "The announcement, made at a press conference in Geneva on Monday, drew immediate skepticism from",
+    "independent researchers, who noted that no peer-reviewed study has been published.",
+    "The World Health Organization said it was not consulted and urged the public to rely on verified sources.",
+] * 15)
+
+CASES = []
+
+
+def case(name):
+    """Register a benchmark.
+
+    The decorated generator receives the run config, does its setup, yields
+    the zero-argument callable to time and tears down after the yield.
+    """
+    def register(fn):
+        CASES.append((name, fn))
+        return fn
+    return register
+
+
+# --- text processing -------------------------------------------------------
+
+@case("clean_text[short]")
+def _(config):
+    from scoring import clean_text
+    yield lambda: clean_text(SHORT)
+
+
+@case("clean_text[long]")
+def _(config):
+    from scoring import clean_text
+    yield lambda: clean_text(LONG)
+
+
+@case("clean_texts[batch=100]")
+def _(config):
+    from normalize import clean_texts
+    texts = [SHORT, LONG] * 50
+    yield lambda: clean_texts(texts)
+
+
+@case("extract_query[short]")
+def _(config):
+    import keywords
+    def run():
+        keywords.clear_memo()
+        keywords.extract_query(SHORT)
+    yield run
+
+
+@case("extract_query[long]")
+def _(config):
+    import keywords
+    def run():
+        keywords.clear_memo()
+        keywords.extract_query(LONG)
+    yield run
+
+
+@case("calculate_relevance_score")
+def _(config):
+    from references import calculate_relevance_score
+    title = "India beat South Africa in T20 World Cup final"
+    description = "Rohit Sharma's side won the ICC title in Barbados after a thrilling finish"
+    yield lambda: calculate_relevance_score(title, description, "India South Africa T20 World Cup")
+
+
+# --- inference -------------------------------------------------------------
+
+def _batch(size):
+    rng = random.Random(7)
+    words = (SHORT + " " + LONG).split()
+    return [" ".join(rng.choice(words) for _ in range(40)) for _ in range(size)]
+
+
+@case("predict[single]")
+def _(config):
+    import scoring
+    scoring.get_fast_scorer()
+    yield lambda: scoring.fast_score_texts([SHORT])
+
+
+@case("predict[batch=100]")
+def _(config):
+    import scoring
+    scoring.get_fast_scorer()
+    texts = _batch(100)
+    yield lambda: scoring.fast_score_texts(texts)
+
+
+@case("predict_sklearn[single]")
+def _(config):
+    import joblib
+    import scoring
+    model, vectorizer = joblib.load(scoring.MODEL_PATH), joblib.load(scoring.VECTORIZER_PATH)
+    yield lambda: scoring.score_texts(model, vectorizer, [SHORT])
+
+
+@case("predict_sklearn[batch=100]")
+def _(config):
+    import joblib
+    import scoring
+    model, vectorizer = joblib.load(scoring.MODEL_PATH), joblib.load(scoring.VECTORIZER_PATH)
+    texts = _batch(100)
+    yield lambda: scoring.score_texts(model, vectorizer, texts)
+
+
+# --- reference lookup ------------------------------------------------------
+
+def _references_case(config, warm):
+    import references
+    import provider_client
+    import providers
+    from reference_cache import ReferenceCache
+    from stub_server import StubNewsServer
+
+    latency = {provider.id: config["latency"] for provider in providers.PROVIDERS}
+    saved = (references.reference_cache, references.LOCAL_INDEX, [p.endpoint for p in providers.PROVIDERS])
+    references.reference_cache = ReferenceCache(path=":memory:")
+    references.LOCAL_INDEX = False
+    with StubNewsServer(latency=latency, error_rate=config["error_rate"], page_size=2) as stub:
+        stub.point(providers.PROVIDERS)
+
+        def run():
+            if not warm:
+                references.reference_cache.clear()
+            references.no_results.clear()
+            # Injected errors must not leave a breaker open for the next iteration
+            for client in provider_client._clients.values():
+                client.breaker.record_success()
+            references.get_news_references(SHORT)
+        try:
+            yield run
+        finally:
+            # Searches left running by an early stop must not outlive this stub
+            while references.provider_calls.inflight():
+                time.sleep(0.01)
+            references.reference_cache, references.LOCAL_INDEX, endpoints = saved
+            for provider, endpoint in zip(providers.PROVIDERS, endpoints):
+                provider.endpoint = endpoint
+
+
+@case("get_news_references[stub]")
+def _(config):
+    yield from _references_case(config, warm=False)
+
+
+@case("get_news_references[stub,cached]")
+def _(config):
+    yield from _references_case(config, warm=True)
+
+
+@case("get_news_references[local]")
+def _(config):
+    import references
+    from corroboration import CorroborationIndex
+
+    saved = (references.corroboration_index, references.LOCAL_INDEX)
+    references.corroboration_index = CorroborationIndex(path=":memory:")
+    references.LOCAL_INDEX = True
+    # Enough close matches that the providers are never asked
+    references.corroboration_index.add([
+        {"title": SHORT, "description": text, "url": f"https://example.com/local/{i}", "source": "example.com"}
+        for i, text in enumerate(_batch(1000))
+    ])
+    try:
+        yield lambda: references.get_news_references(SHORT)
+    finally:
+        references.corroboration_index, references.LOCAL_INDEX = saved
+
+
+# --- storage ---------------------------------------------------------------
+
+def _isolated_storage():
+    import storage
+    tmp = tempfile.mkdtemp()
+    # Keep the real log.csv/feedback.csv out of the throwaway databases
+    storage.LEGACY_LOG_CSV = storage.LEGACY_FEEDBACK_CSV = os.path.join(tmp, "missing.csv")
+    return storage, tmp
+
+
+@case("log_prediction[append]")
+def _(config):
+    storage, tmp = _isolated_storage()
+    path = os.path.join(tmp, "append.db")
+    record = {"timestamp": datetime.now().isoformat(), "news": SHORT, "prediction": "Real",
+              "confidence": 0.91, "references_found": 1, "timings": '{"analysis": 12.5}'}
+    yield lambda: storage.append_prediction(record, path)
+
+
+@case("save_feedback[append]")
+def _(config):
+    storage, tmp = _isolated_storage()
+    path = os.path.join(tmp, "feedback.db")
+    record = {"session_id": "bench", "timestamp": datetime.now().isoformat(), "article_text": SHORT,
+              "prediction": "Real", "confidence": 0.91, "emoji_feedback": "😊", "emoji_label": "Good",
+              "emoji_rating": 4, "feedback_type": "positive", "accuracy_rating": 4, "speed_rating": 4,
+              "ui_rating": 4, "overall_rating": 4, "detailed_comments": "", "improvement_areas": "None"}
+    yield lambda: storage.append_feedback(record, path)
+
+
+def _stats_case(rows):
+    def bench(config):
+        storage, tmp = _isolated_storage()
+        path = os.path.join(tmp, f"stats{rows}.db")
+        conn = storage.connect(path)
+        rng = random.Random(rows)
+        start = datetime(2024, 1, 1).timestamp()
+        span = datetime.now().timestamp() - start
+        with conn:
+            conn.executemany(
+                "INSERT INTO predictions (timestamp, news, prediction, confidence, references_found) VALUES (?, ?, ?, ?, ?)",
+                ((datetime.fromtimestamp(start + rng.random() * span).isoformat(), SHORT,
+                  "Real" if rng.random() < 0.7 else "Fake", rng.random(), 1) for _ in range(rows))
+            )
+        storage.rebuild_aggregates(conn)
+        yield lambda: storage.prediction_summary(path)
+    return bench
+
+
+# --- runner ----------------------------------------------------------------
+
+def measure(fn, repeat, min_time):
+    fn()  # warm-up (imports, caches, connections)
+    start = time.perf_counter()
+    fn()
+    single = max(time.perf_counter() - start, 1e-7)
+    number = max(1, min(100000, int(min_time / single)))
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return {
+        "median_ms": statistics.median(samples) * 1000,
+        "min_ms": min(samples) * 1000,
+        "stdev_ms": statistics.stdev(samples) * 1000 if len(samples) > 1 else 0.0,
+        "ops_per_sec": 1 / statistics.median(samples),
+        "number": number,
+        "repeat": repeat
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """Return the cases slower than the baseline by more than the threshold"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("cases", {}).get(name)
+        if not base:
+            continue
+        # Best-of-repeats is far less sensitive to machine noise than the median
+        old, new = base["min_ms"], result["min_ms"]
+        if new > old * (1 + threshold) and new - old > min_delta_ms:
+            regressions.append((name, old, new))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", dest="select", help="only run cases whose name contains this text")
+    parser.add_argument("--quick", action="store_true", help="fewer repeats and small fixtures only")
+    parser.add_argument("--repeat", type=int, default=None, help="timed repeats per case (default 7, quick 3)")
+    parser.add_argument("--min-time", type=float, default=None, help="seconds per repeat (default 0.2, quick 0.05)")
+    parser.add_argument("--stats-rows", default=None,
+                        help="comma-separated predictions table sizes (default 1000,10000,100000,1000000)")
+    parser.add_argument("--latency", type=float, default=0.05, help="stub provider latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.1, help="share of stub requests failing with 503")
+    parser.add_argument("-o", "--output", help="results JSON path (default benchmarks/results/<time>.json)")
+    parser.add_argument("--compare", help="baseline results JSON to check against")
+    parser.add_argument("--threshold", type=float, default=0.5, help="allowed slowdown ratio vs the baseline")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05,
+                        help="ignore slowdowns smaller than this many milliseconds (timer noise)")
+    args = parser.parse_args()
+
+    repeat = args.repeat or (3 if args.quick else 7)
+    min_time = args.min_time or (0.05 if args.quick else 0.2)
+    sizes = args.stats_rows or ("1000,10000" if args.quick else "1000,10000,100000,1000000")
+    config = {"latency": args.latency, "error_rate": args.error_rate}
+
+    cases = list(CASES) + [(f"get_prediction_stats[rows={int(n)}]", _stats_case(int(n))) for n in sizes.split(",")]
+    if args.select:
+        cases = [(name, fn) for name, fn in cases if args.select in name]
+
+    import logging
+    logging.disable(logging.WARNING)
+
+    results = {}
+    print(f"{'case':<40}{'median':>12}{'min':>12}{'ops/sec':>12}")
+    for name, bench in cases:
+        gen = bench(config)
+        try:
+            fn = next(gen)
+            results[name] = measure(fn, repeat, min_time)
+        finally:
+            gen.close()
+        r = results[name]
+        print(f"{name:<40}{r['median_ms']:>10.3f}ms{r['min_ms']:>10.3f}ms{r['ops_per_sec']:>12.0f}")
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": dict(config, repeat=repeat, min_time=min_time),
+        "cases": results
+    }
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        for name, old, new in regressions:
+            print(f"REGRESSION {name}: {old:.3f}ms -> {new:.3f}ms (+{(new / old - 1):.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Sharing work between concurrent callers.
+
+SingleFlight collapses identical in-flight calls into one; NegativeCache
+remembers keys that came back empty for a few seconds so repeats skip the
+work entirely.
+"""
+import time
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait for it and receive the same result (or exception).
+    Nothing is cached once the call finishes.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Return fn(), sharing the result with concurrent callers using ``key``"""
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self.calls += 1
+            else:
+                self.shared += 1
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def inflight(self):
+        """Number of keys currently being computed"""
+        with self._lock:
+            return len(self._inflight)
+
+    def stats(self):
+        return {"calls": self.calls, "shared": self.shared}
+
+
+class NegativeCache:
+    """Remembers keys that produced no result, for a short time.
+
+    Holds at most ``max_entries`` keys; past that the oldest are evicted first.
+    """
+
+    def __init__(self, ttl, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self._expiry = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        now = time.monotonic()
+        with self._lock:
+            expires = self._expiry.get(key)
+            if expires is None:
+                return False
+            if expires <= now:
+                del self._expiry[key]
+                return False
+            self.hits += 1
+            return True
+
+    def add(self, key):
+        if self.ttl <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            # Re-inserting keeps the dict in expiry order (one ttl for all), oldest first
+            self._expiry.pop(key, None)
+            while self._expiry:
+                oldest = next(iter(self._expiry))
+                if self._expiry[oldest] > now and len(self._expiry) < self.max_entries:
+                    break
+                del self._expiry[oldest]
+            self._expiry[key] = now + self.ttl
+
+    def __len__(self):
+        with self._lock:
+            return len(self._expiry)
+
+    def clear(self):
+        with self._lock:
+            self._expiry.clear()
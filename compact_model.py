@@ -0,0 +1,261 @@
+"""Compact, memory-mappable model artifacts.
+
+``export`` converts the joblib pair (model95.jb / vectorizer95.jb) into plain
+NumPy arrays in a directory:
+
+    terms.npy      sorted vocabulary as fixed-width UTF-8 bytes (index i == TF-IDF column i)
+    idf.npy        IDF weight per column
+    coef.npy       logistic regression coefficients, one per column
+    intercept.npy  logistic regression intercept
+    classes.npy    class ids
+    meta.json      tokenizer settings and the source artifacts' hashes
+
+``load_compact`` memory-maps those files, so several processes share the
+same physical pages through the OS page cache and cold start takes
+milliseconds instead of unpickling a Python dict vocabulary per process.
+Tokens are looked up by binary search in the mapped vocabulary, so no
+process builds its own term -> column map. The terms are stored as UTF-8
+bytes (one byte per character for most words) rather than NumPy's
+four-bytes-per-character unicode dtype; byte order matches code point
+order, so the array stays sorted.
+
+    python compact_model.py export
+    python compact_model.py verify
+"""
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import logging
+import argparse
+
+import numpy as np
+from scipy import sparse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+COMPACT_DIR = os.getenv("COMPACT_MODEL_DIR", "model_compact")
+FORMAT_VERSION = 3
+
+
+def file_sha256(path):
+    """Hex SHA-256 of a file, used to tie an export to its source artifacts"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def export_compact(model, vectorizer, out_dir=COMPACT_DIR, sources=None):
+    """Write the fitted vectorizer and classifier as .npy arrays plus meta.json"""
+    params = vectorizer.get_params()
+    if params["analyzer"] != "word" or params["ngram_range"] != (1, 1) or params["tokenizer"] or params["preprocessor"]:
+        raise ValueError("Only unigram word TF-IDF vectorizers can be exported")
+    if len(model.classes_) != 2:
+        raise ValueError("Only binary classifiers can be exported")
+
+    os.makedirs(out_dir, exist_ok=True)
+    vocabulary = vectorizer.vocabulary_
+    terms = sorted(vocabulary, key=vocabulary.get)
+    if terms != sorted(terms):
+        raise ValueError("Vocabulary indices are not in sorted term order")
+    encoded = np.array([term.encode("utf-8") for term in terms])
+    # Fixed-width bytes drop trailing NULs, which would break exact matches
+    if any(term.endswith(b"\0") for term in encoded.tolist()):
+        raise ValueError("Terms ending in NUL cannot be exported")
+
+    np.save(os.path.join(out_dir, "terms.npy"), encoded)
+    # Left over from format 2 exports
+    if os.path.exists(os.path.join(out_dir, "terms.txt")):
+        os.remove(os.path.join(out_dir, "terms.txt"))
+    np.save(os.path.join(out_dir, "idf.npy"), np.asarray(vectorizer.idf_, dtype=np.float64))
+    np.save(os.path.join(out_dir, "coef.npy"), np.asarray(model.coef_[0], dtype=np.float64))
+    np.save(os.path.join(out_dir, "intercept.npy"), np.asarray(model.intercept_, dtype=np.float64))
+    np.save(os.path.join(out_dir, "classes.npy"), np.asarray(model.classes_))
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "token_pattern": params["token_pattern"],
+        "lowercase": params["lowercase"],
+        "norm": params["norm"],
+        "sublinear_tf": params["sublinear_tf"],
+        "n_features": len(terms),
+        "sources": sources or {}
+    }
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+class CompactVectorizer:
+    """TF-IDF transform over memory-mapped arrays (drop-in for ``transform``)"""
+
+    def __init__(self, terms, idf, meta):
+        self.terms = terms
+        self.idf = idf
+        self.meta = meta
+        self.token_pattern = re.compile(meta["token_pattern"])
+
+    @property
+    def idf_(self):
+        return self.idf
+
+    def get_feature_names_out(self):
+        return np.array([term.decode("utf-8") for term in self.terms.tolist()], dtype=object)
+
+    def get_params(self):
+        return {key: self.meta[key] for key in ("token_pattern", "lowercase", "norm", "sublinear_tf")}
+
+    def tokenize(self, text):
+        if self.meta["lowercase"]:
+            text = text.lower()
+        return self.token_pattern.findall(text)
+
+    def lookup(self, tokens):
+        """Map tokens to column ids with a binary search; -1 for unknown tokens"""
+        if not tokens:
+            return np.empty(0, dtype=np.int64)
+        keys = np.array([token.encode("utf-8") for token in tokens])
+        # Tokens longer than the longest term cannot match; the cast below would truncate them
+        fits = np.char.str_len(keys) <= self.terms.itemsize
+        keys = keys.astype(self.terms.dtype)
+        idx = np.searchsorted(self.terms, keys)
+        idx[idx == len(self.terms)] = 0
+        return np.where(fits & (self.terms[idx] == keys), idx, -1)
+
+    def transform(self, texts):
+        """Return an L2-normalized TF-IDF CSR matrix matching sklearn's output"""
+        token_lists = [self.tokenize(text) for text in texts]
+        lengths = [len(tokens) for tokens in token_lists]
+        ids = self.lookup([token for tokens in token_lists for token in tokens])
+        rows = np.repeat(np.arange(len(texts)), lengths)
+        known = ids >= 0
+
+        # Duplicate (row, col) entries are summed into term counts by tocsr()
+        X = sparse.coo_matrix(
+            (np.ones(known.sum()), (rows[known], ids[known])),
+            shape=(len(texts), len(self.idf))
+        ).tocsr()
+        if self.meta["sublinear_tf"]:
+            np.log(X.data, X.data)
+            X.data += 1
+        X = X.multiply(self.idf).tocsr()
+        if self.meta["norm"] == "l2":
+            norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+            norms[norms == 0] = 1
+            X = sparse.diags(1 / norms) @ X
+        return X
+
+
+class CompactClassifier:
+    """Binary logistic regression over memory-mapped coefficients"""
+
+    def __init__(self, coef, intercept, classes):
+        self.coef = coef
+        self.intercept = intercept
+        self.classes_ = classes
+
+    @property
+    def coef_(self):
+        return self.coef.reshape(1, -1)
+
+    @property
+    def intercept_(self):
+        return self.intercept
+
+    def decision_function(self, X):
+        return np.asarray(X @ self.coef).ravel() + self.intercept[0]
+
+    def predict_proba(self, X):
+        positive = 1 / (1 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1 - positive, positive])
+
+    def predict(self, X):
+        return self.classes_[(self.decision_function(X) > 0).astype(int)]
+
+
+def load_compact(path=COMPACT_DIR, mmap=True):
+    """Load an exported directory as (classifier, vectorizer), memory-mapped by default"""
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    if meta.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported compact model format: {meta.get('format_version')}")
+
+    mode = "r" if mmap else None
+    arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode)
+              for name in ("terms", "idf", "coef", "intercept", "classes")}
+    vectorizer = CompactVectorizer(arrays["terms"], arrays["idf"], meta)
+    classifier = CompactClassifier(arrays["coef"], arrays["intercept"], arrays["classes"])
+    return classifier, vectorizer
+
+
+def is_current(path, model_path, vectorizer_path):
+    """True if ``path`` holds an export of exactly these joblib artifacts, in this format"""
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        sources = meta.get("sources", {})
+        return (meta.get("format_version") == FORMAT_VERSION
+                and sources.get("model") == file_sha256(model_path)
+                and sources.get("vectorizer") == file_sha256(vectorizer_path))
+    except (OSError, ValueError):
+        return False
+
+
+def sample_corpus(vectorizer, extra_docs=500, seed=42):
+    """log.csv headlines plus synthetic documents drawn from the vocabulary"""
+    import csv
+    import random
+
+    docs = []
+    if os.path.exists("log.csv"):
+        with open("log.csv", newline="", encoding="utf-8") as f:
+            docs = [row["news"] for row in csv.DictReader(f)]
+    rng = random.Random(seed)
+    vocabulary = list(vectorizer.get_feature_names_out())
+    for _ in range(extra_docs):
+        words = rng.choices(vocabulary, k=rng.randint(1, 40)) + rng.choices(["zzunknownzz", "the", "2024"], k=2)
+        docs.append(' '.join(words))
+    docs.append("")
+    return docs
+
+
+def main(argv=None):
+    import joblib
+    from scoring import MODEL_PATH, VECTORIZER_PATH, clean_text
+
+    parser = argparse.ArgumentParser(description="Export or verify compact model artifacts.")
+    parser.add_argument("command", choices=["export", "verify"])
+    parser.add_argument("--out", default=COMPACT_DIR, help="compact artifact directory")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    # Always compare against the original pickles, never a previous export
+    model, vectorizer = joblib.load(MODEL_PATH), joblib.load(VECTORIZER_PATH)
+    if args.command == "export":
+        sources = {"model": file_sha256(MODEL_PATH), "vectorizer": file_sha256(VECTORIZER_PATH)}
+        meta = export_compact(model, vectorizer, args.out, sources)
+        print(f"Exported {meta['n_features']} features to {args.out}/")
+        return
+
+    start = time.perf_counter()
+    compact_model, compact_vectorizer = load_compact(args.out)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    docs = [clean_text(doc) for doc in sample_corpus(vectorizer)]
+    expected = model.predict_proba(vectorizer.transform(docs))
+    actual = compact_model.predict_proba(compact_vectorizer.transform(docs))
+    max_diff = float(np.abs(expected - actual).max())
+    same_labels = bool((expected.argmax(axis=1) == actual.argmax(axis=1)).all())
+    print(f"Loaded compact artifacts in {load_ms:.1f} ms")
+    print(f"{len(docs)} documents: max probability difference {max_diff:.2e}, labels identical: {same_labels}")
+    if max_diff > 1e-9 or not same_labels:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+import numpy as np
+import scipy.sparse as sp
+from dotenv import load_dotenv
+from dedup import normalize_url
+from normalize import clean_texts
+from scoring import get_artifacts, loaded_artifact_version
+
+load_dotenv()
+
+# Index settings (overridable from .env)
+CORROBORATION_PATH = os.getenv("CORROBORATION_PATH", "corroboration.db")
+# Cosine similarity a stored article needs to count as a local match
+LOCAL_MIN_SIMILARITY = float(os.getenv("LOCAL_MIN_SIMILARITY", "0.3"))
+# Local matches needed before the network lookup is skipped
+LOCAL_MIN_MATCHES = int(os.getenv("LOCAL_MIN_MATCHES", "3"))
+# New rows are kept in a small block and folded into the main matrix past this size
+MERGE_EVERY = 256
+
+REFERENCE_FIELDS = ("title", "description", "url", "source", "publishedAt", "urlToImage")
+
+
+class CorroborationIndex:
+    """Persistent TF-IDF index of every reference and feed story seen so far.
+
+    Documents are title plus description, vectorized with the model's own
+    vectorizer (rows are L2-normalized, so cosine similarity is a dot
+    product). Vectors are stored in SQLite next to the article, so a new
+    process loads the index without re-vectorizing; rows written by a
+    different vectorizer are re-vectorized on load. In memory the matrix is
+    kept column-major, i.e. as an inverted index: a query only touches the
+    postings of its own terms. Additions go to a small row block that is
+    merged in every MERGE_EVERY documents.
+    """
+
+    def __init__(self, path=CORROBORATION_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._loaded = False
+        self._main = None
+        self._pending = []
+        self._articles = []
+        self._urls = set()
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS corroboration_docs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url_key TEXT NOT NULL UNIQUE,
+                    title TEXT,
+                    description TEXT,
+                    url TEXT,
+                    source TEXT,
+                    published_at TEXT,
+                    image TEXT,
+                    added_at REAL NOT NULL,
+                    version TEXT NOT NULL,
+                    indices BLOB NOT NULL,
+                    data BLOB NOT NULL
+                )
+            """)
+            self._conn.commit()
+        return self._conn
+
+    def _vectorize(self, texts):
+        _, vectorizer = get_artifacts()
+        return vectorizer.transform(clean_texts(texts)).astype(np.float32).tocsr()
+
+    def _load(self):
+        """Read every stored vector into memory, once per process"""
+        if self._loaded:
+            return
+        conn = self._connect()
+        version = loaded_artifact_version()
+        rows = conn.execute(
+            "SELECT id, title, description, url, source, published_at, image, version, indices, data "
+            "FROM corroboration_docs ORDER BY id"
+        ).fetchall()
+        stale = [row for row in rows if row[7] != version]
+        if stale:
+            # Vectors from another vectorizer are meaningless here; rebuild them from the text
+            fresh = self._vectorize([f"{row[1] or ''} {row[2] or ''}" for row in stale])
+            updates = [(version, _indices_blob(fresh, i), _data_blob(fresh, i), row[0]) for i, row in enumerate(stale)]
+            with conn:
+                conn.executemany("UPDATE corroboration_docs SET version=?, indices=?, data=? WHERE id=?", updates)
+            rebuilt = {row[0]: (u[1], u[2]) for row, u in zip(stale, updates)}
+            rows = [row[:8] + rebuilt[row[0]] if row[0] in rebuilt else row for row in rows]
+            logging.info(f"Re-vectorized {len(stale)} corroboration documents for artifacts {version}")
+        indices = [np.frombuffer(row[8], dtype=np.int32) for row in rows]
+        data = [np.frombuffer(row[9], dtype=np.float32) for row in rows]
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(i) for i in indices], out=indptr[1:])
+        width = len(get_artifacts()[1].idf_)
+        matrix = sp.csr_matrix(
+            (np.concatenate(data) if data else np.zeros(0, np.float32),
+             np.concatenate(indices) if indices else np.zeros(0, np.int32), indptr),
+            shape=(len(rows), width)
+        )
+        self._main = matrix.tocsc()
+        self._articles = [dict(zip(REFERENCE_FIELDS, (row[1], row[2], row[3], row[4], row[5], row[6]))) for row in rows]
+        self._urls = {normalize_url(article["url"]) for article in self._articles}
+        self._loaded = True
+
+    def add(self, articles):
+        """Index common-schema articles not seen before (by URL); returns how many were added"""
+        with self._lock:
+            self._load()
+            new, keys = [], set()
+            for article in articles:
+                key = normalize_url(article.get("url"))
+                if key and article.get("title") and key not in self._urls and key not in keys:
+                    new.append(article)
+                    keys.add(key)
+            if not new:
+                return 0
+            vectors = self._vectorize([f"{a['title']} {a.get('description') or ''}" for a in new])
+            version = loaded_artifact_version()
+            now = time.time()
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO corroboration_docs (url_key, title, description, url, source, "
+                    "published_at, image, added_at, version, indices, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(normalize_url(a["url"]), a["title"], a.get("description") or "", a["url"], a.get("source") or "",
+                      a.get("publishedAt") or "", a.get("urlToImage") or "", now, version,
+                      _indices_blob(vectors, i), _data_blob(vectors, i)) for i, a in enumerate(new)]
+                )
+            self._articles.extend({field: a.get(field) or "" for field in REFERENCE_FIELDS} for a in new)
+            self._urls.update(keys)
+            self._pending.append(vectors)
+            if sum(block.shape[0] for block in self._pending) >= MERGE_EVERY:
+                self._main = sp.vstack([self._main] + self._pending, format="csc")
+                self._pending = []
+            return len(new)
+
+    def search(self, text, k=6, min_score=LOCAL_MIN_SIMILARITY):
+        """Up to ``k`` stored articles most similar to ``text``, each with its cosine ``relevance``"""
+        query = self._vectorize([text])
+        with self._lock:
+            self._load()
+            main, pending, articles = self._main, list(self._pending), list(self._articles)
+        if query.nnz == 0 or not articles:
+            self.misses += 1
+            return []
+        # Only the postings of the query's terms are read from the main matrix
+        scores = np.asarray(main[:, query.indices] @ query.data).ravel()
+        if pending:
+            scores = np.concatenate([scores, (sp.vstack(pending) @ query.T).toarray().ravel()])
+        candidates = np.flatnonzero(scores >= min_score)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        best = sorted(candidates, key=lambda i: -scores[i])
+        if best:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return [dict(articles[i], relevance=float(scores[i])) for i in best]
+
+    def __len__(self):
+        with self._lock:
+            self._load()
+            return len(self._articles)
+
+    def clear(self):
+        """Drop every indexed document"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM corroboration_docs")
+            self._loaded = False
+            self._main, self._pending, self._articles, self._urls = None, [], [], set()
+
+    def stats(self):
+        """Document count and how often a search found local matches"""
+        searches = self.hits + self.misses
+        return {
+            "documents": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / searches if searches else 0
+        }
+
+
+def _indices_blob(matrix, row):
+    start, end = matrix.indptr[row], matrix.indptr[row + 1]
+    return matrix.indices[start:end].astype(np.int32).tobytes()
+
+
+def _data_blob(matrix, row):
+    start, end = matrix.indptr[row], matrix.indptr[row + 1]
+    return matrix.data[start:end].astype(np.float32).tobytes()
+
+
+corroboration_index = CorroborationIndex()
@@ -0,0 +1,167 @@
+"""Duplicate detection for news articles and batch inputs.
+
+Deduplicator combines two checks, each roughly constant time per item:
+
+* an exact set of normalized URLs (scheme/host case, trailing slash,
+  fragment and utm_* tracking parameters are ignored), and
+* a MinHash/LSH index over word sets: each text gets a MinHash signature,
+  split into bands; only items sharing a band bucket are compared, using
+  the same rule as before (word overlap / smaller set > threshold).
+
+LSH is tuned for pairs of similar length; a very short title wholly
+contained in a much longer one can be missed, which is the price for not
+comparing every pair.
+
+Both checks keep everything they have seen unless given ``max_items``, in
+which case only the most recent items are remembered, for long-running
+streams.
+"""
+import zlib
+import random
+from collections import defaultdict, deque
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import numpy as np
+
+NUM_PERM = 64
+BANDS = 16  # 16 bands x 4 rows: pairs with Jaccard >= ~0.5 very likely share a bucket
+_PRIME = (1 << 32) + 15
+_rng = random.Random(1)
+# Universal hash parameters, a < 2^31 so a * crc32 stays inside int64
+_A = np.array([_rng.randrange(1, 1 << 31) for _ in range(NUM_PERM)], dtype=np.int64)
+_B = np.array([_rng.randrange(0, 1 << 31) for _ in range(NUM_PERM)], dtype=np.int64)
+
+
+def normalize_url(url):
+    """Canonical form of a URL for exact duplicate checks"""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query) if not k.lower().startswith("utm_")])
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ""))
+
+
+def word_set(text):
+    return set(text.lower().split()) if text else set()
+
+
+def minhash(words):
+    """MinHash signature (NUM_PERM int64 values) of a non-empty word set"""
+    hashes = np.fromiter((zlib.crc32(w.encode()) for w in words), dtype=np.int64, count=len(words))
+    return ((np.outer(hashes, _A) + _B) % _PRIME).min(axis=0)
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index answering 'is this text a near-duplicate of one already added?'"""
+
+    def __init__(self, threshold=0.8, bands=BANDS, max_items=None):
+        if NUM_PERM % bands:
+            raise ValueError("bands must divide NUM_PERM")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self.max_items = max_items
+        # Ids only grow, so the oldest item is at the left of every bucket and of word_sets
+        self.buckets = defaultdict(deque)
+        self.word_sets = {}
+        self.band_keys = {}
+        self.next_id = 0
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def _overlap(self, a, b):
+        return len(a & b) / min(len(a), len(b))
+
+    def find(self, text):
+        """Id of an indexed near-duplicate of ``text``, or None"""
+        words = word_set(text)
+        if not words:
+            return None
+        return self._find(words, minhash(words))
+
+    def _find(self, words, signature):
+        checked = set()
+        for key in self._band_keys(signature):
+            for item_id in self.buckets.get(key, ()):
+                if item_id in checked:
+                    continue
+                checked.add(item_id)
+                if self._overlap(words, self.word_sets[item_id]) > self.threshold:
+                    return item_id
+        return None
+
+    def add(self, text):
+        """Index ``text`` unconditionally; returns its id (None for empty text)"""
+        words = word_set(text)
+        if not words:
+            return None
+        return self._add(words, minhash(words))
+
+    def _add(self, words, signature):
+        item_id = self.next_id
+        self.next_id += 1
+        self.word_sets[item_id] = words
+        keys = list(self._band_keys(signature))
+        for key in keys:
+            self.buckets[key].append(item_id)
+        if self.max_items is not None:
+            self.band_keys[item_id] = keys
+            while len(self.word_sets) > self.max_items:
+                self._evict_oldest()
+        return item_id
+
+    def _evict_oldest(self):
+        item_id = next(iter(self.word_sets))
+        del self.word_sets[item_id]
+        for key in self.band_keys.pop(item_id):
+            bucket = self.buckets[key]
+            bucket.popleft()
+            if not bucket:
+                del self.buckets[key]
+
+    def add_if_new(self, text):
+        """Index ``text`` and return True, or return False if it is a near-duplicate"""
+        words = word_set(text)
+        if not words:
+            return True
+        signature = minhash(words)
+        if self._find(words, signature) is not None:
+            return False
+        self._add(words, signature)
+        return True
+
+    def __len__(self):
+        return len(self.word_sets)
+
+
+class Deduplicator:
+    """Exact URL set plus near-duplicate text index, for streams of articles or documents"""
+
+    def __init__(self, threshold=0.8, max_items=None):
+        self.max_items = max_items
+        # A dict keeps insertion order, so the oldest URL is the first key
+        self.urls = {}
+        self.index = NearDuplicateIndex(threshold, max_items=max_items)
+
+    def is_new(self, text, url=None):
+        """Record the item and return True, or return False if it duplicates one already seen"""
+        if url:
+            key = normalize_url(url)
+            if key in self.urls:
+                return False
+        if not self.index.add_if_new(text):
+            return False
+        if url:
+            self.urls[key] = None
+            if self.max_items is not None and len(self.urls) > self.max_items:
+                del self.urls[next(iter(self.urls))]
+        return True
+
+    def filter(self, items, text=lambda item: item["title"], url=lambda item: item.get("url")):
+        """Yield the items that are neither URL nor near-text duplicates of earlier ones"""
+        for item in items:
+            if self.is_new(text(item), url(item)):
+                yield item
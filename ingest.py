@@ -0,0 +1,292 @@
+"""Continuous RSS/Atom ingestion for TruthLens.
+
+Polls a list of feeds, skips entries that were already ingested, scores the
+new ones in batches and writes them to the prediction store:
+
+    python ingest.py https://feeds.bbci.co.uk/news/rss.xml --interval 300
+    python ingest.py feeds/*.xml --once          # local files, single pass
+    FEED_URLS=https://a/rss,https://b/atom python ingest.py
+
+Remote feeds are fetched with conditional GETs (ETag / Last-Modified), local
+files are re-read only when their mtime changes. Fetching runs in its own
+thread and hands entries to the scorer through a bounded queue: when scoring
+or the database falls behind, the fetcher blocks instead of buffering, so
+memory stays flat however many feeds are polled.
+"""
+import os
+import re
+import html
+import time
+import queue
+import hashlib
+import logging
+import argparse
+import threading
+from datetime import datetime
+from urllib.parse import urlsplit
+
+import requests
+import feedparser
+from dotenv import load_dotenv
+
+import storage
+from dedup import Deduplicator
+from corroboration import corroboration_index
+from scoring import LABELS, fast_score_texts, get_fast_scorer
+
+load_dotenv()
+
+FEED_URLS = [url.strip() for url in os.getenv("FEED_URLS", "").split(",") if url.strip()]
+FEED_POLL_INTERVAL = float(os.getenv("FEED_POLL_INTERVAL", "300"))
+FEED_TIMEOUT = float(os.getenv("FEED_TIMEOUT", "10"))
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "64"))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "256"))
+# Recent entries remembered for near-duplicate checks across polls
+INGEST_DEDUP_WINDOW = int(os.getenv("INGEST_DEDUP_WINDOW", "10000"))
+# A partial batch is scored after this many seconds without new entries
+INGEST_FLUSH_AFTER = 1.0
+
+TAG_RE = re.compile(r"<[^>]+>")
+
+
+def item_key(entry):
+    """Stable identity of a feed entry: its guid, else its link, else its text"""
+    identity = entry.get("id") or entry.get("link") or (entry.get("title", "") + entry.get("summary", ""))
+    return hashlib.blake2b(identity.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def entry_text(entry):
+    """Title plus the summary with HTML stripped"""
+    summary = html.unescape(TAG_RE.sub(" ", entry.get("summary", "")))
+    return " ".join(f"{entry.get('title', '')}. {summary}".split()).strip(". ")
+
+
+def entry_reference(source, entry):
+    """A feed entry in the common reference schema, for the local corroboration index"""
+    published = entry.get("published_parsed") or entry.get("updated_parsed")
+    return {
+        "title": entry.get("title", ""),
+        "description": " ".join(html.unescape(TAG_RE.sub(" ", entry.get("summary", ""))).split()),
+        "url": entry.get("link", ""),
+        "source": os.path.basename(source) if is_local(source) else urlsplit(source).netloc,
+        "publishedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", published) if published else "",
+        "urlToImage": ""
+    }
+
+
+def is_local(source):
+    return source.startswith("file://") or os.path.exists(source)
+
+
+class FeedFetcher:
+    """Downloads feeds, skipping those unchanged since the last successful fetch"""
+
+    def __init__(self, timeout=FEED_TIMEOUT, db_path=None):
+        self.timeout = timeout
+        self.db_path = db_path
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = "TruthLens feed ingester"
+        self.not_modified = 0
+
+    def fetch(self, source):
+        """Return (entries, validators), or (None, None) when the feed has not changed"""
+        etag, modified = storage.get_feed_state(source, self.db_path)
+        if is_local(source):
+            path = source[len("file://"):] if source.startswith("file://") else source
+            mtime = str(os.stat(path).st_mtime_ns)
+            if mtime == modified:
+                self.not_modified += 1
+                return None, None
+            with open(path, "rb") as f:
+                return feedparser.parse(f.read()).entries, (None, mtime)
+
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if modified:
+            headers["If-Modified-Since"] = modified
+        response = self.session.get(source, headers=headers, timeout=self.timeout)
+        if response.status_code == 304:
+            self.not_modified += 1
+            return None, None
+        response.raise_for_status()
+        validators = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return feedparser.parse(response.content).entries, validators
+
+
+def new_items(source, fetcher, dedup):
+    """Yield pipeline messages for the unseen entries of one feed.
+
+    ("item", source, key, text, reference) entries to score, ("seen", source,
+    key, None) near duplicates to mark without scoring, and finally ("state",
+    source, validators) once every entry of the feed has been handed on.
+    """
+    try:
+        entries, validators = fetcher.fetch(source)
+    except (requests.RequestException, OSError) as e:
+        logging.warning(f"Feed {source} failed: {type(e).__name__}")
+        return
+    if entries is None:
+        return
+    keyed = {item_key(entry): entry for entry in entries}
+    for key in storage.unseen_feed_items(keyed, fetcher.db_path):
+        entry = keyed[key]
+        text = entry_text(entry)
+        if text and dedup.is_new(text, entry.get("link")):
+            yield ("item", source, key, text, entry_reference(source, entry))
+        else:
+            yield ("seen", source, key, None)
+    yield ("state", source, validators)
+
+
+def produce(sources, out_queue, fetcher, interval, once, stop):
+    """Poll every feed, then sleep; put() blocks while the scorer is behind.
+
+    Near duplicates are checked against the last INGEST_DEDUP_WINDOW entries
+    only, so the loop can run indefinitely; exact repeats are still caught
+    by the seen markers in the store.
+    """
+    dedup = Deduplicator(max_items=INGEST_DEDUP_WINDOW)
+    try:
+        while not stop.is_set():
+            for source in sources:
+                for message in new_items(source, fetcher, dedup):
+                    out_queue.put(message)
+            out_queue.put(("cycle",))
+            if once or stop.wait(interval):
+                break
+    finally:
+        out_queue.put(None)
+
+
+class BatchScorer:
+    """Scores queued entries in batches and commits them with their seen markers.
+
+    Entries with a link are also added to ``index`` (the local corroboration
+    index), so stories from the feeds can back up later analyses.
+    """
+
+    def __init__(self, batch_size=INGEST_BATCH_SIZE, db_path=None, index=None):
+        self.batch_size = batch_size
+        self.db_path = db_path
+        self.index = index
+        self.items = []
+        self.seen = []
+        self.scored = 0
+        self.skipped = 0
+
+    def add(self, source, key, text, reference=None):
+        if text is None:
+            self.seen.append((key, source))
+            self.skipped += 1
+        else:
+            self.items.append((source, key, text, reference))
+            if len(self.items) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        if not self.items and not self.seen:
+            return
+        results = fast_score_texts([text for _, _, text, _ in self.items])
+        timestamp = datetime.now().isoformat()
+        records = [{
+            "timestamp": timestamp,
+            "news": text,
+            "prediction": LABELS[pred],
+            "confidence": conf,
+            "references_found": None
+        } for (_, _, text, _), (pred, conf) in zip(self.items, results)]
+        seen = self.seen + [(key, source) for source, key, _, _ in self.items]
+        storage.append_predictions(records, seen, self.db_path)
+        self.scored += len(records)
+        if self.index is not None:
+            try:
+                self.index.add([ref for _, _, _, ref in self.items if ref and ref["url"]])
+            except Exception:
+                logging.exception("Adding feed entries to the local index failed")
+        self.items, self.seen = [], []
+
+
+def consume(in_queue, scorer, flush_after=INGEST_FLUSH_AFTER):
+    """Drain the queue into the scorer until the producer sends None"""
+    cycle_start, cycle_scored = time.perf_counter(), 0
+    while True:
+        try:
+            message = in_queue.get(timeout=flush_after)
+        except queue.Empty:
+            scorer.flush()
+            continue
+        if message is None:
+            scorer.flush()
+            return
+        kind = message[0]
+        if kind in ("item", "seen"):
+            scorer.add(*message[1:])
+        elif kind == "state":
+            # Validators are saved only after the feed's entries are committed
+            scorer.flush()
+            storage.set_feed_state(message[1], *message[2], path=scorer.db_path)
+        elif kind == "cycle":
+            scorer.flush()
+            elapsed = time.perf_counter() - cycle_start
+            new = scorer.scored - cycle_scored
+            logging.info(f"Poll cycle: {new} new items in {elapsed:.2f}s ({new / elapsed if elapsed else 0:.0f} items/sec)")
+            cycle_start, cycle_scored = time.perf_counter(), scorer.scored
+
+
+def run_ingest(sources, interval=FEED_POLL_INTERVAL, once=False, batch_size=INGEST_BATCH_SIZE,
+               queue_size=INGEST_QUEUE_SIZE, db_path=None, timeout=FEED_TIMEOUT, stop=None,
+               index=corroboration_index):
+    """Run the fetch -> dedupe -> score -> store pipeline; returns throughput stats"""
+    get_fast_scorer()
+    stop = stop or threading.Event()
+    fetcher = FeedFetcher(timeout, db_path)
+    scorer = BatchScorer(batch_size, db_path, index)
+    pipe = queue.Queue(maxsize=queue_size)
+    start = time.perf_counter()
+    producer = threading.Thread(target=produce, args=(sources, pipe, fetcher, interval, once, stop), daemon=True)
+    producer.start()
+    try:
+        consume(pipe, scorer)
+    finally:
+        stop.set()
+    elapsed = time.perf_counter() - start
+    return {
+        "scored": scorer.scored,
+        "skipped": scorer.skipped,
+        "not_modified": fetcher.not_modified,
+        "seconds": elapsed,
+        "items_per_sec": scorer.scored / elapsed if elapsed else 0
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Poll RSS/Atom feeds and score new articles.")
+    parser.add_argument("sources", nargs="*", help="feed URLs or local feed files (default: FEED_URLS)")
+    parser.add_argument("--feeds-file", help="file with one feed URL or path per line")
+    parser.add_argument("--interval", type=float, default=FEED_POLL_INTERVAL, help="seconds between polls")
+    parser.add_argument("--once", action="store_true", help="poll every feed once and exit")
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE)
+    parser.add_argument("--queue-size", type=int, default=INGEST_QUEUE_SIZE, help="entries buffered between fetcher and scorer")
+    parser.add_argument("--db", default=None, help="prediction store (default: TRUTHLENS_DB)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    sources = list(args.sources) or list(FEED_URLS)
+    if args.feeds_file:
+        with open(args.feeds_file) as f:
+            sources += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if not sources:
+        parser.error("no feeds given (pass URLs/files, --feeds-file or set FEED_URLS)")
+
+    try:
+        stats = run_ingest(sources, args.interval, args.once, args.batch_size, args.queue_size, args.db)
+    except KeyboardInterrupt:
+        return
+    print(f"Scored {stats['scored']} new items ({stats['skipped']} duplicates, "
+          f"{stats['not_modified']} unchanged feeds) in {stats['seconds']:.2f}s "
+          f"({stats['items_per_sec']:.0f} items/sec)")
+
+
+if __name__ == "__main__":
+    main()
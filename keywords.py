@@ -0,0 +1,156 @@
+"""Keyword extraction for building news search queries.
+
+Backends are plain functions ``text -> list of keywords`` registered in
+BACKENDS; KEYWORD_BACKEND selects the default:
+
+    tfidf     (default) whitespace tokenizer, frozen stop words and term
+              frequency x IDF ranking using the fitted vectorizer's IDF, with
+              a boost for capitalized (likely proper-noun) words
+    textblob  the original noun-phrase + POS-tag extraction (slow, optional)
+
+Queries are memoized by a hash of the text, so re-checking the same article
+costs a dictionary lookup.
+"""
+import os
+import re
+import string
+import hashlib
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+KEYWORD_BACKEND = os.getenv("KEYWORD_BACKEND", "tfidf")
+MAX_KEYWORDS = 5
+MEMO_SIZE = 1024
+
+STOP_WORDS = frozenset({
+    'the', 'is', 'at', 'which', 'on', 'a', 'an', 'as', 'are', 'was', 'were', 'been', 'be', 'have', 'has',
+    'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can', 'this',
+    'that', 'these', 'those', 'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you', 'your',
+    'yours', 'yourself', 'yourselves', 'he', 'him', 'his', 'himself', 'she', 'her', 'hers', 'herself', 'it',
+    'its', 'itself', 'they', 'them', 'their', 'theirs', 'themselves', 'what', 'who', 'whom', 'whose', 'why',
+    'how', 'when', 'where', 'if', 'or', 'because', 'until', 'while', 'of', 'by', 'for', 'with', 'through',
+    'during', 'before', 'after', 'above', 'below', 'up', 'down', 'in', 'out', 'off', 'over', 'under',
+    'again', 'further', 'then', 'once'
+})
+
+# Split on whitespace and trim punctuation so words in any script (e.g. Hindi
+# vowel signs, which \w does not match) stay whole
+WORD_RE = re.compile(r"\S+")
+PUNCTUATION = string.punctuation + "“”‘’।॥…"
+PROPER_NOUN_BOOST = 2.0
+SENTENCE_RE = re.compile(r'(?<=[.!?])\s')
+TAGS = frozenset({'NN', 'NNS', 'NNP', 'NNPS', 'JJ', 'JJR', 'JJS'})
+
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+_idf = None
+
+
+def _idf_lookup():
+    """term_idf(term, default) from the loaded model, plus the IDF used for unseen terms"""
+    global _idf
+    if _idf is None:
+        from scoring import get_fast_scorer
+        scorer = get_fast_scorer()
+        # Unseen words (names, new events) are the rarest of all, so rank them highest
+        _idf = (scorer.term_idf, scorer.max_idf)
+    return _idf
+
+
+def tfidf_keywords(text):
+    """Top terms by frequency x IDF, returned in the order they appear"""
+    counts = {}
+    first_seen = {}
+    capitalized = set()
+    for position, match in enumerate(WORD_RE.finditer(text)):
+        word = match.group().strip(PUNCTUATION)
+        key = word.lower()
+        if len(key) <= 2 or key in STOP_WORDS or key.isdigit():
+            continue
+        counts[key] = counts.get(key, 0) + 1
+        if key not in first_seen:
+            first_seen[key] = (position, word)
+        # Capitalized mid-sentence words are usually names, places and organisations
+        if position > 0 and word[0].isupper():
+            capitalized.add(key)
+
+    idf, unseen_idf = _idf_lookup()
+
+    def weight(key):
+        boost = PROPER_NOUN_BOOST if key in capitalized else 1.0
+        return counts[key] * idf(key, unseen_idf) * boost
+
+    top = sorted(counts, key=weight, reverse=True)[:MAX_KEYWORDS]
+    return [first_seen[k][1] for k in sorted(top, key=lambda k: first_seen[k][0])]
+
+
+def textblob_keywords(text):
+    """Noun phrases and nouns/adjectives via TextBlob (the original extractor)"""
+    from textblob import TextBlob
+
+    blob = TextBlob(text)
+    # Get noun phrases
+    noun_phrases = [phrase for phrase in blob.noun_phrases if len(phrase.split()) <= 3]
+
+    # Get important words (nouns, proper nouns, adjectives)
+    important_words = []
+    for word, pos in blob.tags:
+        if pos in TAGS and word.lower() not in STOP_WORDS and len(word) > 2:
+            important_words.append(word)
+
+    # Combine noun phrases and important words
+    keywords = list(set(noun_phrases + important_words[:10]))
+    return keywords[:MAX_KEYWORDS]
+
+
+BACKENDS = {
+    "tfidf": tfidf_keywords,
+    "textblob": textblob_keywords
+}
+
+
+def register_backend(name, extractor):
+    """Add a keyword backend: a function taking the text and returning keywords"""
+    BACKENDS[name] = extractor
+
+
+def _leading_sentences(text):
+    sentences = SENTENCE_RE.split(text)
+    return (sentences[0] + (" " + sentences[1] if len(sentences) >= 2 else "")) if sentences else text
+
+
+def _build_query(text, backend):
+    try:
+        keywords = BACKENDS[backend](text)
+    except Exception:
+        keywords = []
+    # If we have good keywords use them, otherwise fall back to the opening sentences
+    query = ' '.join(keywords) if keywords else _leading_sentences(text)
+    return query.strip().strip('"\'')[:200]
+
+
+def extract_query(text, backend=None):
+    """Extract meaningful query from article text with better keyword extraction"""
+    if not text:
+        return ""
+    backend = backend or KEYWORD_BACKEND
+    key = hashlib.blake2b(f"{backend}\0{text}".encode(), digest_size=16).digest()
+    with _memo_lock:
+        if key in _memo:
+            _memo.move_to_end(key)
+            return _memo[key]
+
+    query = _build_query(text, backend)
+    with _memo_lock:
+        _memo[key] = query
+        if len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+    return query
+
+
+def clear_memo():
+    with _memo_lock:
+        _memo.clear()
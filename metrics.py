@@ -0,0 +1,153 @@
+"""Lightweight timing instrumentation for the analysis hot path.
+
+Wrap a stage in ``span`` to record its duration in a process-wide histogram
+(and in the current ``trace``, if one is active):
+
+    with metrics.trace() as timings:
+        with metrics.span("extract_query"):
+            ...
+    timings  # {"extract_query": 1.8, ...} milliseconds
+
+Histograms keep cumulative Prometheus buckets plus a window of recent
+samples for p50/p95/p99, and can be exported with ``prometheus_text`` or
+``snapshot`` (JSON-ready dict).
+"""
+import time
+import bisect
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+
+# Upper bounds in seconds, 0.5 ms to 30 s
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# Recent samples kept per histogram for percentiles
+WINDOW = 2048
+
+_current_trace = contextvars.ContextVar("trace", default=None)
+# Provider requests of one trace finish on several executor threads at once
+_trace_lock = threading.Lock()
+
+
+class Histogram:
+    """Latency distribution of one stage"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=WINDOW)
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+        self.recent.append(seconds)
+
+    def percentiles(self):
+        samples = sorted(self.recent)
+        if not samples:
+            return {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+        pick = lambda q: round(samples[min(len(samples) - 1, int(q * len(samples)))] * 1000, 3)
+        return {"p50_ms": pick(0.5), "p95_ms": pick(0.95), "p99_ms": pick(0.99)}
+
+
+class Registry:
+    """Histograms keyed by stage name and labels"""
+
+    def __init__(self):
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds, labels=None):
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+
+    def snapshot(self):
+        """Per-stage count, mean and percentiles in milliseconds"""
+        with self._lock:
+            items = sorted(self.histograms.items())
+            stages = []
+            for (name, labels), histogram in items:
+                stages.append({
+                    "stage": name,
+                    "labels": dict(labels),
+                    "count": histogram.count,
+                    "mean_ms": round(histogram.total / histogram.count * 1000, 3),
+                    **histogram.percentiles()
+                })
+        return {"stages": stages}
+
+    def prometheus_text(self):
+        """Render every histogram in the Prometheus text exposition format"""
+        lines = [
+            "# HELP truthlens_stage_seconds Time spent in each analysis stage",
+            "# TYPE truthlens_stage_seconds histogram",
+        ]
+        with self._lock:
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                base = [f'stage="{name}"'] + [f'{k}="{v}"' for k, v in labels]
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ("+Inf",), histogram.counts):
+                    cumulative += count
+                    le = ",".join(base + [f'le="{bound}"'])
+                    lines.append(f"truthlens_stage_seconds_bucket{{{le}}} {cumulative}")
+                label_text = ",".join(base)
+                lines.append(f"truthlens_stage_seconds_sum{{{label_text}}} {histogram.total:.6f}")
+                lines.append(f"truthlens_stage_seconds_count{{{label_text}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+@contextmanager
+def span(name, **labels):
+    """Time the enclosed block into the registry and the active trace"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start, **labels)
+
+
+def record(name, elapsed, **labels):
+    """Add a duration measured elsewhere to the registry and the active trace"""
+    registry.observe(name, elapsed, labels)
+    timings = _current_trace.get()
+    if timings is not None:
+        key = ".".join([name] + [str(v) for _, v in sorted(labels.items())])
+        with _trace_lock:
+            timings[key] = round(timings.get(key, 0) + elapsed * 1000, 3)
+
+
+@contextmanager
+def trace():
+    """Collect the spans of one analysis into a dict of milliseconds per stage"""
+    timings = {}
+    token = _current_trace.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_trace.reset(token)
+
+
+def submit(executor, fn, *args):
+    """executor.submit that keeps spans in the worker attributed to the caller's trace"""
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+def snapshot():
+    return registry.snapshot()
+
+
+def prometheus_text():
+    return registry.prometheus_text()
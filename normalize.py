@@ -0,0 +1,49 @@
+"""Text normalization shared by training and serving.
+
+Reproduces the ``clean_text`` used to fit model95/vectorizer95 in
+``model traing/training95.ipynb``: lowercase, drop URLs (anything from
+``http``/``www`` to the next whitespace), @mentions, ``#``, digits and ASCII
+punctuation. The notebook's regex passes are folded into three precompiled
+patterns, applied in the notebook's order: URLs first, because the notebook
+matches ``http``/``www`` anywhere, including inside words and mentions; then
+mentions and ``#``, before any punctuation or digit next to an ``@`` is gone
+(so "(@user)", ".@user" and "2@user" lose the whole mention); then digits and
+punctuation.
+
+The one intentional difference is whitespace: the notebook deleted ``\\n``
+(gluing the words on either side together), here every run of whitespace
+becomes a single space. The training titles contain no newlines, so the
+token stream the vectorizer sees is identical on the training data, and
+pasted multi-paragraph articles are not mangled at serving time.
+"""
+import re
+import string
+
+URL_RE = re.compile(r"http\S+|www\S+")
+MENTION_RE = re.compile(r"@\w+|#")
+# Any run of digits or punctuation ('@' itself is punctuation, so stray ones go here)
+STRIP_RE = re.compile(r"[\d%s]+" % re.escape(string.punctuation))
+
+# Joins documents for clean_texts; no pattern matches it, so nothing matches across it
+_SEPARATOR = "\x1e"
+
+
+def clean_text(text):
+    """Clean and normalize text for processing"""
+    if not text:
+        return ""
+    text = STRIP_RE.sub("", MENTION_RE.sub("", URL_RE.sub("", text.lower())))
+    return " ".join(text.split())
+
+
+def clean_texts(texts):
+    """clean_text over a list, array or Series of documents, in one regex pass per pattern"""
+    texts = ["" if text is None else str(text) for text in texts]
+    if not texts:
+        return []
+    joined = _SEPARATOR.join(texts)
+    if joined.count(_SEPARATOR) != max(len(texts) - 1, 0):
+        # A document contains the separator itself; fall back to one at a time
+        return [clean_text(text) for text in texts]
+    joined = STRIP_RE.sub("", MENTION_RE.sub("", URL_RE.sub("", joined.lower())))
+    return [" ".join(part.split()) for part in joined.split(_SEPARATOR)]
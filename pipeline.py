@@ -0,0 +1,129 @@
+"""Small DAG executor for multi-stage work such as one article analysis.
+
+A Stage names the stages it depends on (``after``) and receives their
+results as keyword arguments. Stages whose dependencies are done run
+concurrently on a shared thread pool, and ``Pipeline.stream`` yields each
+result as soon as it is ready, so a caller can show the model verdict
+before the network-bound reference lookup has finished. Stages marked
+``network`` run on a pool of their own, so slow lookups from other
+analyses cannot hold up the CPU-bound stages.
+
+A stage with a ``timeout`` stops being waited for that many seconds after
+it starts running (time spent queued for a worker does not count). On a
+timeout or an error, the stage's ``fallback`` is called with the same
+arguments and its value is used instead. A stage without a fallback
+re-raises the error to the caller. A timed-out stage keeps running in its
+worker thread, but its late result is ignored.
+"""
+import time
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+import metrics
+
+MAX_WORKERS = 4
+MAX_NETWORK_WORKERS = 8
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="pipeline")
+_network_executor = ThreadPoolExecutor(max_workers=MAX_NETWORK_WORKERS, thread_name_prefix="pipeline-net")
+
+
+class StageTimeout(Exception):
+    """A stage did not finish within its timeout"""
+
+
+class Stage:
+    """One step of a pipeline; ``fn`` gets the results of the stages in ``after`` as keyword arguments"""
+
+    def __init__(self, name, fn, after=(), timeout=None, fallback=None, network=False):
+        self.name = name
+        self.fn = fn
+        self.after = tuple(after)
+        self.timeout = timeout
+        self.fallback = fallback
+        self.network = network
+
+
+class Pipeline:
+    """Runs stages in dependency order, independent stages at the same time"""
+
+    def __init__(self, stages, executor=None, network_executor=None):
+        self.stages = list(stages)
+        self.executor = executor or _executor
+        self.network_executor = network_executor or _network_executor
+        names = [stage.name for stage in self.stages]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate stage names in {names}")
+        # Resolving the order once rejects unknown dependencies and cycles up front
+        done = set()
+        remaining = list(self.stages)
+        while remaining:
+            ready = [stage for stage in remaining if done.issuperset(stage.after)]
+            if not ready:
+                raise ValueError(f"Unknown or cyclic dependencies: {[s.name for s in remaining]}")
+            done.update(stage.name for stage in ready)
+            remaining = [stage for stage in remaining if stage not in ready]
+
+    def run(self):
+        """Run every stage and return {stage name: result}"""
+        return dict(self.stream())
+
+    def stream(self):
+        """Run the stages, yielding (stage name, result) as each one finishes"""
+        results = {}
+        waiting = list(self.stages)
+        running = {}
+        while waiting or running:
+            # Start every stage whose inputs are all available
+            for stage in [s for s in waiting if all(dep in results for dep in s.after)]:
+                waiting.remove(stage)
+                kwargs = {dep: results[dep] for dep in stage.after}
+                # Resolved with the start time once a worker picks the stage up
+                started = Future()
+                executor = self.network_executor if stage.network else self.executor
+                future = metrics.submit(executor, self._run, stage, kwargs, started)
+                running[future] = (stage, kwargs, started)
+
+            deadlines = [self._deadline(stage, started) for stage, _, started in running.values()]
+            deadlines = [deadline for deadline in deadlines if deadline is not None]
+            timeout = max(min(deadlines) - time.monotonic(), 0) if deadlines else None
+            # A timed stage that has not started yet wakes the wait when it does, to arm its deadline
+            starts = [started for stage, _, started in running.values() if stage.timeout and not started.done()]
+            done, _ = wait(list(running) + starts, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            finished = []
+            for future in [f for f in done if f in running]:
+                stage, kwargs, _ = running.pop(future)
+                try:
+                    value = future.result()
+                except Exception as e:
+                    value = self._fallback(stage, kwargs, e)
+                finished.append((stage.name, value))
+            now = time.monotonic()
+            for future, (stage, kwargs, started) in list(running.items()):
+                deadline = self._deadline(stage, started)
+                if deadline is not None and deadline <= now:
+                    del running[future]
+                    error = StageTimeout(f"Stage {stage.name!r} did not finish within {stage.timeout}s")
+                    finished.append((stage.name, self._fallback(stage, kwargs, error)))
+
+            for name, value in finished:
+                results[name] = value
+                yield name, value
+
+    @staticmethod
+    def _deadline(stage, started):
+        """When ``stage`` times out, or None if it has no timeout or has not started"""
+        if not stage.timeout or not started.done():
+            return None
+        return started.result() + stage.timeout
+
+    def _run(self, stage, kwargs, started):
+        started.set_result(time.monotonic())
+        with metrics.span("stage", stage=stage.name):
+            return stage.fn(**kwargs)
+
+    def _fallback(self, stage, kwargs, error):
+        if stage.fallback is None:
+            raise error
+        logging.warning(f"Stage {stage.name!r} failed ({type(error).__name__}: {error}), using its fallback")
+        return stage.fallback(**kwargs)
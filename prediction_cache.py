@@ -0,0 +1,197 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Cache settings (overridable from .env)
+PREDICTION_CACHE_PATH = os.getenv("PREDICTION_CACHE_PATH", "prediction_cache.db")
+PREDICTION_CACHE_MAX_ENTRIES = int(os.getenv("PREDICTION_CACHE_MAX_ENTRIES", "20000"))
+# Recent entries kept in process memory in front of the shared file
+PREDICTION_MEMO_SIZE = int(os.getenv("PREDICTION_MEMO_SIZE", "1024"))
+
+
+def content_key(cleaned_text):
+    """Stable hash of already-cleaned article text"""
+    return hashlib.blake2b(cleaned_text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class PredictionCache:
+    """SQLite-backed memo of model outputs keyed on text hash and artifact version.
+
+    Every session and worker process pointing at the same file shares the
+    entries. Rows written for a different model/vectorizer pair never match
+    (the version is part of the key) and are purged the first time a process
+    with a new version opens the cache. Least recently used rows are evicted
+    past ``max_entries``. A small in-process LRU answers repeats without a
+    database round trip; its hits are added to the shared counters on the
+    next write.
+    """
+
+    def __init__(self, path=PREDICTION_CACHE_PATH, max_entries=PREDICTION_CACHE_MAX_ENTRIES,
+                 memo_size=PREDICTION_MEMO_SIZE):
+        self.path = path
+        self.max_entries = max_entries
+        self.memo_size = memo_size
+        self.hits = 0
+        self.misses = 0
+        self._memo = OrderedDict()
+        self._pending_hits = 0
+        self._conn = None
+        self._purged = set()
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS prediction_cache (
+                    version TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    prediction INTEGER NOT NULL,
+                    confidence REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (version, key)
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pred_cache_last_access ON prediction_cache (last_access)")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS prediction_cache_counters (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            """)
+            self._conn.execute("INSERT OR IGNORE INTO prediction_cache_counters VALUES ('hits', 0), ('misses', 0)")
+            self._conn.commit()
+        return self._conn
+
+    def _purge_other_versions(self, conn, version):
+        if version not in self._purged:
+            deleted = conn.execute("DELETE FROM prediction_cache WHERE version != ?", (version,)).rowcount
+            if deleted:
+                logging.info(f"Dropped {deleted} cached predictions from older model artifacts")
+            self._purged.add(version)
+
+    def _remember(self, version, results):
+        for key, result in results.items():
+            self._memo[(version, key)] = result
+            self._memo.move_to_end((version, key))
+        while len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+
+    def get_many(self, version, keys):
+        """Return {key: (prediction, confidence)} for the keys already cached"""
+        unique = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock:
+            for key in unique:
+                result = self._memo.get((version, key))
+                if result is not None:
+                    self._memo.move_to_end((version, key))
+                    found[key] = result
+            self.hits += len(found)
+            self._pending_hits += len(found)
+        remaining = [key for key in unique if key not in found]
+        if not remaining:
+            return found
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                self._purge_other_versions(conn, version)
+                shared = {}
+                for start in range(0, len(remaining), 500):
+                    batch = remaining[start:start + 500]
+                    marks = ",".join("?" * len(batch))
+                    rows = conn.execute(
+                        f"SELECT key, prediction, confidence FROM prediction_cache WHERE version=? AND key IN ({marks})",
+                        [version] + batch
+                    ).fetchall()
+                    for key, pred, conf in rows:
+                        shared[key] = (pred, conf)
+                    if rows:
+                        conn.execute(
+                            f"UPDATE prediction_cache SET last_access=? WHERE version=? AND key IN ({marks})",
+                            [now, version] + batch
+                        )
+                misses = len(remaining) - len(shared)
+                self._flush_counters(conn, len(shared), misses)
+                conn.commit()
+                self.hits += len(shared)
+                self.misses += misses
+                self._remember(version, shared)
+                found.update(shared)
+        except sqlite3.Error:
+            logging.exception("Prediction cache read failed")
+        return found
+
+    def _flush_counters(self, conn, hits=0, misses=0):
+        hits += self._pending_hits
+        conn.execute("UPDATE prediction_cache_counters SET value = value + ? WHERE name='hits'", (hits,))
+        conn.execute("UPDATE prediction_cache_counters SET value = value + ? WHERE name='misses'", (misses,))
+        self._pending_hits = 0
+
+    def put_many(self, version, results):
+        """Store {key: (prediction, confidence)} and evict past the size cap"""
+        if not results:
+            return
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO prediction_cache VALUES (?, ?, ?, ?, ?, ?)",
+                    [(version, key, int(pred), float(conf), now, now) for key, (pred, conf) in results.items()]
+                )
+                conn.execute(
+                    "DELETE FROM prediction_cache WHERE rowid IN ("
+                    "SELECT rowid FROM prediction_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+                self._flush_counters(conn)
+                conn.commit()
+                self._remember(version, results)
+        except sqlite3.Error:
+            logging.exception("Prediction cache write failed")
+
+    def clear(self):
+        """Drop every cached prediction and reset the counters"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM prediction_cache")
+            conn.execute("UPDATE prediction_cache_counters SET value = 0")
+            conn.commit()
+            self._memo.clear()
+            self.hits = self.misses = self._pending_hits = 0
+
+    def stats(self):
+        """Hit/miss counters for this process and across every process sharing the file"""
+        with self._lock:
+            conn = self._connect()
+            if self._pending_hits:
+                self._flush_counters(conn)
+                conn.commit()
+            entries = conn.execute("SELECT COUNT(*) FROM prediction_cache").fetchone()[0]
+            shared = dict(conn.execute("SELECT name, value FROM prediction_cache_counters").fetchall())
+        lookups = self.hits + self.misses
+        shared_lookups = shared["hits"] + shared["misses"]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0,
+            "shared_hits": shared["hits"],
+            "shared_misses": shared["misses"],
+            "shared_hit_rate": shared["hits"] / shared_lookups if shared_lookups else 0,
+            "entries": entries
+        }
+
+
+prediction_cache = PredictionCache()
@@ -0,0 +1,231 @@
+import os
+import time
+import random
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+import metrics
+
+load_dotenv()
+
+# Client settings (overridable from .env)
+MAX_RETRIES = int(os.getenv("PROVIDER_MAX_RETRIES", "2"))
+BACKOFF_BASE = float(os.getenv("PROVIDER_BACKOFF_BASE", "0.5"))
+BREAKER_THRESHOLD = int(os.getenv("PROVIDER_BREAKER_THRESHOLD", "3"))
+BREAKER_COOLDOWN = float(os.getenv("PROVIDER_BREAKER_COOLDOWN", "60"))
+POOL_SIZE = 10
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class ProviderUnavailable(Exception):
+    """Raised when a provider's circuit breaker is open or it rejects the request"""
+
+
+class CircuitBreaker:
+    """Skip a provider for a cooldown window after repeated failures.
+
+    closed -> open after ``threshold`` consecutive failures; once the cooldown
+    has passed a single trial call is let through (half-open) and its outcome
+    either closes the breaker again or re-opens it for another cooldown.
+    """
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        """Return True if a call may go out right now"""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.failures >= self.threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+    def remaining_cooldown(self):
+        if self.opened_at is None:
+            return 0
+        return max(0, self.cooldown - (time.monotonic() - self.opened_at))
+
+
+def retry_after_seconds(response):
+    """Parse a Retry-After header (delta seconds or HTTP date), None if absent"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class ProviderClient:
+    """Pooled keep-alive HTTP client for one news provider.
+
+    Wraps a ``requests.Session`` with bounded, jittered retries on 429/5xx that
+    honour Retry-After, a circuit breaker, and rolling latency/error stats.
+    Other 4xx answers except 404 (bad key, forbidden) count as breaker
+    failures and raise ProviderUnavailable.
+    A ``limiter`` passed to ``get`` (see ratelimit.py) admits every attempt,
+    retries included, so each one counts against the provider's quota.
+    """
+
+    def __init__(self, name, max_retries=MAX_RETRIES, backoff=BACKOFF_BASE, breaker=None):
+        self.name = name
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.latencies = deque(maxlen=200)
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.last_error = None
+        self._lock = threading.Lock()
+
+    def get(self, url, timeout, limiter=None, **kwargs):
+        """GET with retries; ``timeout`` is the total budget across all attempts"""
+        end = time.monotonic() + timeout
+        if limiter is not None:
+            limiter.acquire(end)
+        if not self.breaker.allow():
+            if limiter is not None:
+                limiter.refund()
+            raise ProviderUnavailable(
+                f"{self.name} circuit open, retrying in {self.breaker.remaining_cooldown():.0f}s"
+            )
+
+        attempt = 0
+        while True:
+            start = time.monotonic()
+            try:
+                with metrics.span("provider_request", provider=self.name):
+                    res = self.session.get(url, timeout=max(end - start, 0.1), **kwargs)
+            except requests.RequestException as e:
+                self._record(time.monotonic() - start, error=type(e).__name__)
+                if attempt < self.max_retries and self._sleep_before_retry(attempt, end, limiter=limiter):
+                    attempt += 1
+                    continue
+                self.breaker.record_failure()
+                raise
+
+            failed = res.status_code in RETRY_STATUSES
+            # A rejected key (401/403) or bad request fails the same way on every call;
+            # 404 is an answer ("nothing here"), not a provider fault
+            rejected = not failed and res.status_code >= 400 and res.status_code != 404
+            self._record(time.monotonic() - start, error=f"HTTP {res.status_code}" if failed or rejected else None)
+            if rejected:
+                self.breaker.record_failure()
+                raise ProviderUnavailable(f"{self.name} answered HTTP {res.status_code}")
+            if failed and attempt < self.max_retries and self._sleep_before_retry(
+                    attempt, end, retry_after_seconds(res), limiter):
+                attempt += 1
+                continue
+
+            if failed:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            return res
+
+    def _sleep_before_retry(self, attempt, end, retry_after=None, limiter=None):
+        """Back off before the next attempt; False if it would overrun the budget or the quota"""
+        delay = retry_after if retry_after is not None else self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+        if time.monotonic() + delay >= end:
+            return False
+        logging.info(f"{self.name} request failed ({self.last_error}), retrying in {delay:.2f}s")
+        time.sleep(delay)
+        if limiter is not None:
+            try:
+                limiter.acquire(end)
+            except ProviderUnavailable as e:
+                logging.info(f"Not retrying: {e}")
+                return False
+        with self._lock:
+            self.retries += 1
+        return True
+
+    def _record(self, elapsed, error=None):
+        with self._lock:
+            self.requests += 1
+            self.latencies.append(elapsed)
+            if error:
+                self.errors += 1
+                self.last_error = error
+
+    def stats(self):
+        """Breaker state plus latency/error figures for the status panel"""
+        with self._lock:
+            samples = sorted(self.latencies)
+            requests_made, errors, retries, last_error = self.requests, self.errors, self.retries, self.last_error
+        return {
+            "state": self.breaker.state,
+            "requests": requests_made,
+            "errors": errors,
+            "retries": retries,
+            "error_rate": errors / requests_made if requests_made else 0,
+            "p50_ms": samples[len(samples) // 2] * 1000 if samples else None,
+            "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000 if samples else None,
+            "last_error": last_error
+        }
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(name):
+    """Return the shared client for a provider, creating it on first use"""
+    with _clients_lock:
+        if name not in _clients:
+            _clients[name] = ProviderClient(name)
+        return _clients[name]
+
+
+def provider_stats():
+    """Stats for every provider that has been used in this process"""
+    with _clients_lock:
+        clients = list(_clients.values())
+    return {client.name: client.stats() for client in clients}
@@ -0,0 +1,313 @@
+"""News provider plug-ins for reference lookups.
+
+Each provider is a class that knows its endpoint, how to build a search
+request, and how to turn the provider's JSON into the common reference
+schema (title, description, url, source, publishedAt, urlToImage).
+``search`` goes through the shared ProviderClient, so retries, the circuit
+breaker and latency stats apply to every adapter alike. ``normalize`` only
+sees the decoded body, so adapters can be checked against recorded
+responses without any network (see benchmarks/bench_providers.py).
+
+Adding a provider means subclassing NewsProvider and listing an instance in
+PROVIDERS; references.fetch_references queries every enabled one.
+"""
+import os
+import re
+import logging
+from dotenv import load_dotenv
+from provider_client import get_client, ProviderUnavailable
+from ratelimit import get_limiter
+
+load_dotenv()
+
+TAG_RE = re.compile(r"<[^>]+>")
+
+
+def parse_overrides(value, cast):
+    """Parse "Guardian:1.5,Bing:0.8" into {"Guardian": 1.5, "Bing": 0.8}"""
+    overrides = {}
+    for item in value.split(","):
+        name, _, setting = item.partition(":")
+        if not name.strip() or not setting.strip():
+            continue
+        try:
+            overrides[name.strip()] = cast(setting.strip())
+        except ValueError:
+            logging.warning(f"Ignoring provider setting {item.strip()!r}")
+    return overrides
+
+
+# Relevance multiplier and the most results a provider may contribute to one lookup,
+# e.g. PROVIDER_WEIGHTS="Guardian:1.2,Bing:0.8" PROVIDER_QUOTAS="NewsData:2"
+PROVIDER_WEIGHTS = parse_overrides(os.getenv("PROVIDER_WEIGHTS", ""), float)
+PROVIDER_QUOTAS = parse_overrides(os.getenv("PROVIDER_QUOTAS", ""), int)
+
+
+def parse_rate(value):
+    """Parse "30/900" (30 requests per 900 seconds) or "3" (per second) into (30, 900.0)"""
+    requests, _, per = value.partition("/")
+    return int(requests), float(per or 1)
+
+
+# Request limits for paid plans, e.g. PROVIDER_RATE_LIMITS="NewsAPI:10/1"
+# PROVIDER_DAILY_LIMITS="NewsAPI:1000"; the defaults below are the free tiers
+PROVIDER_RATE_LIMITS = parse_overrides(os.getenv("PROVIDER_RATE_LIMITS", ""), parse_rate)
+PROVIDER_DAILY_LIMITS = parse_overrides(os.getenv("PROVIDER_DAILY_LIMITS", ""), int)
+
+
+def reference(title, description, url, source, published_at, image):
+    """Build one article in the common reference schema"""
+    return {
+        "title": title,
+        "description": description or "",
+        "url": url,
+        "source": source or "",
+        "publishedAt": published_at or "",
+        "urlToImage": image or ""
+    }
+
+
+class NewsProvider:
+    """Base class for a news search API.
+
+    Subclasses set the class attributes and implement ``request`` and
+    ``normalize``; weight and quota can be overridden per deployment via
+    PROVIDER_WEIGHTS / PROVIDER_QUOTAS, and the API's request limits
+    (``rate_limit`` as (requests, seconds), ``daily_limit``) via
+    PROVIDER_RATE_LIMITS / PROVIDER_DAILY_LIMITS.
+    """
+
+    id = None           # key in app.API_PROVIDERS
+    name = None         # ProviderClient, reference cache and metrics label
+    label = None        # shown in the API status panel
+    env_key = None
+    default_key = None  # built-in demo key, if any
+    endpoint = None
+    weight = 1.0
+    quota = None
+    rate_limit = None
+    daily_limit = None
+
+    def __init__(self):
+        self.weight = PROVIDER_WEIGHTS.get(self.name, self.weight)
+        self.quota = PROVIDER_QUOTAS.get(self.name, self.quota)
+        self.rate_limit = PROVIDER_RATE_LIMITS.get(self.name, self.rate_limit)
+        self.daily_limit = PROVIDER_DAILY_LIMITS.get(self.name, self.daily_limit)
+
+    @property
+    def limiter(self):
+        """Shared ratelimit.RateLimiter every request to this provider goes through"""
+        return get_limiter(self.name, self.rate_limit, self.daily_limit)
+
+    @property
+    def api_key(self):
+        return os.getenv(self.env_key) or self.default_key
+
+    @property
+    def enabled(self):
+        return bool(self.api_key)
+
+    def request(self, query, num_results):
+        """Return (params, headers) for a search"""
+        raise NotImplementedError
+
+    def normalize(self, payload):
+        """Turn a decoded response body into common-schema articles"""
+        raise NotImplementedError
+
+    def search(self, query, num_results, timeout):
+        """Query the provider and return up to ``num_results`` common-schema articles"""
+        params, headers = self.request(query, num_results)
+        res = get_client(self.name).get(self.endpoint, timeout, limiter=self.limiter, params=params, headers=headers)
+        if res.status_code != 200:
+            # Not an answer: the lookup must not take it for "no articles"
+            raise ProviderUnavailable(f"{self.name} answered HTTP {res.status_code}")
+        return self.normalize(res.json())[:num_results]
+
+
+class BingNews(NewsProvider):
+    id = "bing"
+    name = "Bing"
+    label = "Bing News"
+    env_key = "BING_API_KEY"
+    default_key = "b44bOb62d7msh4c3029991170245p180afajsn2077ee7fd1eO"
+    endpoint = "https://bing-news-search1.p.rapidapi.com/news/search"
+    rate_limit = (3, 1)
+    daily_limit = 1000
+
+    def request(self, query, num_results):
+        headers = {
+            "X-BingApis-SDK": "true",
+            "X-RapidAPI-Key": self.api_key,
+            "X-RapidAPI-Host": "bing-news-search1.p.rapidapi.com"
+        }
+        params = {
+            "q": query,
+            "count": num_results,
+            "textFormat": "Raw",
+            "safeSearch": "Off",
+            "sortBy": "Relevance"
+        }
+        return params, headers
+
+    def normalize(self, payload):
+        return [reference(
+            item["name"],
+            item.get("description"),
+            item["url"],
+            (item.get("provider") or [{}])[0].get("name"),
+            item.get("datePublished"),
+            item.get("image", {}).get("thumbnail", {}).get("contentUrl")
+        ) for item in payload.get("value", []) if item.get("name") and item.get("url")]
+
+
+class NewsAPI(NewsProvider):
+    id = "newsapi"
+    name = "NewsAPI"
+    label = "NewsAPI"
+    env_key = "NEWSAPI_KEY"
+    default_key = "07594036124e431aa51b101ac842a868"
+    endpoint = "https://newsapi.org/v2/everything"
+    rate_limit = (1, 1)
+    daily_limit = 100
+
+    def request(self, query, num_results):
+        params = {
+            "q": query,
+            "apiKey": self.api_key,
+            "pageSize": num_results,
+            "language": "en",
+            "sortBy": "relevancy"
+        }
+        return params, None
+
+    def normalize(self, payload):
+        return [reference(
+            art["title"],
+            art.get("description"),
+            art["url"],
+            (art.get("source") or {}).get("name"),
+            art.get("publishedAt"),
+            art.get("urlToImage")
+        ) for art in payload.get("articles", []) if art.get("title") and art.get("url")]
+
+
+class GNews(NewsProvider):
+    id = "gnews"
+    name = "GNews"
+    label = "GNews API"
+    env_key = "GNEWS_API_KEY"
+    endpoint = "https://gnews.io/api/v4/search"
+    rate_limit = (1, 1)
+    daily_limit = 100
+
+    def request(self, query, num_results):
+        params = {
+            "q": query,
+            "apikey": self.api_key,
+            "max": num_results,
+            "lang": "en",
+            "sortby": "relevance"
+        }
+        return params, None
+
+    def normalize(self, payload):
+        return [reference(
+            art["title"],
+            art.get("description"),
+            art["url"],
+            (art.get("source") or {}).get("name"),
+            art.get("publishedAt"),
+            art.get("image")
+        ) for art in payload.get("articles", []) if art.get("title") and art.get("url")]
+
+
+class NewsData(NewsProvider):
+    id = "newsdata"
+    name = "NewsData"
+    label = "NewsData API"
+    env_key = "NEWSDATA_API_KEY"
+    endpoint = "https://newsdata.io/api/1/news"
+    rate_limit = (30, 900)
+    daily_limit = 200
+
+    def request(self, query, num_results):
+        params = {
+            "q": query,
+            "apikey": self.api_key,
+            "size": min(num_results, 10),  # the free plan rejects larger pages
+            "language": "en"
+        }
+        return params, None
+
+    def normalize(self, payload):
+        results = []
+        for art in payload.get("results") or []:
+            if not art.get("title") or not art.get("link"):
+                continue
+            # "2024-06-29 19:05:00" (UTC) -> ISO 8601 like the other providers
+            published = art.get("pubDate") or ""
+            if published and "T" not in published:
+                published = published.replace(" ", "T") + "Z"
+            results.append(reference(
+                art["title"],
+                art.get("description"),
+                art["link"],
+                art.get("source_name") or art.get("source_id"),
+                published,
+                art.get("image_url")
+            ))
+        return results
+
+
+class Guardian(NewsProvider):
+    id = "guardian"
+    name = "Guardian"
+    label = "Guardian API"
+    env_key = "GUARDIAN_API_KEY"
+    endpoint = "https://content.guardianapis.com/search"
+    rate_limit = (1, 1)
+    daily_limit = 500
+
+    def request(self, query, num_results):
+        params = {
+            "q": query,
+            "api-key": self.api_key,
+            "page-size": num_results,
+            "order-by": "relevance",
+            "show-fields": "trailText,thumbnail"
+        }
+        return params, None
+
+    def normalize(self, payload):
+        results = []
+        for item in payload.get("response", {}).get("results", []):
+            if not item.get("webTitle") or not item.get("webUrl"):
+                continue
+            fields = item.get("fields") or {}
+            results.append(reference(
+                item["webTitle"],
+                TAG_RE.sub("", fields.get("trailText", "")),  # trailText is an HTML fragment
+                item["webUrl"],
+                "The Guardian",
+                item.get("webPublicationDate"),
+                fields.get("thumbnail")
+            ))
+        return results
+
+
+# Priority order: earlier providers win ties in relevance
+PROVIDERS = [BingNews(), NewsAPI(), GNews(), NewsData(), Guardian()]
+
+
+def get_provider(provider_id):
+    """Return the registered provider with the given id"""
+    for provider in PROVIDERS:
+        if provider.id == provider_id:
+            return provider
+    raise KeyError(provider_id)
+
+
+def enabled_providers():
+    """Providers with an API key configured, in priority order"""
+    return [provider for provider in PROVIDERS if provider.enabled]
@@ -0,0 +1,362 @@
+"""Per-provider request budgets: a sliding window for the per-second limit
+and a persistent counter for the daily one.
+
+Every provider request takes a slot before it goes out: a provider limited
+to ``requests`` per ``per`` seconds gets a slot only while fewer than
+``requests`` were sent in the last ``per`` seconds (plus RATE_LIMIT_MARGIN,
+so network jitter cannot bunch requests up on arrival). Unlike a token
+bucket, this never lets a burst plus a refill reach the provider inside
+one window. When no slot is free, callers queue in priority order
+(interactive lookups from the app ahead of batch ones such as the server's
+/references endpoint), and a caller that cannot get a slot before its
+deadline is shed with RateLimited instead of being sent. The daily count
+lives in SQLite, so it survives restarts and is shared by every process
+using the same file; batch callers stop at ``1 - INTERACTIVE_RESERVE`` of
+the daily limit, which keeps the rest for people using the app. The
+windows' send times live in the same file, so the per-second limit also
+holds across processes; the priority queue is per process, so across
+processes only the daily reserve favours interactive lookups.
+
+Callers mark background work with ``with priority(BATCH): ...``; the level is
+a context variable, so it follows the work onto executor threads started
+with metrics.submit.
+"""
+import os
+import time
+import bisect
+import sqlite3
+import logging
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+
+from provider_client import ProviderUnavailable
+
+load_dotenv()
+
+# Scheduler settings (overridable from .env)
+RATE_LIMIT_PATH = os.getenv("RATE_LIMIT_PATH", "rate_limits.db")
+# Share of each daily limit only interactive requests may use
+INTERACTIVE_RESERVE = float(os.getenv("INTERACTIVE_RESERVE", "0.2"))
+# Callers allowed to wait for one provider's slots at once; more are shed
+RATE_LIMIT_QUEUE = int(os.getenv("RATE_LIMIT_QUEUE", "16"))
+# Longest a request waits for a slot, on top of its own deadline
+RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "5"))
+# Seconds added to each rate window to absorb jitter between sending and arrival
+RATE_LIMIT_MARGIN = float(os.getenv("RATE_LIMIT_MARGIN", "0.05"))
+
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+_priority = contextvars.ContextVar("request_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def priority(level):
+    """Run the block's provider requests at ``level`` (INTERACTIVE or BATCH)"""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority():
+    return _priority.get()
+
+
+class RateLimited(ProviderUnavailable):
+    """A request was shed to stay within a provider's limits"""
+
+
+class SlidingWindow:
+    """At most ``requests`` sends in any ``per`` seconds (plus ``margin``).
+
+    Send times are kept in the usage store, so every process using the same
+    file shares one window per provider.
+    """
+
+    def __init__(self, store, name, requests, per=1.0, margin=RATE_LIMIT_MARGIN):
+        self.store = store
+        self.name = name
+        self.requests = int(requests)
+        self.per = per + margin
+
+    def take(self):
+        """Take a slot if fewer than ``requests`` were sent in the last window"""
+        return self.store.take_slot(self.name, self.requests, self.per)
+
+    def give_back(self):
+        self.store.return_slot(self.name)
+
+    def wait_time(self, count=1):
+        """Seconds until ``count`` slots will have been free (one after another)"""
+        times = self.store.send_times(self.name, self.per)
+        free = self.requests - len(times)
+        if free >= count:
+            return 0.0
+        if not times:
+            return self.per * ((count - 1) // self.requests)
+        # Slots open up as the oldest sends leave the window, one window per round
+        j = count - free - 1
+        return max(0.0, times[j % len(times)] + self.per * (j // len(times) + 1) - time.time())
+
+
+class UsageStore:
+    """Requests sent per provider per UTC day, and each provider's recent send times, in SQLite"""
+
+    def __init__(self, path=RATE_LIMIT_PATH):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS provider_usage (
+                    provider TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    used INTEGER NOT NULL,
+                    PRIMARY KEY (provider, day)
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS provider_sends (
+                    provider TEXT NOT NULL,
+                    sent REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS provider_sends_time ON provider_sends (provider, sent)")
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def today():
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+    def reserve(self, provider, cap=None):
+        """Count one request unless the day's count has reached ``cap``; True if counted"""
+        if cap is not None and cap <= 0:
+            return False
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                # One statement, so processes sharing the file cannot both take the last unit
+                cursor = conn.execute(
+                    "INSERT INTO provider_usage (provider, day, used) VALUES (?, ?, 1) "
+                    "ON CONFLICT (provider, day) DO UPDATE SET used = used + 1 WHERE ? IS NULL OR used < ?",
+                    (provider, self.today(), cap, cap)
+                )
+            return cursor.rowcount == 1
+
+    def release(self, provider):
+        """Give back a unit counted for a request that was never sent"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("UPDATE provider_usage SET used = MAX(used - 1, 0) WHERE provider = ? AND day = ?",
+                             (provider, self.today()))
+
+    def used(self, provider):
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT used FROM provider_usage WHERE provider = ? AND day = ?", (provider, self.today())
+            ).fetchone()
+        return row[0] if row else 0
+
+    def take_slot(self, provider, requests, per):
+        """Record a send for ``provider`` unless ``requests`` were sent in the last ``per`` seconds"""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            # IMMEDIATE takes the write lock up front, so two processes cannot both count a free slot
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM provider_sends WHERE provider = ? AND sent <= ?", (provider, now - per))
+                sent = conn.execute("SELECT COUNT(*) FROM provider_sends WHERE provider = ?", (provider,)).fetchone()[0]
+                taken = sent < requests
+                if taken:
+                    conn.execute("INSERT INTO provider_sends (provider, sent) VALUES (?, ?)", (provider, now))
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        return taken
+
+    def return_slot(self, provider):
+        """Forget the latest send of ``provider``, for a request that was never sent"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM provider_sends WHERE rowid = (SELECT rowid FROM provider_sends "
+                             "WHERE provider = ? ORDER BY sent DESC LIMIT 1)", (provider,))
+
+    def send_times(self, provider, per):
+        """Send times of ``provider`` within the last ``per`` seconds, oldest first"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT sent FROM provider_sends WHERE provider = ? AND sent > ? ORDER BY sent",
+                (provider, time.time() - per)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM provider_usage")
+                conn.execute("DELETE FROM provider_sends")
+
+
+usage_store = UsageStore()
+
+
+class RateLimiter:
+    """Admission control for one provider.
+
+    ``rate`` is (requests, seconds) or None for no per-second limit;
+    ``daily`` is the requests allowed per UTC day or None for no limit
+    (requests to such a provider are not counted).
+    """
+
+    def __init__(self, name, rate=None, daily=None, store=None, reserve=INTERACTIVE_RESERVE,
+                 max_queue=RATE_LIMIT_QUEUE, max_wait=RATE_LIMIT_MAX_WAIT):
+        self.name = name
+        self.rate = rate
+        self.daily = daily
+        self.store = store
+        self.reserve = reserve
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.window = SlidingWindow(self._store(), name, *rate) if rate else None
+        self.admitted = {level: 0 for level in PRIORITY_NAMES}
+        self.shed = {level: 0 for level in PRIORITY_NAMES}
+        self.waited = 0.0
+        self._waiting = []
+        self._evicted = set()
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def _store(self):
+        return self.store or usage_store
+
+    def daily_cap(self, level):
+        """Most requests a caller at ``level`` may bring the day's count to"""
+        if self.daily is None:
+            return None
+        if level == INTERACTIVE:
+            return self.daily
+        return int(self.daily * (1 - self.reserve))
+
+    def acquire(self, deadline=None):
+        """Wait for permission to send one request; raises RateLimited if it cannot be sent in time.
+
+        ``deadline`` is a time.monotonic() value; the wait is also capped at max_wait.
+        """
+        level = current_priority()
+        cap = self.daily_cap(level)
+        if cap is not None and self._store().used(self.name) >= cap:
+            self._shed(level)
+            raise RateLimited(f"{self.name} daily {PRIORITY_NAMES[level]} limit reached ({cap} requests)")
+        if self.window is not None:
+            limit = time.monotonic() + self.max_wait
+            self._take_slot(level, limit if deadline is None else min(deadline, limit))
+        # Counted only once a slot is granted, so callers that jump the queue also get the day's last units
+        if cap is not None and not self._store().reserve(self.name, cap):
+            with self._cond:
+                if self.window is not None:
+                    self.window.give_back()
+                    self._cond.notify_all()
+            self._shed(level)
+            raise RateLimited(f"{self.name} daily {PRIORITY_NAMES[level]} limit reached ({cap} requests)")
+        with self._cond:
+            self.admitted[level] += 1
+
+    def refund(self):
+        """Undo an acquire whose request was not sent after all"""
+        if self.daily is not None:
+            self._store().release(self.name)
+        if self.window is not None:
+            with self._cond:
+                self.window.give_back()
+                self._cond.notify_all()
+
+    def _take_slot(self, level, deadline):
+        start = time.monotonic()
+        entry = (level, next(self._seq))
+        with self._cond:
+            if len(self._waiting) >= self.max_queue:
+                # A full queue makes room for a more urgent caller by dropping its last entry
+                if self._waiting[-1] <= entry:
+                    self._shed(level)
+                    raise RateLimited(f"{self.name} request queue is full")
+                victim = self._waiting.pop()
+                self._evicted.add(victim)
+                self._cond.notify_all()
+            bisect.insort(self._waiting, entry)
+            try:
+                while True:
+                    if entry in self._evicted:
+                        self._evicted.discard(entry)
+                        self._shed(level)
+                        raise RateLimited(f"{self.name} request dropped for a higher-priority one")
+                    position = self._waiting.index(entry)
+                    if position == 0 and self.window.take():
+                        self._waiting.pop(0)
+                        self.waited += time.monotonic() - start
+                        return
+                    # Every caller ahead of this one needs a slot first
+                    wait = self.window.wait_time(position + 1)
+                    remaining = deadline - time.monotonic()
+                    if wait > remaining:
+                        self._shed(level)
+                        raise RateLimited(f"{self.name} rate limit: no request slot within the deadline")
+                    self._cond.wait(timeout=wait)
+            finally:
+                if entry in self._waiting:
+                    self._waiting.remove(entry)
+                self._cond.notify_all()
+
+    def _shed(self, level):
+        self.shed[level] += 1
+        logging.info(f"Shed a {PRIORITY_NAMES[level]} {self.name} request")
+
+    def stats(self):
+        """Limits, today's usage and queue figures for the status panel"""
+        used = self._store().used(self.name) if self.daily is not None else None
+        with self._cond:
+            return {
+                "rate": self.rate,
+                "daily_limit": self.daily,
+                "used_today": used,
+                "remaining_today": max(self.daily - used, 0) if self.daily is not None else None,
+                "queued": len(self._waiting),
+                "admitted": sum(self.admitted.values()),
+                "shed": {PRIORITY_NAMES[level]: count for level, count in self.shed.items()},
+                "wait_ms": self.waited * 1000
+            }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name, rate=None, daily=None):
+    """Return the shared limiter for a provider, creating it on first use"""
+    with _limiters_lock:
+        if name not in _limiters:
+            _limiters[name] = RateLimiter(name, rate, daily)
+        return _limiters[name]
+
+
+def limiter_stats():
+    """Stats for every provider limiter created in this process"""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.stats() for limiter in limiters}
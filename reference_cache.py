@@ -0,0 +1,125 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Cache settings (overridable from .env)
+CACHE_PATH = os.getenv("REFERENCE_CACHE_PATH", "reference_cache.db")
+CACHE_TTL = float(os.getenv("REFERENCE_CACHE_TTL", str(6 * 60 * 60)))
+CACHE_MAX_ENTRIES = int(os.getenv("REFERENCE_CACHE_MAX_ENTRIES", "5000"))
+
+
+def normalize_query(query):
+    """Normalize a search query so trivially different spellings share a cache entry"""
+    return ' '.join(query.lower().split())
+
+
+class ReferenceCache:
+    """SQLite-backed provider response cache with TTL expiry and LRU eviction.
+
+    Entries are keyed on (provider, normalized query, page size) and live in a
+    file on disk, so they survive Streamlit restarts and are shared by every
+    session and process pointing at the same path.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS references_cache (
+                    provider TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    num_results INTEGER NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (provider, query, num_results)
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_refs_last_access ON references_cache (last_access)")
+            self._conn.commit()
+        return self._conn
+
+    def get(self, provider, query, num_results):
+        """Return cached articles for a provider query, or None on a miss"""
+        key = (provider, normalize_query(query), num_results)
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT payload, created_at FROM references_cache WHERE provider=? AND query=? AND num_results=?",
+                    key
+                ).fetchone()
+                if row and now - row[1] <= self.ttl:
+                    conn.execute(
+                        "UPDATE references_cache SET last_access=? WHERE provider=? AND query=? AND num_results=?",
+                        (now,) + key
+                    )
+                    conn.commit()
+                    self.hits += 1
+                    return json.loads(row[0])
+                if row:
+                    conn.execute("DELETE FROM references_cache WHERE provider=? AND query=? AND num_results=?", key)
+                    conn.commit()
+                self.misses += 1
+        except sqlite3.Error:
+            logging.exception("Reference cache read failed")
+        return None
+
+    def put(self, provider, query, num_results, articles):
+        """Store provider articles and evict least recently used entries past the size cap"""
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO references_cache VALUES (?, ?, ?, ?, ?, ?)",
+                    (provider, normalize_query(query), num_results, json.dumps(articles), now, now)
+                )
+                conn.execute(
+                    "DELETE FROM references_cache WHERE rowid IN ("
+                    "SELECT rowid FROM references_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+                conn.commit()
+        except sqlite3.Error:
+            logging.exception("Reference cache write failed")
+
+    def clear(self):
+        """Drop every cached entry and reset the counters"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM references_cache")
+            conn.commit()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        """Hit/miss counters for this process plus the shared entry count"""
+        with self._lock:
+            entries = self._connect().execute("SELECT COUNT(*) FROM references_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0,
+            "entries": entries
+        }
+
+
+reference_cache = ReferenceCache()
@@ -0,0 +1,252 @@
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from dotenv import load_dotenv
+from keywords import extract_query
+from dedup import Deduplicator
+from reference_cache import reference_cache, normalize_query
+from coalesce import SingleFlight, NegativeCache
+from provider_client import ProviderUnavailable
+from providers import enabled_providers
+from ratelimit import current_priority, BATCH
+from corroboration import corroboration_index, LOCAL_MIN_MATCHES
+import metrics
+
+load_dotenv()
+
+# One deadline for the whole lookup instead of a 15s timeout per call
+REFERENCE_DEADLINE = float(os.getenv("REFERENCE_DEADLINE", "15"))
+MAX_WORKERS = 6
+# Seconds a "No relevant references found" answer is reused for the same query
+NEGATIVE_CACHE_TTL = float(os.getenv("NEGATIVE_CACHE_TTL", "60"))
+NEGATIVE_CACHE_MAX_ENTRIES = int(os.getenv("NEGATIVE_CACHE_MAX_ENTRIES", "1024"))
+# Answer from articles already seen before asking the providers (0 = always ask them)
+LOCAL_INDEX = os.getenv("LOCAL_INDEX", "1") == "1"
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="references")
+# Batch lookups get their own workers, so a backlog of them waiting for provider
+# rate limits never sits in front of an interactive lookup
+_batch_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="references-batch")
+
+# Identical lookups running at the same time (a trending headline pasted by many
+# sessions) share one in-flight call, both per article query and per provider request
+lookups = SingleFlight()
+provider_calls = SingleFlight()
+no_results = NegativeCache(NEGATIVE_CACHE_TTL, NEGATIVE_CACHE_MAX_ENTRIES)
+
+
+def calculate_relevance_score(article_title, article_desc, query):
+    """Calculate relevance score between article and query"""
+    query_words = set(query.lower().split())
+    title_words = set(article_title.lower().split())
+    desc_words = set(article_desc.lower().split()) if article_desc else set()
+    
+    # Calculate overlap
+    title_overlap = len(query_words.intersection(title_words)) / len(query_words) if query_words else 0
+    desc_overlap = len(query_words.intersection(desc_words)) / len(query_words) if query_words else 0
+    
+    # Weighted score (title is more important)
+    relevance_score = (title_overlap * 0.7) + (desc_overlap * 0.3)
+    return relevance_score
+
+def merge_references(batches, query, num_results):
+    """Merge provider batches by weighted relevance, honouring per-provider quotas.
+
+    Each article scores ``relevance * provider.weight``; ties keep provider
+    priority and the provider's own ranking. Duplicate URLs keep the best copy.
+    """
+    candidates = []
+    for order, (provider, articles) in enumerate(batches):
+        for rank, art in enumerate(articles):
+            relevance = calculate_relevance_score(art["title"], art.get("description", ""), query)
+            # Only consider articles above the relevance threshold
+            if relevance > 0.1:
+                candidates.append((relevance * provider.weight, order, rank, provider, art, relevance))
+    candidates.sort(key=lambda c: (-c[0], c[1], c[2]))
+
+    results = []
+    urls = set()
+    taken = {}
+    for score, _, _, provider, art, relevance in candidates:
+        if len(results) >= num_results:
+            break
+        if art["url"] in urls:
+            continue
+        if provider.quota is not None and taken.get(provider.name, 0) >= provider.quota:
+            continue
+        results.append(dict(art, relevance=relevance, score=score, provider=provider.name))
+        urls.add(art["url"])
+        taken[provider.name] = taken.get(provider.name, 0) + 1
+    return results
+
+def fetch_references(search_queries, query, num_results, deadline=None, max_workers=None, providers=None):
+    """Run every enabled provider x query search concurrently under one overall deadline.
+
+    Results are merged by weighted relevance. The lookup stops early once the
+    merged list is full and no pending search could beat its weakest entry
+    (relevance is at most 1, so a pending provider can score at most its weight).
+    Returns (results, answered), where ``answered`` counts the searches a
+    provider actually answered, as opposed to skipped, failed or timed out.
+    """
+    deadline = REFERENCE_DEADLINE if deadline is None else deadline
+    providers = enabled_providers() if providers is None else providers
+    tasks = [(provider, search_query) for provider in providers for search_query in search_queries]
+    batches = [None] * len(tasks)
+    answered = 0
+    end = time.monotonic() + deadline
+
+    def cached_search(provider, search_query):
+        cached = reference_cache.get(provider.name, search_query, num_results)
+        if cached is not None:
+            return cached
+        articles = provider.search(search_query, num_results, max(end - time.monotonic(), 0.1))
+        # Only cache real answers; empty/failed calls are retried next time
+        if articles:
+            reference_cache.put(provider.name, search_query, num_results, articles)
+        return articles
+
+    def run(provider, search_query):
+        # Callers at different priorities do not share a call: an interactive one would queue as batch
+        key = (provider.name, normalize_query(search_query), num_results, current_priority())
+        return provider_calls.do(key, lambda: cached_search(provider, search_query))
+
+    # max_workers=1 reproduces the old one-call-at-a-time behaviour (used by the benchmark)
+    shared = _batch_executor if current_priority() == BATCH else _executor
+    executor = shared if max_workers is None else ThreadPoolExecutor(max_workers=max_workers)
+    futures = {metrics.submit(executor, run, *task): i for i, task in enumerate(tasks)}
+    pending = set(futures)
+    try:
+        while pending:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                logging.warning(f"Reference lookup deadline hit with {len(pending)} searches pending")
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = futures[future]
+                provider = tasks[i][0]
+                try:
+                    batches[i] = (provider, future.result())
+                    answered += 1
+                except ProviderUnavailable as e:
+                    logging.info(f"Skipping search: {e}")
+                    batches[i] = (provider, [])
+                except Exception:
+                    logging.exception(f"{provider.name} API Exception")
+                    batches[i] = (provider, [])
+
+            # Early stop once no pending search could improve the result list
+            merged = merge_references([b for b in batches if b is not None], query, num_results)
+            if pending and len(merged) >= num_results:
+                best_pending = max(tasks[futures[future]][0].weight for future in pending)
+                if merged[-1]["score"] >= best_pending:
+                    break
+    finally:
+        for future in pending:
+            future.cancel()
+        if executor is not shared:
+            executor.shutdown(wait=False)
+
+    return merge_references([b for b in batches if b is not None], query, num_results), answered
+
+def no_references_found(query):
+    """Placeholder shown when no provider returned a relevant article; ``placeholder`` marks it as no reference"""
+    return {
+        "title": "No relevant references found",
+        "description": f"No articles found matching '{query}'. This could indicate the news is very recent, local, or potentially fabricated.",
+        "url": "https://news.google.com/search?q=" + query.replace(" ", "+"),
+        "source": "Google News Search",
+        "publishedAt": datetime.utcnow().isoformat(),
+        "urlToImage": "",
+        "relevance": 0,
+        "placeholder": True
+    }
+
+def references_unavailable(query):
+    """Placeholder shown when no provider could be asked (rate limited, circuit open, errors)"""
+    return dict(
+        no_references_found(query),
+        title="References unavailable",
+        description="The news providers could not be reached or are over their request limits right now. "
+                    "Try again shortly.",
+        unavailable=True
+    )
+
+def get_news_references(article_text, num_results=6):
+    """Fetch news references with improved accuracy and relevance scoring"""
+    with metrics.span("extract_query"):
+        query = extract_query(article_text)
+    return references_for_query(query, num_results, article_text)
+
+def references_for_query(query, num_results=6, article_text=None):
+    """get_news_references for an already extracted search query.
+
+    The local corroboration index is searched first with the article text
+    (or the query); the providers are only asked when it holds fewer than
+    LOCAL_MIN_MATCHES similar articles, and any local matches lead the list.
+    """
+    local = local_references(article_text or query, num_results)
+    if len(local) >= min(LOCAL_MIN_MATCHES, num_results):
+        return local
+    key = (normalize_query(query), num_results)
+    if key in no_results:
+        logging.info(f"No references for {query!r} recently, not searching again yet")
+        return local or [no_references_found(query)]
+    results = lookups.do(key + (current_priority(),), lambda: lookup_references(query, num_results))
+    # Callers sharing one lookup each get their own copies
+    results = [dict(result) for result in results]
+    if local:
+        found = [r for r in results if not r.get("placeholder")]
+        results = list(Deduplicator(threshold=0.8).filter(local + found))[:num_results]
+    return results
+
+def local_references(text, num_results):
+    """Previously seen articles similar to ``text``, best first"""
+    if not LOCAL_INDEX:
+        return []
+    try:
+        with metrics.span("local_index"):
+            matches = corroboration_index.search(text, k=num_results)
+    except Exception:
+        logging.exception("Local corroboration lookup failed")
+        return []
+    return [dict(match, provider="Local") for match in matches]
+
+def lookup_references(query, num_results):
+    """Search every provider for ``query`` and return the best unique matches"""
+    logging.info(f"Searching for references with query: {query!r}")
+
+    # Try multiple search strategies
+    search_queries = [
+        query,  # Main query
+        ' '.join(query.split()[:3]),  # First 3 words
+        ' '.join(query.split()[-3:]) if len(query.split()) > 3 else query  # Last 3 words
+    ]
+
+    # Already ordered best first by weighted relevance
+    with metrics.span("fetch_references"):
+        results, answered = fetch_references(search_queries, query, num_results)
+    
+    # Remove duplicate URLs and titles that are too similar (> 80% word overlap)
+    with metrics.span("dedup"):
+        unique_results = list(Deduplicator(threshold=0.8).filter(results))
+    
+    # Final fallback if no results
+    if not unique_results and not answered:
+        # Nothing was learned about the story, so this is not remembered as "no references"
+        logging.warning(f"No provider answered for {query!r}")
+        unique_results.append(references_unavailable(query))
+    elif not unique_results:
+        no_results.add((normalize_query(query), num_results))
+        unique_results.append(no_references_found(query))
+    elif LOCAL_INDEX:
+        # Everything the providers return becomes local corroboration for later articles
+        try:
+            with metrics.span("local_index_add"):
+                corroboration_index.add(unique_results)
+        except Exception:
+            logging.exception("Adding references to the local index failed")
+    
+    return unique_results[:num_results]
@@ -0,0 +1,324 @@
+"""Headless scoring for TruthLens.
+
+Shares text cleaning and model loading with the Streamlit app and adds a
+chunked batch path for scoring whole news feeds:
+
+    python scoring.py articles.csv --text-column title -o scored.jsonl
+    cat feed.jsonl | python scoring.py --format jsonl > scored.jsonl
+    python scoring.py big.jsonl --workers 0 -o scored.jsonl   # one process per core
+"""
+import os
+import sys
+import csv
+import json
+import time
+import hashlib
+import logging
+import argparse
+import threading
+from itertools import islice
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+from dotenv import load_dotenv
+
+import compact_model
+from fast_scorer import FastScorer
+from prediction_cache import prediction_cache, content_key
+from normalize import clean_text, clean_texts
+import metrics
+
+load_dotenv()
+
+MODEL_PATH = os.getenv("MODEL_PATH", "model95.jb")
+VECTORIZER_PATH = os.getenv("VECTORIZER_PATH", "vectorizer95.jb")
+# Use the memory-mapped export (python compact_model.py export) when it is current
+USE_COMPACT_MODEL = os.getenv("USE_COMPACT_MODEL", "1") == "1"
+CHUNK_SIZE = 1000
+# Documents --dedupe compares against (the most recent ones); 0 keeps them all
+DEDUPE_WINDOW = int(os.getenv("DEDUPE_WINDOW", "100000"))
+
+# Class id -> label used throughout the app and logs
+LABELS = {1: "Real", 0: "Fake"}
+
+
+def load_artifacts(model_path=MODEL_PATH, vectorizer_path=VECTORIZER_PATH):
+    """Load the classifier and TF-IDF vectorizer from disk.
+
+    Prefers the memory-mapped compact export when it was built from these
+    exact joblib files, falling back to unpickling them otherwise.
+    """
+    compact_dir = compact_model.COMPACT_DIR
+    if USE_COMPACT_MODEL and compact_model.is_current(compact_dir, model_path, vectorizer_path):
+        return compact_model.load_compact(compact_dir)
+    return joblib.load(model_path), joblib.load(vectorizer_path)
+
+def artifact_version(model_path=MODEL_PATH, vectorizer_path=VECTORIZER_PATH):
+    """Short content hash identifying a model/vectorizer pair"""
+    combined = compact_model.file_sha256(model_path) + compact_model.file_sha256(vectorizer_path)
+    return hashlib.sha256(combined.encode()).hexdigest()[:16]
+
+# Process-wide artifacts, loaded once by get_artifacts
+_artifacts = None
+_artifacts_version = None
+_artifacts_lock = threading.Lock()
+
+def get_artifacts():
+    """Load the model and vectorizer once per process and reuse them afterwards"""
+    global _artifacts, _artifacts_version
+    if _artifacts is None:
+        with _artifacts_lock:
+            if _artifacts is None:
+                _artifacts_version = artifact_version()
+                _artifacts = load_artifacts()
+    return _artifacts
+
+def loaded_artifact_version():
+    """Version of the artifacts this process has loaded"""
+    get_artifacts()
+    return _artifacts_version
+
+def artifacts_ready():
+    """True once get_artifacts has finished loading in this process"""
+    return _artifacts is not None
+
+_fast_scorer = None
+
+def get_fast_scorer():
+    """Process-wide FastScorer built from the loaded artifacts"""
+    global _fast_scorer
+    if _fast_scorer is None:
+        model, vectorizer = get_artifacts()
+        with _artifacts_lock:
+            if _fast_scorer is None:
+                _fast_scorer = FastScorer.from_artifacts(model, vectorizer)
+    return _fast_scorer
+
+def fast_score_texts(texts):
+    """Same output as score_texts, via the fused FastScorer instead of sklearn"""
+    scorer = get_fast_scorer()
+    with metrics.span("clean_text"):
+        cleaned = clean_texts(texts)
+    # Vectorization and predict_proba are fused into one pass in FastScorer
+    with metrics.span("inference"):
+        return scorer.score(cleaned)
+
+def cached_score_texts(texts, cache=None):
+    """fast_score_texts behind the shared prediction cache; only unseen texts reach the model"""
+    cache = cache or prediction_cache
+    scorer = get_fast_scorer()
+    version = loaded_artifact_version()
+    with metrics.span("clean_text"):
+        cleaned = clean_texts(texts)
+    with metrics.span("prediction_cache"):
+        keys = [content_key(text) for text in cleaned]
+        found = cache.get_many(version, keys)
+    missing = {}
+    for key, text in zip(keys, cleaned):
+        if key not in found:
+            missing[key] = text
+    if missing:
+        with metrics.span("inference"):
+            scored = dict(zip(missing, scorer.score(list(missing.values()))))
+        with metrics.span("prediction_cache"):
+            cache.put_many(version, scored)
+        found.update(scored)
+    return [found[key] for key in keys]
+
+def score_texts(model, vectorizer, texts):
+    """Score raw texts with one sparse transform and a single predict_proba call.
+
+    Returns a list of (prediction, confidence) pairs where the prediction is
+    the class id derived from the probabilities (argmax), matching what
+    ``model.predict`` returns for the logistic regression.
+    """
+    if not texts:
+        return []
+    with metrics.span("clean_text"):
+        cleaned = clean_texts(texts)
+    with metrics.span("vectorize"):
+        vec = vectorizer.transform(cleaned)
+    with metrics.span("predict_proba"):
+        proba = model.predict_proba(vec)
+    preds = model.classes_[proba.argmax(axis=1)]
+    confs = proba.max(axis=1)
+    return [(int(pred), float(conf)) for pred, conf in zip(preds, confs)]
+
+
+def read_records(stream, fmt, text_column):
+    """Yield (record id, text) pairs from a CSV or JSONL stream without loading it whole"""
+    if fmt == "csv":
+        csv.field_size_limit(sys.maxsize)
+        for i, row in enumerate(csv.DictReader(stream)):
+            yield row.get("id", i), row.get(text_column) or ""
+    else:
+        for i, line in enumerate(stream):
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if isinstance(row, str):
+                yield i, row
+            else:
+                yield row.get("id", i), row.get(text_column) or ""
+
+def chunked(iterable, size):
+    """Yield lists of at most ``size`` items from any iterable"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def dedupe_records(records, counter=None, window=DEDUPE_WINDOW):
+    """Drop records whose text is an exact or near duplicate of one of the last ``window`` kept.
+
+    Kept texts are held in memory; ``window=0`` compares against every
+    earlier record, so memory grows with the input.
+    """
+    from dedup import Deduplicator
+
+    dedup = Deduplicator(max_items=window or None)
+    for record_id, text in records:
+        if dedup.is_new(text):
+            yield record_id, text
+        elif counter is not None:
+            counter["duplicates"] += 1
+
+def score_stream(records, model, vectorizer, chunk_size=CHUNK_SIZE):
+    """Score (id, text) records chunk by chunk, yielding one result dict per record"""
+    for chunk in chunked(records, chunk_size):
+        ids, texts = zip(*chunk)
+        for record_id, (pred, conf) in zip(ids, score_texts(model, vectorizer, list(texts))):
+            yield {"id": record_id, "prediction": LABELS[pred], "confidence": conf}
+
+
+# Set in each pool worker by _init_worker so artifacts are loaded once per
+# process instead of being pickled into every task
+_worker_artifacts = None
+
+def _init_worker(model_path, vectorizer_path):
+    global _worker_artifacts
+    _worker_artifacts = load_artifacts(model_path, vectorizer_path)
+
+def _score_chunk(texts):
+    model, vectorizer = _worker_artifacts
+    return score_texts(model, vectorizer, texts)
+
+def score_stream_parallel(records, workers, chunk_size=CHUNK_SIZE,
+                          model_path=MODEL_PATH, vectorizer_path=VECTORIZER_PATH):
+    """Score (id, text) records across a process pool, yielding results in input order.
+
+    Each worker loads the artifacts once; tasks only carry the chunk's texts.
+    At most two chunks per worker are in flight, so memory stays bounded no
+    matter how large the input is.
+    """
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model_path, vectorizer_path)) as pool:
+        pending = deque()
+        for chunk in chunked(records, chunk_size):
+            ids, texts = zip(*chunk)
+            pending.append((ids, pool.submit(_score_chunk, list(texts))))
+            if len(pending) >= workers * 2:
+                yield from _chunk_results(*pending.popleft())
+        while pending:
+            yield from _chunk_results(*pending.popleft())
+
+def _chunk_results(ids, future):
+    for record_id, (pred, conf) in zip(ids, future.result()):
+        yield {"id": record_id, "prediction": LABELS[pred], "confidence": conf}
+
+
+class ResultWriter:
+    """Write scored records incrementally as JSONL or CSV"""
+
+    def __init__(self, stream, fmt):
+        self.stream = stream
+        self.fmt = fmt
+        self._csv = None
+
+    def write(self, result):
+        if self.fmt == "csv":
+            if self._csv is None:
+                self._csv = csv.DictWriter(self.stream, fieldnames=list(result))
+                self._csv.writeheader()
+            self._csv.writerow(result)
+        else:
+            self.stream.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+
+def detect_format(path, fmt):
+    if fmt:
+        return fmt
+    if path and path.lower().endswith(".csv"):
+        return "csv"
+    return "jsonl"
+
+def run_batch(input_stream, output_stream, in_fmt="jsonl", out_fmt="jsonl",
+              text_column="text", chunk_size=CHUNK_SIZE, model=None, vectorizer=None, workers=1,
+              dedupe=False, dedupe_window=DEDUPE_WINDOW):
+    """Score an input stream into an output stream; returns (documents, seconds)"""
+    records = read_records(input_stream, in_fmt, text_column)
+    skipped = {"duplicates": 0}
+    if dedupe:
+        records = dedupe_records(records, skipped, dedupe_window)
+    if workers > 1:
+        results = score_stream_parallel(records, workers, chunk_size)
+    else:
+        if model is None or vectorizer is None:
+            model, vectorizer = load_artifacts()
+        results = score_stream(records, model, vectorizer, chunk_size)
+
+    writer = ResultWriter(output_stream, out_fmt)
+    count = 0
+    start = time.perf_counter()
+    for result in results:
+        writer.write(result)
+        count += 1
+        if count % chunk_size == 0:
+            output_stream.flush()
+            logging.info(f"Scored {count} documents ({count / (time.perf_counter() - start):.0f} docs/sec)")
+    output_stream.flush()
+    if skipped["duplicates"]:
+        logging.info(f"Skipped {skipped['duplicates']} duplicate documents")
+    return count, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-score news articles as real or fake.")
+    parser.add_argument("input", nargs="?", default="-", help="CSV/JSONL file, or - for stdin (default)")
+    parser.add_argument("-o", "--output", default="-", help="output file, or - for stdout (default)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="input format (default: from extension, else jsonl)")
+    parser.add_argument("--output-format", choices=["csv", "jsonl"], help="output format (default: from extension, else jsonl)")
+    parser.add_argument("--text-column", default="text", help="column/field holding the article text")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=1, help="scoring processes; 0 = one per CPU core")
+    parser.add_argument("--dedupe", action="store_true", help="skip exact and near-duplicate documents")
+    parser.add_argument("--dedupe-window", type=int, default=DEDUPE_WINDOW,
+                        help="recent documents --dedupe compares against; 0 = all (memory grows with input)")
+    args = parser.parse_args(argv)
+    workers = args.workers or os.cpu_count() or 1
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s", stream=sys.stderr)
+    in_fmt = detect_format(None if args.input == "-" else args.input, args.format)
+    out_fmt = detect_format(None if args.output == "-" else args.output, args.output_format)
+
+    input_stream = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    output_stream = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        count, elapsed = run_batch(input_stream, output_stream, in_fmt, out_fmt, args.text_column,
+                                   args.chunk_size, workers=workers, dedupe=args.dedupe,
+                                   dedupe_window=args.dedupe_window)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+    rate = count / elapsed if elapsed else 0
+    print(f"Scored {count} documents in {elapsed:.2f}s ({rate:.0f} docs/sec)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
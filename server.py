@@ -0,0 +1,293 @@
+"""Standalone TruthLens inference server.
+
+Loads the model and vectorizer once and serves predictions over plain HTTP
+(standard library only), independent of the Streamlit UI:
+
+    python server.py --port 8000 --references
+
+Endpoints:
+    GET  /healthz          process is up
+    GET  /readyz           artifacts loaded, ready for traffic (503 "loading" until then,
+                           503 "failed" if loading raised)
+    POST /predict          {"text": "..."} -> {"prediction", "confidence"}
+    POST /predict/batch    {"texts": [...]} -> {"results": [...]}
+    POST /references       {"text": "...", "num_results": 6} -> {"references": [...]}
+                           (with --references; num_results 1..MAX_REFERENCE_RESULTS;
+                           provider requests run at batch priority, see ratelimit.py)
+    GET  /metrics          per-stage latency histograms, Prometheus text format
+    GET  /metrics.json     the same as JSON with p50/p95/p99
+
+Concurrent /predict requests are micro-batched: requests arriving within a
+short window are scored with a single vectorizer/model call.
+"""
+import json
+import time
+import socket
+import queue
+import logging
+import argparse
+import threading
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from scoring import LABELS, get_fast_scorer, cached_score_texts
+from prediction_cache import prediction_cache
+import metrics
+
+BATCH_WINDOW_MS = 5
+MAX_BATCH = 64
+MAX_BODY_BYTES = 5 * 1024 * 1024
+MAX_REFERENCE_RESULTS = 20
+
+
+class MicroBatcher:
+    """Collect concurrent single predictions into one scoring call.
+
+    The worker thread blocks for the first request, then keeps gathering
+    until ``window`` seconds have passed or ``max_batch`` requests are
+    queued, and resolves every caller's future from one ``score`` call.
+    """
+
+    def __init__(self, score, window=BATCH_WINDOW_MS / 1000, max_batch=MAX_BATCH):
+        self.score = score
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.items = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, text):
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            texts = [text for text, _ in batch]
+            try:
+                results = self.score(texts)
+            except Exception as e:
+                logging.exception("Batch scoring failed")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+
+class InferenceService:
+    """Holds the loaded artifacts and readiness state shared by all handlers"""
+
+    def __init__(self, window, max_batch, references=False):
+        self.window = window
+        self.max_batch = max_batch
+        self.references_enabled = references
+        self.ready = threading.Event()
+        # Set instead of ready when loading fails, so probes stop waiting
+        self.load_error = None
+        self.batcher = None
+        self.get_news_references = None
+        self.ratelimit = None
+
+    def load(self):
+        """Load artifacts (run in the background so /healthz answers during startup)"""
+        start = time.perf_counter()
+        try:
+            get_fast_scorer()
+            if self.references_enabled:
+                from references import get_news_references
+                import ratelimit
+                self.get_news_references = get_news_references
+                self.ratelimit = ratelimit
+            self.batcher = MicroBatcher(cached_score_texts, self.window, self.max_batch)
+        except Exception as e:
+            logging.exception("Loading the model failed")
+            self.load_error = f"{type(e).__name__}: {e}"
+            return
+        self.ready.set()
+        logging.info(f"Model ready in {time.perf_counter() - start:.2f}s")
+
+    def predict(self, text):
+        pred, conf = self.batcher.submit(text).result()
+        return {"prediction": LABELS[pred], "confidence": conf}
+
+    def predict_batch(self, texts):
+        return [{"prediction": LABELS[pred], "confidence": conf}
+                for pred, conf in cached_score_texts(texts)]
+
+    def references(self, text, num_results):
+        """Reference lookup for API clients, queued behind the app's interactive lookups"""
+        with self.ratelimit.priority(self.ratelimit.BATCH):
+            return self.get_news_references(text, num_results)
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            # Headers and body are separate writes; without this, Nagle plus delayed ACKs
+            # hold every keep-alive response back ~40 ms, far longer than the batch window
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def do_GET(self):
+            if self.path == "/healthz":
+                self._send(200, {"status": "ok"})
+            elif self.path == "/readyz":
+                if service.ready.is_set():
+                    self._send(200, {"status": "ready", "batches": service.batcher.batches,
+                                     "batched_items": service.batcher.items,
+                                     "prediction_cache": prediction_cache.stats()})
+                elif service.load_error:
+                    self._send(503, {"status": "failed", "error": service.load_error})
+                else:
+                    self._send(503, {"status": "loading"})
+            elif self.path == "/metrics":
+                self._send_text(200, metrics.prometheus_text())
+            elif self.path == "/metrics.json":
+                self._send(200, metrics.snapshot())
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            routes = {
+                "/predict": self._predict,
+                "/predict/batch": self._predict_batch,
+                "/references": self._references
+            }
+            route = routes.get(self.path)
+            if route is None:
+                self._send(404, {"error": "not found"})
+                return
+            if service.load_error:
+                self._send(503, {"error": "model failed to load"})
+                return
+            if not service.ready.is_set():
+                self._send(503, {"error": "model is still loading"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+            except ValueError:
+                length = -1
+            if length < 0:
+                self._send(400, {"error": "invalid Content-Length"})
+                return
+            if length > MAX_BODY_BYTES:
+                self._send(413, {"error": "request body too large"})
+                return
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                self._send(400, {"error": "invalid JSON body"})
+                return
+            if not isinstance(body, dict):
+                self._send(400, {"error": "body must be a JSON object"})
+                return
+            try:
+                with metrics.span("http_request", route=self.path):
+                    route(body)
+            except Exception:
+                logging.exception(f"{self.path} failed")
+                self._send(500, {"error": "internal error"})
+
+        def _predict(self, body):
+            text = body.get("text")
+            if not isinstance(text, str):
+                self._send(400, {"error": "'text' must be a string"})
+                return
+            self._send(200, service.predict(text))
+
+        def _predict_batch(self, body):
+            texts = body.get("texts")
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                self._send(400, {"error": "'texts' must be a list of strings"})
+                return
+            self._send(200, {"results": service.predict_batch(texts)})
+
+        def _references(self, body):
+            if not service.references_enabled:
+                self._send(404, {"error": "references endpoint disabled (start with --references)"})
+                return
+            text = body.get("text")
+            if not isinstance(text, str):
+                self._send(400, {"error": "'text' must be a string"})
+                return
+            num_results = body.get("num_results", 6)
+            # bool is an int subclass, so True would otherwise pass as 1
+            if type(num_results) is not int or not 1 <= num_results <= MAX_REFERENCE_RESULTS:
+                self._send(400, {"error": f"'num_results' must be an integer from 1 to {MAX_REFERENCE_RESULTS}"})
+                return
+            self._send(200, {"references": service.references(text, num_results)})
+
+        def _send(self, status, payload):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _send_text(self, status, text):
+            data = text.encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, fmt, *args):
+            logging.debug(f"{self.address_string()} {fmt % args}")
+
+    return Handler
+
+
+def create_server(host="127.0.0.1", port=8000, window=BATCH_WINDOW_MS / 1000,
+                  max_batch=MAX_BATCH, references=False):
+    """Build the HTTP server and start loading artifacts in the background"""
+    service = InferenceService(window, max_batch, references)
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    server.service = service
+    threading.Thread(target=service.load, name="model-loader", daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve TruthLens predictions over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--batch-window-ms", type=float, default=BATCH_WINDOW_MS,
+                        help="how long to wait for more /predict requests to batch together")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--references", action="store_true", help="enable the /references endpoint")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    server = create_server(args.host, args.port, args.batch_window_ms / 1000, args.max_batch, args.references)
+    logging.info(f"Serving on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
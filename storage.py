@@ -0,0 +1,378 @@
+"""Prediction and feedback storage.
+
+Both streams live in one SQLite database in WAL mode: every write is a
+single-row INSERT (O(1), no read-modify-write of the whole history) and
+SQLite serializes concurrent writers from any number of sessions or
+processes, so simultaneous submissions are never lost.
+
+Running totals for the sidebar statistics are kept in small summary tables
+updated in the same transaction as each write, so reading them is O(1)
+regardless of history size.
+
+On first use of the default database the existing log.csv / feedback.csv
+are imported once; other databases (a --db path, benchmark scratch files)
+only get them through the explicit command:
+
+    python storage.py import            # explicit import, skipped if already done
+    python storage.py rebuild-stats     # recompute the summary tables from the stored history only
+"""
+import os
+import csv
+import sqlite3
+import logging
+import argparse
+import threading
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DB_PATH = os.getenv("TRUTHLENS_DB", "truthlens.db")
+LEGACY_LOG_CSV = "log.csv"
+LEGACY_FEEDBACK_CSV = "feedback.csv"
+
+PREDICTION_COLUMNS = ["timestamp", "news", "prediction", "confidence", "references_found", "timings", "analysis_id"]
+
+FEEDBACK_COLUMNS = [
+    "session_id", "timestamp", "article_text", "prediction", "confidence",
+    "emoji_feedback", "emoji_label", "emoji_rating", "feedback_type",
+    "accuracy_rating", "speed_rating", "ui_rating", "overall_rating",
+    "detailed_comments", "improvement_areas", "analysis_id"
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    news TEXT,
+    prediction TEXT,
+    confidence REAL,
+    references_found INTEGER,
+    timings TEXT,
+    analysis_id TEXT
+);
+CREATE TABLE IF NOT EXISTS feedback (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT,
+    timestamp TEXT NOT NULL,
+    article_text TEXT,
+    prediction TEXT,
+    confidence REAL,
+    emoji_feedback TEXT,
+    emoji_label TEXT,
+    emoji_rating INTEGER,
+    feedback_type TEXT,
+    accuracy_rating INTEGER,
+    speed_rating INTEGER,
+    ui_rating INTEGER,
+    overall_rating INTEGER,
+    detailed_comments TEXT,
+    improvement_areas TEXT,
+    analysis_id TEXT
+);
+CREATE TABLE IF NOT EXISTS storage_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS prediction_totals (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    total INTEGER NOT NULL DEFAULT 0,
+    real INTEGER NOT NULL DEFAULT 0,
+    fake INTEGER NOT NULL DEFAULT 0,
+    confidence_sum REAL NOT NULL DEFAULT 0,
+    confidence_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS prediction_hourly (
+    hour TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS feedback_totals (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    total INTEGER NOT NULL DEFAULT 0,
+    positive INTEGER NOT NULL DEFAULT 0,
+    negative INTEGER NOT NULL DEFAULT 0,
+    rating_sum REAL NOT NULL DEFAULT 0,
+    rating_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS feed_state (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    modified TEXT,
+    checked_at TEXT
+);
+CREATE TABLE IF NOT EXISTS feed_items (
+    item_key TEXT PRIMARY KEY,
+    feed_url TEXT,
+    seen_at TEXT NOT NULL
+);
+INSERT OR IGNORE INTO prediction_totals (id) VALUES (1);
+INSERT OR IGNORE INTO feedback_totals (id) VALUES (1);
+"""
+
+# Bump when the summary tables change so existing databases get rebuilt
+AGGREGATES_VERSION = "1"
+
+_local = threading.local()
+
+
+def connect(path=None):
+    """Return this thread's connection to the database, creating the schema on first use"""
+    path = path or DB_PATH
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    if path not in connections:
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        _add_missing_columns(conn)
+        connections[path] = conn
+        if path == DB_PATH:
+            import_legacy_csv(conn, LEGACY_LOG_CSV, LEGACY_FEEDBACK_CSV)
+        version = conn.execute("SELECT value FROM storage_meta WHERE key='aggregates_version'").fetchone()
+        if version is None or version[0] != AGGREGATES_VERSION:
+            rebuild_aggregates(conn)
+    return connections[path]
+
+
+def _add_missing_columns(conn):
+    """Bring databases created before a column existed up to the current schema"""
+    with conn:
+        for table, column in [("predictions", "timings"), ("predictions", "analysis_id"), ("feedback", "analysis_id")]:
+            columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} TEXT")
+        # One log row per analysis; rows without an id (CSV imports, feed ingestion) are not constrained
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS predictions_analysis_id ON predictions (analysis_id)")
+
+
+def _insert(conn, table, columns, row):
+    placeholders = ", ".join("?" for _ in columns)
+    conn.execute(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+        [row.get(col) for col in columns]
+    )
+
+
+def _hour_bucket(timestamp):
+    """'2025-07-04T14:34:05.51' -> '2025-07-04T14'"""
+    return str(timestamp)[:13]
+
+
+def _add_prediction_aggregates(conn, prediction, confidence, timestamp):
+    conn.execute(
+        "UPDATE prediction_totals SET total = total + 1, real = real + ?, fake = fake + ?, "
+        "confidence_sum = confidence_sum + ?, confidence_count = confidence_count + ? WHERE id = 1",
+        (int(prediction == "Real"), int(prediction == "Fake"),
+         confidence or 0, int(confidence is not None))
+    )
+    conn.execute(
+        "INSERT INTO prediction_hourly VALUES (?, 1) ON CONFLICT(hour) DO UPDATE SET count = count + 1",
+        (_hour_bucket(timestamp),)
+    )
+
+
+def _add_feedback_aggregates(conn, feedback_type, rating):
+    conn.execute(
+        "UPDATE feedback_totals SET total = total + 1, positive = positive + ?, negative = negative + ?, "
+        "rating_sum = rating_sum + ?, rating_count = rating_count + ? WHERE id = 1",
+        (int(feedback_type == "positive"), int(feedback_type == "negative"),
+         rating or 0, int(rating is not None))
+    )
+
+
+def append_prediction(record, path=None):
+    """Append one prediction log row and update the running totals.
+
+    A record carrying an ``analysis_id`` is stored at most once per id;
+    returns False when that analysis was already logged.
+    """
+    conn = connect(path)
+    with conn:
+        placeholders = ", ".join("?" for _ in PREDICTION_COLUMNS)
+        cursor = conn.execute(
+            f"INSERT INTO predictions ({', '.join(PREDICTION_COLUMNS)}) VALUES ({placeholders}) "
+            "ON CONFLICT (analysis_id) DO NOTHING",
+            [record.get(col) for col in PREDICTION_COLUMNS]
+        )
+        if cursor.rowcount == 0:
+            return False
+        _add_prediction_aggregates(conn, record.get("prediction"), record.get("confidence"), record["timestamp"])
+    return True
+
+
+def append_predictions(records, seen=(), path=None):
+    """Append many prediction rows in one transaction, marking feed items as seen.
+
+    ``seen`` holds (item key, feed url) pairs for ingested feed entries, so a
+    crash can never leave an item scored but unmarked or the other way round.
+    """
+    conn = connect(path)
+    now = datetime.now().isoformat()
+    with conn:
+        for record in records:
+            _insert(conn, "predictions", PREDICTION_COLUMNS, record)
+            _add_prediction_aggregates(conn, record.get("prediction"), record.get("confidence"), record["timestamp"])
+        conn.executemany("INSERT OR IGNORE INTO feed_items VALUES (?, ?, ?)",
+                         [(key, feed_url, now) for key, feed_url in seen])
+
+
+def unseen_feed_items(keys, path=None):
+    """Subset of ``keys`` not yet recorded by append_predictions"""
+    keys = list(keys)
+    seen = set()
+    conn = connect(path)
+    for start in range(0, len(keys), 500):
+        batch = keys[start:start + 500]
+        marks = ",".join("?" * len(batch))
+        seen.update(row[0] for row in conn.execute(
+            f"SELECT item_key FROM feed_items WHERE item_key IN ({marks})", batch))
+    return [key for key in keys if key not in seen]
+
+
+def get_feed_state(url, path=None):
+    """(etag, modified) validators from the last successful fetch of a feed"""
+    row = connect(path).execute("SELECT etag, modified FROM feed_state WHERE url=?", (url,)).fetchone()
+    return row or (None, None)
+
+
+def set_feed_state(url, etag, modified, path=None):
+    """Remember a feed's validators for the next conditional GET"""
+    conn = connect(path)
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO feed_state VALUES (?, ?, ?, ?)",
+                     (url, etag, modified, datetime.now().isoformat()))
+
+
+def append_feedback(record, path=None):
+    """Append one feedback row and update the running totals"""
+    conn = connect(path)
+    with conn:
+        _insert(conn, "feedback", FEEDBACK_COLUMNS, record)
+        _add_feedback_aggregates(conn, record.get("feedback_type"), record.get("overall_rating"))
+
+
+def prediction_summary(path=None, now=None):
+    """Totals, mean confidence and the rolling 7-day count, read from the summary tables"""
+    return _prediction_summary(connect(path), now)
+
+
+def _prediction_summary(conn, now=None):
+    total, real, fake, confidence_sum, confidence_count = conn.execute(
+        "SELECT total, real, fake, confidence_sum, confidence_count FROM prediction_totals WHERE id = 1"
+    ).fetchone()
+    since = _hour_bucket(((now or datetime.now()) - timedelta(days=7)).isoformat())
+    recent = conn.execute("SELECT COALESCE(SUM(count), 0) FROM prediction_hourly WHERE hour > ?", (since,)).fetchone()[0]
+    return {
+        "total_predictions": total,
+        "real_news": real,
+        "fake_news": fake,
+        "avg_confidence": confidence_sum / confidence_count if confidence_count else 0,
+        "recent_activity": recent
+    }
+
+
+def feedback_summary(path=None):
+    """Feedback counts by sentiment and the average overall rating"""
+    return _feedback_summary(connect(path))
+
+
+def _feedback_summary(conn):
+    total, positive, negative, rating_sum, rating_count = conn.execute(
+        "SELECT total, positive, negative, rating_sum, rating_count FROM feedback_totals WHERE id = 1"
+    ).fetchone()
+    return {
+        "total_feedback": total,
+        "positive_feedback": positive,
+        "negative_feedback": negative,
+        "avg_rating": rating_sum / rating_count if rating_count else 0
+    }
+
+
+def rebuild_aggregates(conn):
+    """Recompute every summary table by replaying the stored history"""
+    # Set-based equivalents of _add_prediction_aggregates/_add_feedback_aggregates
+    with conn:
+        conn.execute("DELETE FROM prediction_hourly")
+        conn.execute(
+            "INSERT INTO prediction_hourly SELECT substr(timestamp, 1, 13), COUNT(*) FROM predictions GROUP BY 1"
+        )
+        conn.execute(
+            "UPDATE prediction_totals SET (total, real, fake, confidence_sum, confidence_count) = ("
+            "SELECT COUNT(*), COALESCE(SUM(prediction = 'Real'), 0), COALESCE(SUM(prediction = 'Fake'), 0), "
+            "COALESCE(SUM(confidence), 0), COUNT(confidence) FROM predictions) WHERE id = 1"
+        )
+        conn.execute(
+            "UPDATE feedback_totals SET (total, positive, negative, rating_sum, rating_count) = ("
+            "SELECT COUNT(*), COALESCE(SUM(feedback_type = 'positive'), 0), COALESCE(SUM(feedback_type = 'negative'), 0), "
+            "COALESCE(SUM(overall_rating), 0), COUNT(overall_rating) FROM feedback) WHERE id = 1"
+        )
+        conn.execute("INSERT OR REPLACE INTO storage_meta VALUES ('aggregates_version', ?)", (AGGREGATES_VERSION,))
+    logging.info("Rebuilt prediction and feedback aggregates")
+
+
+def _read_csv_rows(csv_path, columns):
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield [row.get(col) if row.get(col) != "" else None for col in columns]
+
+
+def import_legacy_csv(conn, log_csv=LEGACY_LOG_CSV, feedback_csv=LEGACY_FEEDBACK_CSV):
+    """Copy log.csv/feedback.csv into the database once; returns rows imported per table"""
+    imported = {}
+    for table, columns, csv_path in [("predictions", PREDICTION_COLUMNS, log_csv),
+                                     ("feedback", FEEDBACK_COLUMNS, feedback_csv)]:
+        marker = f"imported:{table}"
+        if not os.path.exists(csv_path):
+            continue
+        if conn.execute("SELECT 1 FROM storage_meta WHERE key=?", (marker,)).fetchone():
+            continue
+        rows = list(_read_csv_rows(csv_path, columns))
+        if table == "predictions":
+            # references_found was written as True/False text
+            for row in rows:
+                row[4] = int(row[4] == "True") if row[4] is not None else None
+        placeholders = ", ".join("?" for _ in columns)
+        try:
+            with conn:
+                conn.execute("INSERT INTO storage_meta VALUES (?, ?)", (marker, csv_path))
+                conn.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+        except sqlite3.IntegrityError:
+            # Another process imported this file concurrently; our copy was rolled back
+            continue
+        imported[table] = len(rows)
+        logging.info(f"Imported {len(rows)} rows from {csv_path} into {table}")
+    if imported:
+        rebuild_aggregates(conn)
+    return imported
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the TruthLens prediction/feedback store.")
+    parser.add_argument("command", choices=["import", "rebuild-stats"])
+    parser.add_argument("--log", default=LEGACY_LOG_CSV, help="legacy prediction log CSV")
+    parser.add_argument("--feedback", default=LEGACY_FEEDBACK_CSV, help="legacy feedback CSV")
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    conn = sqlite3.connect(args.db, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    _add_missing_columns(conn)
+    if args.command == "rebuild-stats":
+        # Straight from the tables: connect() would import the legacy CSVs first
+        rebuild_aggregates(conn)
+        print(_prediction_summary(conn))
+        print(_feedback_summary(conn))
+        return
+
+    imported = import_legacy_csv(conn, args.log, args.feedback)
+    for table in ("predictions", "feedback"):
+        total = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        print(f"{table}: {imported.get(table, 0)} imported, {total} rows total")
+
+
+if __name__ == "__main__":
+    main()